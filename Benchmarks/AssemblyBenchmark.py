@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Time and memory of assembling the scraped rows into the result DataFrame: the
+columnar ColumnBatch path against the old row by row DataFrame append (one
+append per card, then one append per page). Pages are synthetic extracted
+rows, so only the assembly is measured, not the parsing.
+    python -m Benchmarks.AssemblyBenchmark --cards 10000 100000 1000000
+"""
+import argparse
+import gc
+import tracemalloc
+from time import perf_counter
+from pandas import DataFrame, concat
+from Utility.ColumnBatch import ColumnBatch
+from Benchmarks.Fixtures import TITLES, COMPANIES, LOCATIONS, POSTED
+
+COLUMNS = ['JobLink', 'CompanyName', 'JobTitle', 'JobLocation', 'TimePosted']
+
+
+def SyntheticPages(NumberOfCards, CardsPerPage):
+    """
+    Yields pages as lists of row dictionaries, as extracted from the cards
+    """
+    for First in range(0, NumberOfCards, CardsPerPage):
+        yield [{'JobLink': 'https://linkedin.com/jobs/view/%d' % Index,
+                'CompanyName': COMPANIES[Index % len(COMPANIES)],
+                'JobTitle': TITLES[Index % len(TITLES)],
+                'JobLocation': LOCATIONS[Index % len(LOCATIONS)],
+                'TimePosted': POSTED[Index % len(POSTED)]}
+               for Index in range(First, min(First + CardsPerPage, NumberOfCards))]
+
+
+def AppendRow(Frame, Row):
+    """
+    DataFrame.append(Row, ignore_index=True), removed in pandas 2
+    """
+    if hasattr(Frame, 'append'):
+        return Frame.append(Row, ignore_index=True)
+    return concat([Frame, DataFrame([Row])], ignore_index=True)
+
+
+def OldAssembly(Pages):
+    """
+    Baseline: the previous ListAllAvailableCompaniesInfo and SendParallelRequest
+    """
+    Result = DataFrame()
+    for Page in Pages:
+        Frame = DataFrame(columns=COLUMNS)
+        for Row in Page:
+            Frame = AppendRow(Frame, Row)
+        Result = concat([Result, Frame]) if len(Result.columns) else Frame
+    return Result
+
+
+def ColumnarAssembly(Pages):
+    """
+    ColumnBatch per page, merged and converted to a DataFrame once
+    """
+    Batches = []
+    for Page in Pages:
+        Batch = ColumnBatch(COLUMNS)
+        for Row in Page:
+            Batch.AppendRow(Row)
+        Batches.append(Batch)
+    return ColumnBatch.Concat(Batches).ToDataFrame()
+
+
+def Measure(Assembly, NumberOfCards, CardsPerPage):
+    """
+    :returns (seconds, peak traced memory in MiB, number of rows)
+    """
+    Pages = list(SyntheticPages(NumberOfCards, CardsPerPage))
+    gc.collect()
+    tracemalloc.start()
+    start = perf_counter()
+    Result = Assembly(Pages)
+    Seconds = perf_counter() - start
+    Peak = tracemalloc.get_traced_memory()[1] / (1 << 20)
+    tracemalloc.stop()
+    return Seconds, Peak, len(Result)
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--cards', type=int, nargs='+', default=[10000, 100000, 1000000])
+    Parser.add_argument('--cards-per-page', type=int, default=25)
+    Parser.add_argument('--baseline-max', type=int, default=10000,
+                        help='largest card count for the quadratic baseline')
+    Args = Parser.parse_args()
+
+    print('%-9s %9s %10s %10s %9s' % ('path', 'cards', 'seconds', 'peak MiB', 'rows'))
+    for NumberOfCards in Args.cards:
+        Runs = [('columnar', ColumnarAssembly)]
+        if NumberOfCards <= Args.baseline_max:
+            Runs.insert(0, ('append', OldAssembly))
+        else:
+            print('%-9s %9d %10s' % ('append', NumberOfCards, 'skipped'))
+        for Name, Assembly in Runs:
+            Seconds, Peak, Rows = Measure(Assembly, NumberOfCards, Args.cards_per_page)
+            print('%-9s %9d %10.3f %10.1f %9d' % (Name, NumberOfCards, Seconds, Peak, Rows))
+
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Size of the result DataFrame in memory, as CSV and as Parquet, and the time
+to build it, with and without the compact mode (categorical columns, JobLink
+split into LinkDomain and LinkPath). Rows are synthetic extracted rows.
+    python -m Benchmarks.CompactBenchmark --cards 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+from time import perf_counter
+from Utility.ColumnBatch import ColumnBatch
+from Utility.CompactFrame import WriteParquet, ReadParquet, ExpandLinks
+from Benchmarks.AssemblyBenchmark import SyntheticPages, COLUMNS
+
+
+def Measure(Batch, Compact, Directory):
+    start = perf_counter()
+    Frame = Batch.ToDataFrame(Compact)
+    Build = perf_counter() - start
+    Memory = Frame.memory_usage(deep=True).sum()
+    CSV = os.path.join(Directory, 'Results.csv')
+    ExpandLinks(Frame).to_csv(CSV, index=False)
+    Parquet = os.path.join(Directory, 'Results.parquet')
+    WriteParquet(Frame, Parquet)
+    start = perf_counter()
+    ReadParquet(Parquet)
+    Read = perf_counter() - start
+    return Build, Memory, os.path.getsize(CSV), os.path.getsize(Parquet), Read
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--cards', type=int, nargs='+', default=[100000, 1000000])
+    Args = Parser.parse_args()
+
+    print('%10s %-8s %9s %11s %9s %12s %9s' % ('rows', 'mode', 'build s', 'memory MiB', 'csv MiB', 'parquet MiB',
+                                             'read s'))
+    with tempfile.TemporaryDirectory() as Directory:
+        for Cards in Args.cards:
+            Batch = ColumnBatch(COLUMNS)
+            for Page in SyntheticPages(Cards, 25):
+                for Row in Page:
+                    Batch.AppendRow(Row)
+            for Compact in (False, True):
+                Build, Memory, CSV, Parquet, Read = Measure(Batch, Compact, Directory)
+                print('%10d %-8s %9.3f %11.2f %9.2f %12.2f %9.3f' % (
+                    Cards, 'compact' if Compact else 'plain', Build, Memory / 2 ** 20, CSV / 2 ** 20,
+                    Parquet / 2 ** 20, Read))
+
+
+if __name__ == '__main__':
+    Main()
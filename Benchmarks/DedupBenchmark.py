@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""
+Throughput and accuracy of the duplicate index (DuplicateIndex) on synthetic
+Job posts: distinct posts (seniority, role and specialty, company and city),
+seniority variants of them (same role, specialty, company and city, other
+seniority: distinct Job posts, not duplicates), twins of them (same title,
+company and city on the same platform under another link: distinct Job
+posts, e.g. two openings), re-posts of them as another platform lists them
+(abbreviated title, legal suffix of the company, former name of the city,
+punctuation) and re-lists of any row (same link, with tracking parameters).
+Rows are checked in pages of 25, the time per row is reported per slice of
+the rows to show that it does not grow with the index, and the all pairs
+comparison is timed on the first rows for reference.
+    python -m Benchmarks.DedupBenchmark --rows 100000 --duplicates 0.3 --variants 0.2 --twins 0.05
+"""
+import argparse
+import random
+from time import perf_counter
+from Utility.ColumnBatch import ColumnBatch
+from Utility.DuplicateIndex import DuplicateIndex
+from Utility.JobStore import NormalizeLink
+
+SENIORITY = ['', 'Junior', 'Senior', 'Lead', 'Principal', 'Staff', 'Associate']
+ROLES = ['Software Engineer', 'Data Scientist', 'Product Manager', 'DevOps Engineer', 'Data Analyst',
+         'QA Engineer', 'Frontend Developer', 'Backend Developer', 'Machine Learning Engineer', 'Designer']
+SPECIALTIES = ['', 'Python', 'Java', 'Payments', 'Platform', 'Growth', 'Search', 'Mobile', 'Cloud', 'Security']
+CITIES = ['Bengaluru', 'Mumbai', 'Pune', 'Hyderabad', 'Chennai', 'Gurugram', 'Delhi', 'Kolkata', 'Noida',
+          'Ahmedabad']
+# Spellings of the re-posts
+ABBREVIATIONS = {'Senior': 'Sr.', 'Junior': 'Jr', 'Engineer': 'Engg', 'Developer': 'Dev', 'Manager': 'Mgr',
+                 'Associate': 'Assoc'}
+FORMER_NAMES = {'Bengaluru': 'Bangalore', 'Mumbai': 'Bombay', 'Chennai': 'Madras', 'Gurugram': 'Gurgaon',
+                'Kolkata': 'Calcutta', 'Delhi': 'New Delhi'}
+SUFFIXES = [' Inc.', ' Pvt Ltd', ' LLC', ' Private Limited', ' Corporation']
+COLUMNS = ['JobLink', 'CompanyName', 'JobTitle', 'JobLocation']
+
+
+def Repost(Rng, Title, Company, City):
+    """
+    Returns a post as another platform lists it
+    """
+    Title = ' '.join(ABBREVIATIONS.get(Word, Word) if Rng.random() < 0.5 else Word for Word in Title.split())
+    if Rng.random() < 0.5:
+        Title = Title.upper() if Rng.random() < 0.5 else Title + ','
+    if Rng.random() < 0.5:
+        Company += Rng.choice(SUFFIXES)
+    if City in FORMER_NAMES and Rng.random() < 0.5:
+        City = FORMER_NAMES[City]
+    return Title, Company, City + ', India'
+
+
+def Variant(Rng, Title, Company, City, Distinct):
+    """
+    Returns a distinct post with the same title but its seniority, at the
+    same company and city, None if they are all taken
+    """
+    Words = Title.split()
+    Base = ' '.join(Words[1:]) if Words[0] in SENIORITY else Title
+    for Seniority in Rng.sample(SENIORITY, len(SENIORITY)):
+        Key = (' '.join(Word for Word in (Seniority, Base) if Word), Company, City)
+        if Key not in Distinct:
+            return Key
+    return None
+
+
+def Platform(Link):
+    return 'Indeed' if 'indeed.com' in Link else 'LinkedIn'
+
+
+def SyntheticPosts(Rows, Duplicates, Variants=0.0, Twins=0.0, Relists=0.0, Seed=1):
+    """
+    Returns the rows and, per row, the row it duplicates or None
+    :param Variants share of the distinct rows that are a seniority variant of
+    a previous distinct row
+    :param Twins share of the distinct rows that are a twin of a previous
+    distinct row
+    :param Relists share of the rows that are a re-list of a previous row
+    """
+    Rng = random.Random(Seed)
+    Companies = ['Company%d' % Number for Number in range(max(Rows // 20, 10))]
+    Posts, Originals, Distinct, Firsts = [], [], set(), []
+    for Index in range(Rows):
+        if Posts and Rng.random() < Relists:
+            Relisted = Rng.randrange(len(Posts))
+            Original = Relisted if Originals[Relisted] is None else Originals[Relisted]
+            Link = Posts[Relisted][0]
+            Link += ('&' if '?' in Link else '?') + 'utm_source=relist%d' % Index
+            Posts.append((Link,) + Posts[Relisted][1:])
+            Originals.append(Original)
+            continue
+        if Posts and Rng.random() < Duplicates:
+            Original = Rng.randrange(len(Posts))
+            while Originals[Original] is not None:
+                Original = Originals[Original]
+            Title, Company, City = Repost(Rng, *Posts[Original][1:])
+            Posts.append(('https://www.indeed.com/viewjob?jk=%d' % Index, Title, Company, City))
+            Originals.append(Original)
+            continue
+        if Firsts and Rng.random() < Twins:
+            Posts.append(('https://www.linkedin.com/jobs/view/%d' % Index,) + Posts[Rng.choice(Firsts)][1:])
+            Firsts.append(Index)
+            Originals.append(None)
+            continue
+        Key = None
+        if Firsts and Rng.random() < Variants:
+            Key = Variant(Rng, *Posts[Rng.choice(Firsts)][1:], Distinct)
+        while Key is None:
+            Title = ' '.join(Word for Word in (Rng.choice(SENIORITY), Rng.choice(ROLES), Rng.choice(SPECIALTIES))
+                             if Word)
+            Key = (Title, Rng.choice(Companies), Rng.choice(CITIES))
+            if Key in Distinct:
+                Key = None
+        Distinct.add(Key)
+        Firsts.append(Index)
+        Posts.append(('https://www.linkedin.com/jobs/view/%d' % Index,) + Key)
+        Originals.append(None)
+    return Posts, Originals
+
+
+def Pages(Posts, CardsPerPage=25):
+    for First in range(0, len(Posts), CardsPerPage):
+        Batch = ColumnBatch(COLUMNS)
+        for Link, Title, Company, City in Posts[First:First + CardsPerPage]:
+            Batch.AppendRow({'JobLink': Link, 'CompanyName': Company, 'JobTitle': Title, 'JobLocation': City})
+        yield Batch
+
+
+def AllPairs(Posts, Threshold):
+    """
+    Reference: every post compared to all the previous distinct ones
+    """
+    Kept, Links = [], set()
+    for Link, Title, Company, City in Posts:
+        Scope, Tokens = DuplicateIndex.Key(Title, Company, City)
+        if NormalizeLink(Link) in Links or any(
+                Source != Platform(Link) and Other == Scope and DuplicateIndex.Similarity(Tokens, Words) >= Threshold
+                for Source, Other, Words in Kept):
+            continue
+        Kept.append((Platform(Link), Scope, Tokens))
+        Links.add(NormalizeLink(Link))
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--rows', type=int, default=100000)
+    Parser.add_argument('--duplicates', type=float, default=0.3, help='share of the rows that are re-posts')
+    Parser.add_argument('--variants', type=float, default=0.2,
+                        help='share of the distinct rows that are seniority variants of another')
+    Parser.add_argument('--twins', type=float, default=0.05,
+                        help='share of the distinct rows that are twins of another on the same platform')
+    Parser.add_argument('--relists', type=float, default=0.05, help='share of the rows listed again')
+    Parser.add_argument('--slices', type=int, default=5)
+    Parser.add_argument('--all-pairs', type=int, default=10000, help='rows of the all pairs reference')
+    Parser.add_argument('--threshold', type=float, default=0.8)
+    Args = Parser.parse_args()
+
+    Posts, Originals = SyntheticPosts(Args.rows, Args.duplicates, Args.variants, Args.twins, Args.relists)
+    Index = DuplicateIndex(Threshold=Args.threshold)
+    Found, Slice, SliceStart = [], max(Args.rows // Args.slices, 1), perf_counter()
+    Start = SliceStart
+    print('%10s %12s' % ('rows', 'us per row'))
+    for Batch in Pages(Posts):
+        Found.extend(Index.MarkSeen(Batch, [Platform(Link) for Link in Batch.Data['JobLink']]))
+        if len(Found) % Slice < 25 and len(Found) >= Slice:
+            Now = perf_counter()
+            print('%10d %12.1f' % (len(Found), (Now - SliceStart) / Slice * 1e6))
+            SliceStart = Now
+    Total = perf_counter() - Start
+
+    # A re-post of a post with twins duplicates any of them
+    Links = {Post[0]: Position for Position, Post in enumerate(Posts)}
+    Same = {}
+    for Position, Original in enumerate(Originals):
+        if Original is None:
+            Same.setdefault(Posts[Position][1:], Position)
+    Actual = sum(Original is not None for Original in Originals)
+    Correct = sum(Match is not None and Original is not None and
+                  Same[Posts[Links[Match]][1:]] == Same[Posts[Original][1:]]
+                  for Match, Original in zip(Found, Originals))
+    Reported = sum(Match is not None for Match in Found)
+    Dropped = sum(Match is not None and Original is None for Match, Original in zip(Found, Originals))
+    print('rows %d, duplicates %d, found %d, correct %d (precision %.3f, recall %.3f), '
+          'distinct rows dropped %d' % (len(Posts), Actual, Reported, Correct, Correct / max(Reported, 1),
+                                        Correct / max(Actual, 1), Dropped))
+    print('index: %.2f s, %.1f us per row, %s' % (Total, Total / len(Posts) * 1e6, Index.Stats()))
+
+    Sample = Posts[:Args.all_pairs]
+    Start = perf_counter()
+    AllPairs(Sample, Args.threshold)
+    Seconds = perf_counter() - Start
+    print('all pairs on %d rows: %.2f s, %.1f us per row' % (len(Sample), Seconds, Seconds / len(Sample) * 1e6))
+
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Distributed scrape through an SQLite work queue: a coordinator publishes the
+pages, worker processes lease and scrape them. One more worker crashes
+after leasing its pages, which are scraped again once their lease expires.
+Compared with a single JobListing.SendRequests of the same pages.
+    python -m Benchmarks.DistributedBenchmark --pages 200 --workers 4
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import tempfile
+from time import perf_counter
+from ListingImplementation.JobListing import JobListing
+from ListingImplementation.DistributedListing import QueueWorker, Coordinator
+from TaskExecutor.WorkQueue import SQLiteWorkQueue
+from Benchmarks.StubServer import StubServer
+
+
+def Work(Path, LeaseSeconds, Crash):
+    Worker = QueueWorker(SQLiteWorkQueue(Path, LeaseSeconds))
+    if Crash:
+        Worker.Queue.Lease(Worker.Name, Worker.BatchSize)
+        os._exit(1)
+    # Until terminated: the pages of the crashed worker come back later
+    with contextlib.redirect_stdout(io.StringIO()):
+        Worker.Run(Idle=0.2)
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--pages', type=int, default=200)
+    Parser.add_argument('--workers', type=int, default=4, help='worker processes')
+    Parser.add_argument('--latency', type=float, default=0.05, help='seconds per request of the stub')
+    Parser.add_argument('--lease', type=float, default=3.0, help='lease seconds of the queue')
+    Args = Parser.parse_args()
+    Query = {'LinkedIn': [{'SearchQuery': 'Python', 'NumberOfPages': Args.pages}]}
+
+    with StubServer(Args.latency, NoiseBlocks=0) as Server, tempfile.TemporaryDirectory() as Directory:
+        Listing = JobListing(['LinkedIn'])
+        Server.PointReader(Listing.readers['LinkedIn'], 'LinkedIn')
+        start = perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            Rows = len(Listing.SendRequests(Query))
+        print('single listing      %8.2f s %8d rows' % (perf_counter() - start, Rows))
+        Listing.Close()
+
+        Path = os.path.join(Directory, 'WorkQueue.db')
+        Queue = SQLiteWorkQueue(Path, Args.lease)
+        Coordinate = Coordinator(Queue)
+        Listing = JobListing(['LinkedIn'])
+        Server.PointReader(Listing.readers['LinkedIn'], 'LinkedIn')
+        start = perf_counter()
+        Batch = Coordinate.Submit(Listing, Query)
+        Context = multiprocessing.get_context('spawn')
+        Workers = [Context.Process(target=Work, args=(Path, Args.lease, Index == 0))
+                   for Index in range(Args.workers + 1)]
+        for Process in Workers:
+            Process.start()
+        Counts = Coordinate.Wait(Batch, Interval=0.5, Report=False)
+        Seconds = perf_counter() - start
+        Results = Coordinate.Results(Batch)
+        for Process in Workers:
+            Process.terminate()
+            Process.join()
+        print('%d workers + 1 crash %8.2f s %8d rows %6d unique links, %d pages done, %d failed' % (
+            Args.workers, Seconds, len(Results), Results['JobLink'].nunique(), Counts['done'], Counts['failed']))
+        Queue.Close()
+
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Scrape of a stub job board sending its pages at a limited bandwidth, with the
+whole body downloaded and with EarlyStop (download stopped once the result
+list is closed), uncompressed and gzipped. Reports the pages per second, the
+mean time per page (time to first byte and download), and the mean body and
+wire bytes per page from StageStats.
+    python -m Benchmarks.EarlyStopBenchmark --pages 20 --noise 2000 --bandwidth 2000000
+"""
+import argparse
+import contextlib
+import io
+from time import perf_counter
+from ListingImplementation.JobListing import JobListing
+from Benchmarks.StubServer import StubServer
+
+
+def Run(Args, Executor, Compress, EarlyStop):
+    with StubServer(Args.latency, NoiseBlocks=Args.noise, Compress=Compress, Bandwidth=Args.bandwidth) as Server:
+        Listing = JobListing(['LinkedIn', 'Indeed'], Executor=Executor, MaxConcurrency=Args.concurrency,
+                             EarlyStop=EarlyStop)
+        for Platform, Reader in Listing.readers.items():
+            Server.PointReader(Reader, Platform)
+        Query = {'SearchQuery': 'software engineer', 'NumberOfPages': Args.pages}
+        start = perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            Rows = Listing.SendRequests({'LinkedIn': [Query], 'Indeed': [Query]})
+        Seconds = perf_counter() - start
+        Stats = Listing.StageStats()
+        Listing.Close()
+
+    def Mean(Stage):
+        return sum(Stats[Platform][Stage]['Mean'] for Platform in ('LinkedIn', 'Indeed')) / 2
+
+    print('%-8s %-5s %-6s %8.2f %6d %8.1f %10.1f %9.1f %9.1f' % (
+        Executor, 'gzip' if Compress else 'none', 'early' if EarlyStop else 'full', Seconds, len(Rows),
+        2 * Args.pages / Seconds, (Mean('TTFB') + Mean('Download')) * 1000, Mean('Bytes') / 1024,
+        Mean('WireBytes') / 1024))
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--pages', type=int, default=20, help='pages per platform')
+    Parser.add_argument('--noise', type=int, default=2000, help='noise blocks around the result list')
+    Parser.add_argument('--bandwidth', type=float, default=2e6, help='bytes per second of each page')
+    Parser.add_argument('--latency', type=float, default=0.02, help='seconds per request of the stub')
+    Parser.add_argument('--concurrency', type=int, default=5)
+    Args = Parser.parse_args()
+
+    print('%-8s %-5s %-6s %8s %6s %8s %10s %9s %9s' % ('executor', 'enc', 'body', 'seconds', 'rows', 'pages/s',
+                                                      'ms/page', 'body KiB', 'wire KiB'))
+    for Executor in ('thread', 'async'):
+        for Compress in (False, True):
+            for EarlyStop in (False, True):
+                Run(Args, Executor, Compress, EarlyStop)
+
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Detail page enrichment of the Job posts of a stub job board: the serial
+enrichment (every JobLink fetched one after the other once the scrape is
+done), against JobListing(DetailConcurrency=N) fetching the detail pages of
+the new Job posts behind the result pages. A second SendRequests shows that
+the Job posts already enriched are not fetched again.
+    python -m Benchmarks.EnrichBenchmark --pages 10 --latency 0.05 --concurrency 4 16
+"""
+import argparse
+import contextlib
+import io
+from time import perf_counter
+import requests
+from ListingImplementation.JobListing import JobListing
+from ReaderImplementation.DetailReader import DetailReader
+from Benchmarks.StubServer import StubServer
+
+PLATFORMS = ['LinkedIn', 'Indeed']
+
+
+def Scrape(Server, Args, DetailConcurrency):
+    Listing = JobListing(PLATFORMS, DetailConcurrency=DetailConcurrency)
+    for Platform, Reader in Listing.readers.items():
+        Server.PointReader(Reader, Platform)
+    Query = {'SearchQuery': 'software engineer', 'NumberOfPages': Args.pages}
+    with contextlib.redirect_stdout(io.StringIO()):
+        Rows = Listing.SendRequests({Platform: [Query] for Platform in PLATFORMS})
+    return Listing, Rows
+
+
+def Serial(Server, Args):
+    """
+    Baseline: scrape, then fetch and parse every Job link in turn
+    """
+    start = perf_counter()
+    Listing, Rows = Scrape(Server, Args, 0)
+    Readers = {Platform: DetailReader(Reader) for Platform, Reader in Listing.readers.items()}
+    Session = requests.Session()
+    Details = []
+    for Link in Rows['JobLink']:
+        Reader = Readers['LinkedIn' if '/jobs/view/' in Link else 'Indeed']
+        Details.append(Reader.ExtractDetails(Session.get(Link).content))
+    Listing.Close()
+    return perf_counter() - start, len(Rows), sum(Detail['Description'] is not None for Detail in Details)
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--pages', type=int, default=10, help='result pages per platform')
+    Parser.add_argument('--latency', type=float, default=0.05, help='seconds per request of the stub')
+    Parser.add_argument('--concurrency', type=int, nargs='+', default=[4, 16], help='DetailConcurrency')
+    Args = Parser.parse_args()
+
+    print('%-14s %9s %6s %9s %12s %13s' % ('enrichment', 'seconds', 'rows', 'enriched', 'detail p50', 'again seconds'))
+    with StubServer(Args.latency, NoiseBlocks=200, Details=True) as Server:
+        Seconds, Rows, Enriched = Serial(Server, Args)
+        print('%-14s %9.2f %6d %9d %12s %13s' % ('serial', Seconds, Rows, Enriched, '-', '-'))
+        for Concurrency in Args.concurrency:
+            start = perf_counter()
+            Listing, Frame = Scrape(Server, Args, Concurrency)
+            Seconds = perf_counter() - start
+            Stats = Listing.StageStats()
+            Latency = max(Stats[Platform + 'Details']['TTFB']['p50'] for Platform in PLATFORMS)
+            # Same Job posts again: nothing left to enrich
+            start = perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                Listing.SendRequests({Platform: [{'SearchQuery': 'software engineer', 'NumberOfPages': Args.pages}]
+                                      for Platform in PLATFORMS})
+            Again = perf_counter() - start
+            Listing.Close()
+            print('%-14s %9.2f %6d %9d %12.3f %13.2f' % ('concurrent %d' % Concurrency, Seconds, len(Frame),
+                                                         Frame['Description'].notna().sum(), Latency, Again))
+
+
+if __name__ == '__main__':
+    Main()
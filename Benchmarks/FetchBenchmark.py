@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Compares the thread pool and the asyncio executors of JobListing against the
+local stub server, with the connections opened and reused by the sessions. Run from the repository root:
+    python -m Benchmarks.FetchBenchmark --pages 200 --latency 0.2
+"""
+import argparse
+import contextlib
+import io
+from time import perf_counter
+from ListingImplementation.JobListing import JobListing
+from Benchmarks.StubServer import StubServer
+
+
+def RunOnce(Server, Pages, Executor, MaxConcurrency, PerSiteConcurrency=None):
+    """
+    Scrape the given number of pages from each platform of the stub server
+    :returns (seconds taken, number of rows, connection counters)
+    """
+    Listing = JobListing(website=['LinkedIn', 'Indeed'], Executor=Executor,
+                         MaxConcurrency=MaxConcurrency, PerSiteConcurrency=PerSiteConcurrency)
+    for Platform, Reader in Listing.readers.items():
+        Server.PointReader(Reader, Platform)
+
+    Query = {'SearchQuery': 'software engineer', 'JobLocation': 'India', 'NumberOfPages': Pages}
+    start = perf_counter()
+    # SendRequests prints the URL list and timings, keep the report readable.
+    with contextlib.redirect_stdout(io.StringIO()):
+        Result = Listing.SendRequests({'LinkedIn': [Query], 'Indeed': [Query]})
+    Seconds = perf_counter() - start
+    Stats = Listing.ConnectionStats()
+    Listing.Close()
+    Totals = {Key: sum(Counter[Key] for Counter in Stats.values()) for Key in ('Handshakes', 'Reused')}
+    return Seconds, len(Result), Totals
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--pages', type=int, default=100, help='pages per platform')
+    Parser.add_argument('--latency', type=float, default=0.2, help='stub server latency in seconds')
+    Parser.add_argument('--cards', type=int, default=25, help='job cards per page')
+    Parser.add_argument('--noise', type=int, default=0, help='unrelated blocks around the result list')
+    Parser.add_argument('--concurrency', type=int, default=200, help='concurrency of the async executor')
+    Args = Parser.parse_args()
+
+    Runs = [('thread', 5, None),
+            ('thread', Args.concurrency, None),
+            ('async', Args.concurrency, Args.concurrency // 2)]
+
+    with StubServer(Latency=Args.latency, CardsPerPage=Args.cards, NoiseBlocks=Args.noise) as Server:
+        print('%-8s %12s %10s %8s %10s %11s %8s' % ('executor', 'concurrency', 'seconds', 'rows', 'pages/s',
+                                                   'handshakes', 'reused'))
+        for Executor, MaxConcurrency, PerSiteConcurrency in Runs:
+            Seconds, Rows, Totals = RunOnce(Server, Args.pages, Executor, MaxConcurrency, PerSiteConcurrency)
+            print('%-8s %12d %10.3f %8d %10.1f %11d %8d' % (Executor, MaxConcurrency, Seconds, Rows,
+                                                          2 * Args.pages / Seconds,
+                                                          Totals['Handshakes'], Totals['Reused']))
+
+
+if __name__ == '__main__':
+    Main()
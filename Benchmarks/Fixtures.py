@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Synthetic job board pages for the benchmarks. The markup follows the tags and
+classes declared in ReaderImplementation/Constants/*ReaderConstants.py, so
+a JobReader for the same platform parses them the same way it parses the
+real pages.
+"""
+import random
+
+TITLES = ['Software Engineer', 'Frontend Developer', 'Backend Developer', 'Data Engineer',
+          'Site Reliability Engineer', 'QA Engineer', 'Product Manager', 'Data Scientist']
+
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark Industries',
+             'Wayne Enterprises', 'Soylent', 'Tyrell', 'Cyberdyne']
+
+LOCATIONS = ['Bengaluru, Karnataka, India', 'Pune, Maharashtra, India', 'Hyderabad, Telangana, India',
+             'Chennai, Tamil Nadu, India', 'Gurugram, Haryana, India', 'Remote']
+
+POSTED = ['Just posted', '1 day ago', '2 days ago', '3 days ago', '1 week ago', '30+ days ago']
+
+# Roughly what surrounds the result list on a real page: navigation, scripts
+# and filters that the reader never looks at.
+NOISE_BLOCK = '<div class="filter-pill"><button class="filter-button" type="button">' \
+              '<span class="label">Filter %d</span></button></div>'
+
+NOISE_SCRIPT = '<script type="text/javascript">window.__state__ = {"k%d": "%s"};</script>'
+
+
+def LinkedInCard(Index, Rand):
+    """
+    Returns the markup of a single LinkedIn search card
+    """
+    return ('<li><div class="base-card base-search-card">'
+            '<a class="base-card__full-link" href="https://linkedin.com/jobs/view/%d"></a>'
+            '<div class="base-search-card__info">'
+            '<h3 class="base-search-card__title">%s</h3>'
+            '<h4 class="base-search-card__subtitle"><a class="hidden-nested-link">%s</a></h4>'
+            '<div class="base-search-card__metadata">'
+            '<span class="job-search-card__location">%s</span>'
+            '<time class="job-search-card__listdate" datetime="2021-10-01">%s</time>'
+            '</div></div></div></li>') % (Index, Rand.choice(TITLES), Rand.choice(COMPANIES),
+                                           Rand.choice(LOCATIONS), Rand.choice(POSTED))
+
+
+def IndeedCard(Index, Rand):
+    """
+    Returns the markup of a single Indeed search card
+    """
+    Title = Rand.choice(TITLES)
+    return ('<a class="tapItem fs-unmask result" href="/rc/clk?jk=%x&amp;fccid=%d">'
+            '<div class="slider_container"><div class="slider_item">'
+            '<h2 class="jobTitle"><span title="%s">%s</span></h2>'
+            '<div class="heading6 company_location">'
+            '<span class="companyName">%s</span>'
+            '<div class="companyLocation">%s</div></div>'
+            '<span class="date">%s</span>'
+            '</div></div></a>') % (Index, Index, Title, Title, Rand.choice(COMPANIES),
+                                   Rand.choice(LOCATIONS), Rand.choice(POSTED))
+
+
+CARD_BUILDERS = {
+    'LinkedIn': ('<ul class="jobs-search__results-list">', LinkedInCard, '</ul>'),
+    'Indeed': ('<div id="mosaic-provider-jobcards" class="mosaic mosaic-provider-jobcards">', IndeedCard, '</div>'),
+}
+
+
+def GeneratePage(Platform, NumberOfCards=25, PageNumber=0, NoiseBlocks=200, Seed=None):
+    """
+    Generate a synthetic search result page for the platform
+    :param Platform LinkedIn or Indeed
+    :param NumberOfCards number of job cards in the result list
+    :param PageNumber page offset, used to keep job ids unique across pages
+    :param NoiseBlocks number of unrelated blocks before and after the result list
+    :param Seed seed for the random choice of titles, companies etc.
+    :returns page as UTF-8 encoded bytes
+    """
+    if Platform not in CARD_BUILDERS:
+        raise ValueError('No fixture available for platform {}'.format(Platform))
+
+    Rand = random.Random(PageNumber if Seed is None else Seed)
+    ListOpen, Card, ListClose = CARD_BUILDERS[Platform]
+    First = PageNumber * NumberOfCards
+
+    Parts = ['<!DOCTYPE html><html><head><title>%s jobs</title>' % Platform]
+    Parts += [NOISE_SCRIPT % (Index, 'x' * 64) for Index in range(NoiseBlocks // 4)]
+    Parts.append('</head><body><header><nav>')
+    Parts += [NOISE_BLOCK % Index for Index in range(NoiseBlocks // 2)]
+    Parts.append('</nav></header><main>')
+    Parts.append(ListOpen)
+    Parts += [Card(First + Index, Rand) for Index in range(NumberOfCards)]
+    Parts.append(ListClose)
+    Parts.append('</main><footer>')
+    Parts += [NOISE_BLOCK % Index for Index in range(NoiseBlocks // 2)]
+    Parts.append('</footer></body></html>')
+    return ''.join(Parts).encode('UTF-8')
+
+
+SENIORITY = ['Entry level', 'Associate', 'Mid-Senior level', 'Director']
+
+SALARIES = ['INR 6,00,000 - 9,00,000/yr', 'INR 12,00,000 - 18,00,000/yr', 'INR 25,000 - 40,000 a month']
+
+PARAGRAPH = '<p>We are looking for engineers to build and run the services behind %s. You will work with ' \
+            'product, design and data teams, own features end to end and review the code of your peers.</p>'
+
+DETAIL_BUILDERS = {
+    'LinkedIn': lambda Description, Salary, Seniority: (
+        '<section class="show-more-less-html"><div class="show-more-less-html__markup">%s</div></section>'
+        '<div class="salary compensation__salary">%s</div>'
+        '<ul class="description__job-criteria-list"><li class="description__job-criteria-item">'
+        '<h3 class="description__job-criteria-subheader">Seniority level</h3>'
+        '<span class="description__job-criteria-text">%s</span></li></ul>') % (Description, Salary, Seniority),
+    'Indeed': lambda Description, Salary, Seniority: (
+        '<div class="jobsearch-JobMetadataHeader-item"><span class="icl-u-xs-mr--xs">%s</span></div>'
+        '<div id="jobDescriptionText" class="jobsearch-jobDescriptionText">%s</div>') % (Salary, Description),
+}
+
+
+def GenerateDetailPage(Platform, JobId, NoiseBlocks=200):
+    """
+    Generate a synthetic detail page of a Job post, following the DETAIL_*
+    constants of the platform
+    :param JobId id of the Job post in its link
+    :returns page as UTF-8 encoded bytes
+    """
+    if Platform not in DETAIL_BUILDERS:
+        raise ValueError('No fixture available for platform {}'.format(Platform))
+
+    Rand = random.Random(JobId)
+    Description = ''.join(PARAGRAPH % Rand.choice(COMPANIES) for Index in range(Rand.randint(4, 12)))
+    Parts = ['<!DOCTYPE html><html><head><title>%s job %s</title>' % (Platform, JobId)]
+    Parts += [NOISE_SCRIPT % (Index, 'x' * 64) for Index in range(NoiseBlocks // 4)]
+    Parts.append('</head><body><main>')
+    Parts.append(DETAIL_BUILDERS[Platform](Description, Rand.choice(SALARIES), Rand.choice(SENIORITY)))
+    Parts.append('</main><footer>')
+    Parts += [NOISE_BLOCK % Index for Index in range(NoiseBlocks // 2)]
+    Parts.append('</footer></body></html>')
+    return ''.join(Parts).encode('UTF-8')
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Parse throughput of the JobReader parser backends on the saved fixture pages
+(Benchmarks/Pages/<Platform>.html). Every backend is checked to return the
+same rows as html.parser before it is timed.
+    python -m Benchmarks.ParseBenchmark --repeat 50
+"""
+import argparse
+import os
+from time import perf_counter
+from ReaderImplementation.JobReader import JobReader, PARSERS
+from Benchmarks.Fixtures import GeneratePage
+
+PAGES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Pages')
+
+
+def FixturePage(Platform):
+    """
+    Returns the saved fixture page of the platform, saving a generated one if
+    it does not exist yet
+    """
+    Path = os.path.join(PAGES_DIRECTORY, '%s.html' % Platform)
+    if not os.path.exists(Path):
+        os.makedirs(PAGES_DIRECTORY, exist_ok=True)
+        with open(Path, 'wb') as File:
+            File.write(GeneratePage(Platform))
+    with open(Path, 'rb') as File:
+        return File.read()
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--platforms', nargs='+', default=['LinkedIn', 'Indeed'])
+    Parser.add_argument('--parsers', nargs='+', default=list(PARSERS))
+    Parser.add_argument('--repeat', type=int, default=50, help='parses of each page per backend')
+    Args = Parser.parse_args()
+
+    print('%-9s %-15s %10s %10s %12s' % ('platform', 'parser', 'pages/s', 'MB/s', 'cards/s'))
+    for Platform in Args.platforms:
+        Page = FixturePage(Platform)
+        Expected = JobReader(Platform).ListContents(Page)
+        for ParserName in Args.parsers:
+            try:
+                Reader = JobReader(Platform, ParserName)
+            except ImportError as Error:
+                print('%-9s %-15s %s' % (Platform, ParserName, Error))
+                continue
+            if not Reader.ListContents(Page).equals(Expected):
+                raise AssertionError('%s parser returns different rows for %s' % (ParserName, Platform))
+
+            start = perf_counter()
+            for _ in range(Args.repeat):
+                Reader.ExtractContents(Page)
+            Seconds = perf_counter() - start
+            print('%-9s %-15s %10.1f %10.2f %12.0f' % (Platform, ParserName, Args.repeat / Seconds,
+                                                      Args.repeat * len(Page) / Seconds / 1e6,
+                                                      Args.repeat * len(Expected) / Seconds))
+
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""
+Parse throughput of the pipeline executor with 1 to N parser processes, on
+fixture pages. The pages are fetched from memory so that only the parsing is
+measured; the scaling is bounded by the number of cores of the machine.
+    python -m Benchmarks.ParsePoolBenchmark --pages 400 --processes 1 2 4 8 16
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from ReaderImplementation.JobReader import JobReader
+from ReaderImplementation.ReaderWorker import InitReaders, ExtractInWorker
+from TaskExecutor.TaskExecutor import MapPipelinedRequest
+from Benchmarks.Fixtures import GeneratePage
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--pages', type=int, default=400)
+    Parser.add_argument('--cards', type=int, default=25, help='Job posts per page')
+    Parser.add_argument('--noise', type=int, default=200, help='unrelated blocks per page')
+    Parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    Parser.add_argument('--parser', default='html.parser', help='JobReader parser backend')
+    Args = Parser.parse_args()
+
+    Platforms = ['LinkedIn', 'Indeed']
+    Configs = [JobReader(Platform, Args.parser).Config() for Platform in Platforms]
+    Pages = {(Platforms[Page % 2], Page): GeneratePage(Platforms[Page % 2], Args.cards, Page, Args.noise)
+             for Page in range(Args.pages)}
+
+    def Fetch(Params):
+        return Params[0], Pages[Params]
+
+    print('%d cores' % os.cpu_count())
+    print('%-10s %10s %10s %12s %9s' % ('processes', 'rows', 'seconds', 'pages/s', 'speedup'))
+    Baseline = None
+    for Processes in Args.processes:
+        with ProcessPoolExecutor(Processes, initializer=InitReaders, initargs=(Configs,)) as Pool:
+            # Start the workers before timing
+            list(Pool.map(ExtractInWorker, Platforms, [Pages[Platforms[0], 0], Pages[Platforms[1], 1]]))
+            start = perf_counter()
+            Results = MapPipelinedRequest(Fetch, ExtractInWorker, list(Pages), Pool, MaxWorkers=Processes)
+            Seconds = perf_counter() - start
+        Baseline = Baseline or Seconds
+        print('%-10d %10d %10.2f %12.1f %8.2fx' % (Processes, sum(len(Rows) for Rows in Results), Seconds,
+                                                   Args.pages / Seconds, Baseline / Seconds))
+
+
+if __name__ == '__main__':
+    Main()
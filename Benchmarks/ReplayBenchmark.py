@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Scrape of the stub job board recorded into a FetchArchive, then replayed
+offline (the stub is shut down) by each executor, at full speed and at the
+recorded latency. Reports the pages per second and whether the replayed rows
+are the recorded ones, and the size of the archive against the bodies.
+With --archive, an archive recorded elsewhere is replayed instead: its pages
+are sent again with MapPages.
+    python -m Benchmarks.ReplayBenchmark --pages 20 --latency 0.2
+    python -m Benchmarks.ReplayBenchmark --archive Scrape.archive
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+from time import perf_counter
+from ListingImplementation.JobListing import JobListing
+from Utility.FetchArchive import FetchArchive
+from Benchmarks.StubServer import StubServer
+
+PLATFORMS = ['LinkedIn', 'Indeed']
+
+
+def Sorted(Rows):
+    return Rows.sort_values(list(Rows.columns)).reset_index(drop=True)
+
+
+def PointReaders(Listing, Base):
+    """
+    Point the readers to the stub server at Base, as StubServer.PointReader,
+    so that the replayed URLs are the recorded ones
+    """
+    for Platform, Reader in Listing.readers.items():
+        Reader.SearchURL = '%s/%s/jobs' % (Base, Platform)
+        Reader.DomainName = Base
+
+
+def Record(Args, Path):
+    """
+    Scrape the stub into the archive at Path
+    :returns (rows, pages, seconds, base URL of the stub)
+    """
+    Archive = FetchArchive(Path, 'record')
+    with StubServer(Args.latency, NoiseBlocks=Args.noise) as Server:
+        Listing = JobListing(PLATFORMS, MaxConcurrency=Args.concurrency, Archive=Archive)
+        for Platform, Reader in Listing.readers.items():
+            Server.PointReader(Reader, Platform)
+        Query = {'SearchQuery': 'software engineer', 'NumberOfPages': Args.pages}
+        start = perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            Rows = Listing.SendRequests({Platform: [Query] for Platform in PLATFORMS})
+        Seconds = perf_counter() - start
+        Listing.Close()
+        Base = Server.URL()
+    Archive.Close()
+    return Rows, 2 * Args.pages, Seconds, Base
+
+
+def Replay(Args, Path, Executor, Latency, Send, Base=None):
+    """
+    Replay the archive at Path with an executor
+    :param Send function sending the requests of a JobListing
+    :param Base base URL of the recorded stub server, defaults to None (the
+    readers keep the URLs of the websites)
+    :returns (rows, failed pages, seconds)
+    """
+    Archive = FetchArchive(Path, 'replay', Latency=Latency)
+    Listing = JobListing(PLATFORMS, Executor=Executor, MaxConcurrency=Args.concurrency, Archive=Archive)
+    if Base is not None:
+        PointReaders(Listing, Base)
+    start = perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        Rows = Send(Listing, Archive)
+    Seconds = perf_counter() - start
+    Failed = len(Listing.Failures)
+    Listing.Close()
+    Archive.Close()
+    return Rows, Failed, Seconds
+
+
+def ReplayStub(Args, Path):
+    Rows, Pages, Seconds, Base = Record(Args, Path)
+    Archive = FetchArchive(Path, 'replay')
+    Stats = Archive.Stats()
+    Archive.Close()
+    print('recorded %d pages (%d rows) in %.2f s: bodies %.1f KiB, archive %.1f KiB (%.1fx smaller)\n' % (
+        Pages, len(Rows), Seconds, Stats['Bytes'] / 1024, Stats['ArchiveBytes'] / 1024,
+        Stats['Bytes'] / Stats['ArchiveBytes']))
+    Query = {'SearchQuery': 'software engineer', 'NumberOfPages': Args.pages}
+    Recorded = Sorted(Rows)
+
+    def Send(Listing, Archive):
+        return Listing.SendRequests({Platform: [Query] for Platform in PLATFORMS})
+
+    print('%-8s %-8s %8s %6s %8s %7s %9s' % ('executor', 'replay', 'seconds', 'rows', 'pages/s', 'failed',
+                                             'same rows'))
+    for Executor in ('thread', 'async', 'pipeline'):
+        for Latency in (False, True):
+            Rows, Failed, Seconds = Replay(Args, Path, Executor, Latency, Send, Base)
+            print('%-8s %-8s %8.3f %6d %8.1f %7d %9s' % (
+                Executor, 'recorded' if Latency else 'full', Seconds, len(Rows), Pages / Seconds, Failed,
+                Sorted(Rows).equals(Recorded)))
+
+
+def ReplayArchive(Args):
+    Archive = FetchArchive(Args.archive, 'replay')
+    Stats = Archive.Stats()
+    Archive.Close()
+    print('%d records of %d pages: bodies %.1f KiB, archive %.1f KiB\n' % (
+        Stats['Records'], Stats['URLs'], Stats['Bytes'] / 1024, Stats['ArchiveBytes'] / 1024))
+
+    def Send(Listing, Archive):
+        return Listing.MapPages([(Listing.readers[Platform], URL) for Platform, URL in Archive.URLs()
+                                 if Platform in Listing.readers])
+
+    print('%-8s %-8s %8s %6s %8s %7s' % ('executor', 'replay', 'seconds', 'rows', 'pages/s', 'failed'))
+    for Executor in ('thread', 'async', 'pipeline'):
+        for Latency in (False, True):
+            Pages, Failed, Seconds = Replay(Args, Args.archive, Executor, Latency, Send)
+            print('%-8s %-8s %8.3f %6d %8.1f %7d' % (
+                Executor, 'recorded' if Latency else 'full', Seconds, sum(len(Rows) for Rows in Pages),
+                Stats['URLs'] / Seconds, Failed))
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--pages', type=int, default=20, help='pages per platform')
+    Parser.add_argument('--noise', type=int, default=200, help='noise blocks around the result list')
+    Parser.add_argument('--latency', type=float, default=0.2, help='seconds per request of the stub')
+    Parser.add_argument('--concurrency', type=int, default=5)
+    Parser.add_argument('--archive', help='archive to replay instead of recording the stub')
+    Args = Parser.parse_args()
+
+    if Args.archive is not None:
+        ReplayArchive(Args)
+        return
+    with tempfile.TemporaryDirectory() as Directory:
+        ReplayStub(Args, os.path.join(Directory, 'Scrape.archive'))
+
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Scrape of a stub job board answering some requests 500 and some others much
+later than the rest, without retries, with retries, and with retries and
+hedged requests. Reports the failed pages and the p50/p99 latency of a page.
+    python -m Benchmarks.RetryBenchmark --pages 400 --error-rate 0.1 --tail-rate 0.03
+"""
+import argparse
+import contextlib
+import io
+import logging
+from time import perf_counter
+from ListingImplementation.JobListing import JobListing
+from Utility.RetryPolicy import RetryPolicy
+from Benchmarks.StubServer import StubServer
+
+
+def Quantile(Values, Quantile):
+    Values = sorted(Values)
+    return Values[min(len(Values) - 1, int(Quantile * len(Values)))]
+
+
+def Run(Args, Executor, Name, Policy):
+    with StubServer(Args.latency, NoiseBlocks=0, ErrorRate=Args.error_rate,
+                    TailRate=Args.tail_rate, TailLatency=Args.tail_latency) as Server:
+        Listing = JobListing(['LinkedIn'], Executor=Executor, MaxConcurrency=Args.concurrency, Retry=Policy)
+        Server.PointReader(Listing.readers['LinkedIn'], 'LinkedIn')
+        Pages, Rows = [], 0
+        start = perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Pages are sent one query at a time, to measure the latency of each
+            for Page in range(Args.pages // Args.concurrency):
+                Sent = perf_counter()
+                Result = Listing.SendRequests({'LinkedIn': [{'SearchQuery': 'Python %d' % Page,
+                                                             'NumberOfPages': Args.concurrency}]})
+                Pages.append(perf_counter() - Sent)
+                Rows += len(Result)
+        Seconds = perf_counter() - start
+        Stats = Listing.RetryStats()
+        Listing.Close()
+    print('%-8s %-14s %8.2f %7d %7d %8d %7d %9.3f %9.3f' % (Executor, Name, Seconds, Rows, Stats['Failures'],
+                                                           Stats['Retries'], Stats['Hedged'],
+                                                           Quantile(Pages, 0.5), Quantile(Pages, 0.99)))
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--pages', type=int, default=400)
+    Parser.add_argument('--latency', type=float, default=0.02, help='seconds per request of the stub')
+    Parser.add_argument('--error-rate', type=float, default=0.1, help='fraction of the requests answered 500')
+    Parser.add_argument('--tail-rate', type=float, default=0.03, help='fraction of the slow requests')
+    Parser.add_argument('--tail-latency', type=float, default=1.0, help='extra seconds of the slow requests')
+    Parser.add_argument('--concurrency', type=int, default=5, help='MaxConcurrency, pages sent at once')
+    Args = Parser.parse_args()
+    # The empty bodies of the 500 answers are logged by the parser
+    logging.getLogger('bs4.dammit').setLevel(logging.ERROR)
+
+    print('%-8s %-14s %8s %7s %7s %8s %7s %9s %9s' % ('executor', 'policy', 'seconds', 'rows', 'failed',
+                                                     'retries', 'hedged', 'p50 wave', 'p99 wave'))
+    for Executor in ('thread', 'async'):
+        for Name, Policy in (('no retry', RetryPolicy(Retries=0)),
+                             ('retry', RetryPolicy(BackoffBase=0.05)),
+                             ('retry+hedge', RetryPolicy(BackoffBase=0.05, Hedge=True, HedgeSamples=100))):
+            Run(Args, Executor, Name, Policy)
+
+
+if __name__ == '__main__':
+    Main()
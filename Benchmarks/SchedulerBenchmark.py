@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Simulated week of recurring queries with different churn (new Job posts per
+hour), scraped by the Scheduler and by a fixed cadence (cron) spending about
+the same number of pages. The job board is simulated: an incremental scrape
+sends pages in waves of two until a page has no new Job posts, and the Job
+posts beyond the last page are missed for good.
+    python -m Benchmarks.SchedulerBenchmark --budget 30 --days 7
+"""
+import argparse
+import math
+from ListingImplementation.Scheduler import Scheduler, ScheduledQuery
+from ReaderImplementation.JobReader import JobReader
+
+# Job posts per page of the simulated board, as RESULTS_PER_PAGE of LinkedIn
+JOBS_PER_PAGE = 25
+WAVE_SIZE = 2
+
+
+class SimulatedBoard:
+    """
+    Job board where new Job posts of each query appear at a constant rate
+    """
+    def __init__(self, Churn):
+        self.Churn = Churn
+        self.Seen = {Query: 0 for Query in Churn}
+        self.Missed = 0
+        self.Now = 0.0
+
+    def Scrape(self, Query, MaxPages):
+        """
+        Incremental scrape of the query
+        :returns (new Job posts found, pages sent)
+        """
+        Posted = int(self.Churn[Query] * self.Now / 3600)
+        New = Posted - self.Seen[Query]
+        Pages = min(MaxPages, int(math.ceil((New // JOBS_PER_PAGE + 1) / WAVE_SIZE)) * WAVE_SIZE)
+        Found = min(New, Pages * JOBS_PER_PAGE)
+        self.Missed += New - Found
+        self.Seen[Query] = Posted
+        return Found, Pages
+
+
+class SimulatedListing:
+    """
+    Stands for a JobListing with a SeenIndex, scraping the SimulatedBoard
+    """
+    def __init__(self, Board):
+        self.Board = Board
+        self.SeenIndex = True
+        self.readers = {'LinkedIn': JobReader('LinkedIn')}
+        self.LastPages = 0
+
+    def SendRequests(self, KeywordParams, Incremental=False):
+        (Platform, [Query]), = KeywordParams.items()
+        Found, self.LastPages = self.Board.Scrape(Query['SearchQuery'], Query['NumberOfPages'])
+        return [None] * Found
+
+
+def Simulate(Churn, Args):
+    Board = SimulatedBoard(Churn)
+    Queries = [ScheduledQuery('LinkedIn', {'SearchQuery': Name, 'NumberOfPages': Args.pages}, Args.freshness)
+               for Name in Churn]
+    Schedule = Scheduler(SimulatedListing(Board), Queries, Args.budget, Clock=lambda: Board.Now)
+    while Board.Now < Args.days * 86400:
+        if Schedule.RunOnce() is None:
+            Board.Now += 60
+    return sum(Query.NewJobs for Query in Queries), sum(Query.Pages for Query in Queries), Board.Missed
+
+
+def Cron(Churn, Args, Interval):
+    Board = SimulatedBoard(Churn)
+    Found = Pages = 0
+    while Board.Now < Args.days * 86400:
+        Board.Now += Interval
+        for Name in Churn:
+            New, Sent = Board.Scrape(Name, Args.pages)
+            Found, Pages = Found + New, Pages + Sent
+    return Found, Pages, Board.Missed
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--budget', type=float, default=30, help='pages per hour')
+    Parser.add_argument('--days', type=float, default=7)
+    Parser.add_argument('--pages', type=int, default=10, help='NumberOfPages of each query')
+    Parser.add_argument('--freshness', type=float, default=86400, help='freshness target of each query (s)')
+    Args = Parser.parse_args()
+    Churn = {'python remote': 200, 'frontend pune': 60, 'data engineer': 20, 'sre chennai': 4,
+             'qa gurugram': 1, 'director hyderabad': 0.2}
+
+    Found, Pages, Missed = Simulate(Churn, Args)
+    print('%-22s %8s %8s %8s %10s' % ('', 'found', 'missed', 'pages', 'new/page'))
+    print('%-22s %8d %8d %8d %10.2f' % ('scheduler', Found, Missed, Pages, Found / Pages))
+    # Cron at the shortest interval not spending more pages than the scheduler
+    for Minutes in range(5, 24 * 60, 5):
+        CronFound, CronPages, CronMissed = Cron(Churn, Args, Minutes * 60)
+        if CronPages <= Pages:
+            print('%-22s %8d %8d %8d %10.2f' % ('cron every %d min' % Minutes, CronFound, CronMissed, CronPages,
+                                               CronFound / CronPages))
+            break
+
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Bulk upsert throughput of the JobStore, and the time of its indexed queries.
+Each round upserts the given number of synthetic Job posts in batches, half
+of them already stored by the previous round (as on an hourly re-scrape).
+    python -m Benchmarks.StoreBenchmark --rows 1000000 --batch 10000
+"""
+import argparse
+import os
+import tempfile
+from time import perf_counter
+from Utility.ColumnBatch import ColumnBatch
+from Utility.JobStore import JobStore
+from Benchmarks.Fixtures import TITLES, COMPANIES, LOCATIONS, POSTED
+
+
+def SyntheticBatch(First, Size):
+    """
+    ColumnBatch of Size Job posts, with ids starting at First
+    """
+    Batch = ColumnBatch(['JobLink', 'CompanyName', 'JobTitle', 'JobLocation', 'TimePosted'])
+    Ids = range(First, First + Size)
+    Batch.Data['JobLink'] = ['https://linkedin.com/jobs/view/%d?refId=abc&trackingId=%d' % (Id, Id) for Id in Ids]
+    Batch.Data['CompanyName'] = [COMPANIES[Id % len(COMPANIES)] for Id in Ids]
+    Batch.Data['JobTitle'] = [TITLES[Id % len(TITLES)] for Id in Ids]
+    Batch.Data['JobLocation'] = [LOCATIONS[Id % len(LOCATIONS)] for Id in Ids]
+    Batch.Data['TimePosted'] = [POSTED[Id % len(POSTED)] for Id in Ids]
+    Batch.Size = Size
+    return Batch
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--rows', type=int, default=1000000, help='rows upserted per round')
+    Parser.add_argument('--batch', type=int, default=10000, help='rows per upsert')
+    Parser.add_argument('--rounds', type=int, default=2)
+    Args = Parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as Directory:
+        Store = JobStore(os.path.join(Directory, 'Jobs.db'))
+        print('%-6s %10s %10s %12s %10s' % ('round', 'rows', 'seconds', 'rows/s', 'stored'))
+        for Round in range(Args.rounds):
+            First = Round * Args.rows // 2
+            start = perf_counter()
+            for Offset in range(0, Args.rows, Args.batch):
+                Store.Upsert(SyntheticBatch(First + Offset, min(Args.batch, Args.rows - Offset)), 'LinkedIn')
+            Seconds = perf_counter() - start
+            print('%-6d %10d %10.2f %12.0f %10d' % (Round, Args.rows, Seconds, Args.rows / Seconds, len(Store)))
+
+        for Name, Query in [('company', {'Company': COMPANIES[0], 'Limit': 1000}),
+                            ('location', {'Location': 'Pune', 'Limit': 1000}),
+                            ('company+location', {'Company': COMPANIES[1], 'Location': 'Remote'}),
+                            ('since', {'Since': 0, 'Limit': 1000})]:
+            start = perf_counter()
+            Rows = len(Store.Query(**Query))
+            print('query %-17s %8d rows %8.1f ms' % (Name, Rows, (perf_counter() - start) * 1000))
+        Store.Close()
+
+
+if __name__ == '__main__':
+    Main()
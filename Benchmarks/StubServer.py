@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+"""
+Local stub job board used by the benchmarks. Serves synthetic result pages
+from Benchmarks.Fixtures at /<Platform>/jobs, so a JobReader can be pointed
+to it by replacing its SearchURL and DomainName.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import random
+from collections import Counter
+from urllib.parse import urlparse, parse_qs
+from threading import Thread, Lock
+from time import sleep, monotonic
+from zlib import crc32
+import gzip
+from Benchmarks.Fixtures import GeneratePage, GenerateDetailPage
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler serving generated pages. Settings are read from the server
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        Server = self.server
+        Parsed = urlparse(self.path)
+        Parts = [Part for Part in Parsed.path.split('/') if Part]
+        Platform = Parts[0] if Parts else ''
+        Query = parse_qs(Parsed.query)
+        PageNumber = int(Query.get('start', Query.get('pageNums', ['0']))[0] or 0)
+        # Detail pages, at the Job links of the cards
+        JobId = None
+        if Parsed.path.startswith('/jobs/view/'):
+            Platform, JobId = 'LinkedIn', Parts[-1]
+        elif Parsed.path == '/rc/clk':
+            Platform, JobId = 'Indeed', Query.get('jk', [''])[0]
+
+        Throttled, InFlight = Server.Admit(Platform)
+        try:
+            if Throttled:
+                self.send_response(429)
+                self.send_header('Retry-After', '1')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if Server.Capacity is not None and InFlight > 2 * Server.Capacity:
+                self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            # Over capacity the requests queue up: the latency grows with the
+            # requests in flight
+            Latency = Server.Latency
+            if Server.Capacity is not None and InFlight > Server.Capacity:
+                Latency *= InFlight / Server.Capacity
+            if random.random() < Server.TailRate:
+                Latency += Server.TailLatency
+            if Latency > 0:
+                sleep(Latency)
+            if random.random() < Server.ErrorRate:
+                Server.Count(500)
+                self.send_response(500)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.__SendPage__(Platform, PageNumber, JobId)
+        finally:
+            Server.Leave(Platform)
+
+    def __SendPage__(self, Platform, PageNumber, JobId=None):
+        try:
+            Body = self.server.Page(Platform, PageNumber) if JobId is None else \
+                self.server.DetailPage(Platform, JobId)
+        except ValueError:
+            self.send_error(404)
+            return
+
+        ETag = '"%08x"' % crc32(Body)
+        if self.headers.get('If-None-Match') == ETag:
+            self.send_response(304)
+            self.send_header('ETag', ETag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        Compressed = self.server.Compress and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if Compressed:
+            Body = self.server.Compressed(Platform, PageNumber, JobId)
+        self.send_response(200)
+        self.send_header('ETag', ETag)
+        self.send_header('Content-Type', 'text/html; charset=UTF-8')
+        if Compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(Body)))
+        self.end_headers()
+        try:
+            Bandwidth = self.server.Bandwidth
+            if Bandwidth is None:
+                self.wfile.write(Body)
+                return
+            # Sent in chunks, at Bandwidth bytes per second
+            for Start in range(0, len(Body), 16384):
+                Chunk = Body[Start:Start + 16384]
+                self.wfile.write(Chunk)
+                sleep(len(Chunk) / Bandwidth)
+        except ConnectionError:
+            # The client gave up on the request (e.g. a hedged one)
+            self.close_connection = True
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionError:
+            # The client closed the connection, e.g. once it had the part of
+            # the page it needed
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """
+    Threaded HTTP server on localhost serving synthetic job pages
+    :param Latency seconds to wait before answering each request
+    :param CardsPerPage number of job cards on each page
+    :param NoiseBlocks number of unrelated blocks around the result list
+    :param Port port to listen to, defaults to a free port
+    :param RateLimit requests per second accepted for each platform, the
+    others are answered 429 with a Retry-After, defaults to None (no limit)
+    :param Capacity requests of a platform handled in parallel without delay:
+    above it the latency grows with the load, and above twice of it the
+    requests are answered 503, defaults to None (no limit)
+    :param ErrorRate fraction of the requests answered 500
+    :param TailRate fraction of the requests delayed by TailLatency more
+    :param TailLatency extra seconds of the slow requests
+    :param Compress gzip the pages for the clients accepting it
+    :param Bandwidth bytes per second each page is sent at, defaults to None
+    (as fast as possible)
+    :param Details point the LinkedIn Job links of the result pages to the
+    stub, which serves the detail pages of all the Job links
+    """
+    def __init__(self, Latency=0.0, CardsPerPage=25, NoiseBlocks=200, Port=0, RateLimit=None, Capacity=None,
+                 ErrorRate=0.0, TailRate=0.0, TailLatency=0.0, Compress=False, Bandwidth=None, Details=False):
+        self.Server = ThreadingHTTPServer(('127.0.0.1', Port), StubRequestHandler)
+        self.Server.daemon_threads = True
+        self.Server.request_queue_size = 1024
+        self.Server.Latency = Latency
+        self.Server.Page = self.Page
+        self.Server.Admit = self.Admit
+        self.Server.Leave = self.Leave
+        self.Server.Capacity = Capacity
+        self.Server.ErrorRate = ErrorRate
+        self.Server.TailRate = TailRate
+        self.Server.TailLatency = TailLatency
+        self.Server.Count = self.Count
+        self.Server.Compress = Compress
+        self.Server.Bandwidth = Bandwidth
+        self.Server.Compressed = self.Compressed
+        self.Server.DetailPage = self.DetailPage
+        self.Details = Details
+        self.RateLimit = RateLimit
+        self.StateLock = Lock()
+        self.InFlight = Counter()
+        # Start of the current one second window and requests accepted in it,
+        # per platform
+        self.Windows = {}
+        # Answers per status, 200 counts every page served (304 included)
+        self.Statuses = Counter()
+        self.CardsPerPage = CardsPerPage
+        self.NoiseBlocks = NoiseBlocks
+        self.Pages = {}
+        self.CompressedPages = {}
+        self.Thread = None
+
+    def Page(self, Platform, PageNumber):
+        """
+        Returns the (cached) page body for the platform and page number
+        """
+        Key = (Platform, PageNumber)
+        if Key not in self.Pages:
+            Body = GeneratePage(Platform, self.CardsPerPage, PageNumber, self.NoiseBlocks)
+            if self.Details:
+                # Relative, the reader prefixes them with the DomainName of the stub
+                Body = Body.replace(b'https://linkedin.com/jobs/view/', b'/jobs/view/')
+            self.Pages[Key] = Body
+        return self.Pages[Key]
+
+    def DetailPage(self, Platform, JobId):
+        """
+        Returns the (cached) detail page body of a Job post
+        """
+        Key = (Platform, 'Detail', JobId)
+        if Key not in self.Pages:
+            self.Pages[Key] = GenerateDetailPage(Platform, JobId, self.NoiseBlocks)
+        return self.Pages[Key]
+
+    def Compressed(self, Platform, PageNumber, JobId=None):
+        """
+        Returns the (cached) gzipped body of a result or detail page
+        """
+        Key = (Platform, PageNumber, JobId)
+        if Key not in self.CompressedPages:
+            Body = self.Page(Platform, PageNumber) if JobId is None else self.DetailPage(Platform, JobId)
+            self.CompressedPages[Key] = gzip.compress(Body, mtime=0)
+        return self.CompressedPages[Key]
+
+    def Admit(self, Platform):
+        """
+        Account a new request of the platform
+        :returns (whether it is over the rate limit, requests in flight)
+        """
+        with self.StateLock:
+            self.InFlight[Platform] += 1
+            Throttled = False
+            if self.RateLimit is not None:
+                Now = monotonic()
+                Start, Count = self.Windows.get(Platform, (Now, 0))
+                if Now - Start >= 1:
+                    Start, Count = Now, 0
+                Throttled = Count >= self.RateLimit
+                self.Windows[Platform] = (Start, Count + (not Throttled))
+            InFlight = self.InFlight[Platform]
+            if Throttled:
+                self.Statuses[429] += 1
+            elif self.Server.Capacity is not None and InFlight > 2 * self.Server.Capacity:
+                self.Statuses[503] += 1
+            else:
+                self.Statuses[200] += 1
+            return Throttled, InFlight
+
+    def Count(self, Status):
+        """
+        Count an answer served with an error status instead of the page
+        """
+        with self.StateLock:
+            self.Statuses[Status] += 1
+            self.Statuses[200] -= 1
+
+    def Leave(self, Platform):
+        with self.StateLock:
+            self.InFlight[Platform] -= 1
+
+    def URL(self, Platform=''):
+        """
+        Returns the base URL of the server, or the search URL of the platform
+        """
+        Host, Port = self.Server.server_address[:2]
+        return 'http://%s:%d%s' % (Host, Port, '/%s/jobs' % Platform if Platform else '')
+
+    def PointReader(self, Reader, Platform):
+        """
+        Redirect a JobReader to the stub server instead of the real job board
+        """
+        Reader.SearchURL = self.URL(Platform)
+        Reader.DomainName = self.URL()
+
+    def __enter__(self):
+        self.Thread = Thread(target=self.Server.serve_forever, daemon=True)
+        self.Thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.Server.shutdown()
+        self.Server.server_close()
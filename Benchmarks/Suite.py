@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+"""
+Benchmark suite: end to end SendRequests throughput against the stub job
+board, ListContents parse rate on the saved fixture pages, memory peak of a
+scrape and result assembly. Results are written as JSON (with the commit,
+versions and machine) so that runs can be compared across versions:
+    python -m Benchmarks.Suite --output Before.json
+    python -m Benchmarks.Suite --output After.json --compare Before.json
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tracemalloc
+from datetime import datetime, timezone
+from time import perf_counter
+from ListingImplementation.JobListing import JobListing
+from ReaderImplementation.JobReader import JobReader, PARSERS
+from Benchmarks.StubServer import StubServer
+from Benchmarks.ParseBenchmark import FixturePage
+from Benchmarks.AssemblyBenchmark import SyntheticPages, ColumnarAssembly
+
+# Metrics where a lower value is better, the others are throughputs
+LOWER_IS_BETTER = ('seconds', 'peak_mib')
+
+
+def Scrape(Server, Args, Executor):
+    """
+    SendRequests of Args.pages pages per platform from the stub server
+    :returns metrics of the scrape
+    """
+    Listing = JobListing(['LinkedIn', 'Indeed'], Executor=Executor, MaxConcurrency=Args.concurrency)
+    for Platform, Reader in Listing.readers.items():
+        Server.PointReader(Reader, Platform)
+    Query = {'SearchQuery': 'software engineer', 'NumberOfPages': Args.pages}
+    start = perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        Rows = Listing.SendRequests({'LinkedIn': [Query], 'Indeed': [Query]})
+    Seconds = perf_counter() - start
+    Failed = len(Listing.Failures)
+    Listing.Close()
+    return {'seconds': Seconds, 'pages_per_s': 2 * Args.pages / Seconds, 'rows_per_s': len(Rows) / Seconds,
+            'failed_pages': Failed}
+
+
+def ScrapeMemory(Server, Args):
+    """
+    Peak of the memory allocated by a thread pool scrape (tracemalloc)
+    """
+    gc.collect()
+    tracemalloc.start()
+    Metrics = Scrape(Server, Args, 'thread')
+    Peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'peak_mib': Peak / (1 << 20), 'rows_per_s': Metrics['rows_per_s']}
+
+
+def Parse(Platform, Parser, Repeat):
+    """
+    ListContents rate of a reader on the saved page of the platform
+    """
+    Page = FixturePage(Platform)
+    Reader = JobReader(Platform, Parser)
+    Rows = len(Reader.ListContents(Page))
+    start = perf_counter()
+    for _ in range(Repeat):
+        Reader.ListContents(Page)
+    Seconds = perf_counter() - start
+    return {'pages_per_s': Repeat / Seconds, 'mb_per_s': Repeat * len(Page) / Seconds / 1e6,
+            'rows_per_s': Repeat * Rows / Seconds}
+
+
+def Assemble(Cards):
+    """
+    Time and memory peak of the columnar assembly of Cards rows
+    """
+    Pages = list(SyntheticPages(Cards, 25))
+    gc.collect()
+    tracemalloc.start()
+    start = perf_counter()
+    ColumnarAssembly(Pages)
+    Seconds = perf_counter() - start
+    Peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': Seconds, 'peak_mib': Peak / (1 << 20), 'rows_per_s': Cards / Seconds}
+
+
+def Median(Runs):
+    """
+    Median of each metric over the runs of a case
+    """
+    return {Metric: statistics.median(Run[Metric] for Run in Runs) for Metric in Runs[0]}
+
+
+def Metadata(Args):
+    """
+    Commit, versions and machine of the run
+    """
+    try:
+        Commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        Commit = None
+    Versions = {}
+    for Module in ('pandas', 'bs4', 'lxml', 'requests', 'aiohttp'):
+        try:
+            Versions[Module] = getattr(__import__(Module), '__version__', None)
+        except ImportError:
+            Versions[Module] = None
+    return {'commit': Commit, 'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count(), 'versions': Versions, 'arguments': vars(Args)}
+
+
+def Compare(Results, Baseline):
+    """
+    Print the change of each metric against a previous run
+    """
+    print('\n%-36s %-14s %12s %12s %8s' % ('case', 'metric', 'baseline', 'current', 'change'))
+    for Case, Metrics in Results.items():
+        for Metric, Value in Metrics.items():
+            Previous = Baseline['results'].get(Case, {}).get(Metric)
+            if Previous is None or Metric == 'failed_pages':
+                continue
+            Change = (Value - Previous) / Previous * 100 if Previous else 0.0
+            # Positive when better
+            Change = -Change if Metric in LOWER_IS_BETTER else Change
+            print('%-36s %-14s %12.3f %12.3f %+7.1f%%' % (Case, Metric, Previous, Value, Change))
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--pages', type=int, default=50, help='pages per platform of the scrapes')
+    Parser.add_argument('--latency', type=float, default=0.05, help='stub server latency in seconds')
+    Parser.add_argument('--cards', type=int, default=25, help='job cards per page')
+    Parser.add_argument('--noise', type=int, default=200, help='unrelated blocks around the result list')
+    Parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of the requests answered 500')
+    Parser.add_argument('--concurrency', type=int, default=10)
+    Parser.add_argument('--parse-repeat', type=int, default=30, help='parses of each page per backend')
+    Parser.add_argument('--assembly-cards', type=int, default=200000)
+    Parser.add_argument('--repeat', type=int, default=3, help='runs of each case, the median is kept')
+    Parser.add_argument('--output', default='BenchmarkResults.json', help='JSON file of the results')
+    Parser.add_argument('--compare', help='JSON file of a previous run to compare with')
+    Args = Parser.parse_args()
+    # Empty bodies of the 500 answers are logged by the parser
+    logging.getLogger('bs4.dammit').setLevel(logging.ERROR)
+
+    Cases = []
+    with StubServer(Args.latency, Args.cards, Args.noise, ErrorRate=Args.error_rate) as Server:
+        for Executor in ('thread', 'async', 'pipeline'):
+            Cases.append(('sendrequests.%s' % Executor, lambda Executor=Executor: Scrape(Server, Args, Executor)))
+        Cases.append(('memory.sendrequests.thread', lambda: ScrapeMemory(Server, Args)))
+        for Platform in ('LinkedIn', 'Indeed'):
+            for ParserName in PARSERS:
+                Cases.append(('listcontents.%s.%s' % (Platform, ParserName),
+                              lambda Platform=Platform, ParserName=ParserName:
+                              Parse(Platform, ParserName, Args.parse_repeat)))
+        Cases.append(('assembly.columnar', lambda: Assemble(Args.assembly_cards)))
+
+        Results = {}
+        for Name, Case in Cases:
+            try:
+                Results[Name] = Median([Case() for _ in range(Args.repeat)])
+            except ImportError as Error:
+                print('%-36s skipped: %s' % (Name, Error), file=sys.stderr)
+                continue
+            print('%-36s %s' % (Name, '  '.join('%s=%.3f' % Metric for Metric in Results[Name].items())))
+
+    Report = {'meta': Metadata(Args), 'results': Results}
+    with open(Args.output, 'w') as File:
+        json.dump(Report, File, indent=2)
+    print('Results written to %s' % Args.output)
+
+    if Args.compare is not None:
+        with open(Args.compare) as File:
+            Compare(Results, json.load(File))
+
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""
+Scrape of a throttling stub job board (429 over its rate limit, latency
+growing and 503 over its capacity), without and with the RateLimiter. Pages
+answered 429/503 come back empty, so the rows scraped per second is the
+effective throughput.
+    python -m Benchmarks.ThrottleBenchmark --pages 100 --rate 20 --capacity 4
+"""
+import argparse
+import contextlib
+import io
+import logging
+from time import perf_counter
+from ListingImplementation.JobListing import JobListing
+from Utility.RateLimiter import RateLimiter
+from Benchmarks.StubServer import StubServer
+
+
+def Run(Args, Executor, Limiter):
+    with StubServer(Args.latency, RateLimit=Args.rate, Capacity=Args.capacity, NoiseBlocks=0) as Server:
+        Listing = JobListing(['LinkedIn'], Executor=Executor, MaxConcurrency=Args.concurrency,
+                             RateLimiter=Limiter)
+        Reader = Listing.readers['LinkedIn']
+        Server.PointReader(Reader, 'LinkedIn')
+        # Pace at the rate of the stub instead of the one of the real website
+        Reader.RateLimit, Reader.RateBurst = Args.rate, Args.rate
+        start = perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            Rows = Listing.SendRequests({'LinkedIn': [{'SearchQuery': 'Python', 'NumberOfPages': Args.pages}]})
+        Seconds = perf_counter() - start
+        Stats = Listing.RateLimitStats()
+        Listing.Close()
+    Limit = list(Stats.values())[0]['Limit'] if Stats else '-'
+    print('%-8s %-9s %8.2f %8d %10.1f %6d %6d %7s' % (Executor, 'aimd' if Limiter else 'none', Seconds, len(Rows),
+                                                     len(Rows) / Seconds, Server.Statuses[429],
+                                                     Server.Statuses[503], Limit))
+
+
+def Main():
+    Parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    Parser.add_argument('--pages', type=int, default=100)
+    Parser.add_argument('--latency', type=float, default=0.05, help='seconds per request of the stub')
+    Parser.add_argument('--rate', type=int, default=20, help='requests per second accepted by the stub')
+    Parser.add_argument('--capacity', type=int, default=4, help='requests in flight served without delay')
+    Parser.add_argument('--concurrency', type=int, default=16, help='MaxConcurrency of the listing')
+    Args = Parser.parse_args()
+    # The empty bodies of the 429/503 answers are logged by the parser
+    logging.getLogger('bs4.dammit').setLevel(logging.ERROR)
+
+    print('%-8s %-9s %8s %8s %10s %6s %6s %7s' % ('executor', 'limiter', 'seconds', 'rows', 'rows/s',
+                                                 '429', '503', 'limit'))
+    for Executor in ('thread', 'async'):
+        for Limiter in (None, RateLimiter(MaxConcurrency=Args.concurrency)):
+            Run(Args, Executor, Limiter)
+
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+"""
+Distributed scraping: a JobListing publishes the pages of its queries to a
+shared work queue (JobListing.Publish), QueueWorkers on any number of hosts
+lease them, scrape them and complete them with their rows, and a Coordinator
+follows the progress of the batch and merges its results.
+"""
+import json
+import os
+import socket
+from time import sleep, monotonic
+from ListingImplementation.JobListing import JobListing
+from ReaderImplementation.JobReader import JobReader
+from TaskExecutor.TaskExecutor import MergeResults
+from TaskExecutor.WorkQueue import PENDING, LEASED, DONE, FAILED
+
+class QueueWorker:
+    """
+    Worker scraping the pages of a work queue with a JobListing (its executor,
+    caches, rate limiter and retries). Readers are built from the Config
+    published with each page.
+    :param Queue IWorkQueue to lease the pages from
+    :param Listing JobListing scraping the pages, defaults to a thread pool
+    listing without readers
+    :param Sink ResultSink where the rows of each page completed are written as
+    well, e.g. a StoreSink on a shared JobStore, defaults to None
+    :param Name name of the worker in the queue, defaults to host:pid
+    :param BatchSize pages leased at once, defaults to the MaxConcurrency of
+    the listing. Their lease must be long enough to scrape them all.
+    """
+    def __init__(self, Queue, Listing=None, Sink=None, Name=None, BatchSize=None):
+        self.Queue = Queue
+        self.Listing = Listing if Listing is not None else JobListing(website=[])
+        self.Sink = Sink
+        self.Name = Name if Name is not None else '%s:%d' % (socket.gethostname(), os.getpid())
+        self.BatchSize = BatchSize if BatchSize is not None else self.Listing.MaxConcurrency
+        # Lost: pages scraped after their lease was taken over, their rows are
+        # dropped by the queue
+        self.Counters = {'Completed': 0, 'Failed': 0, 'Lost': 0}
+
+    def __Reader__(self, Task):
+        """
+        Internal method returning the reader of a page, built again when its
+        configuration (e.g. user tags) differs from the one of the listing.
+        The published Config went through JSON (tuples are lists), so is the
+        one of the reader before they are compared.
+        """
+        Reader = self.Listing.readers.get(Task['Platform'])
+        if Reader is None or json.loads(json.dumps(Reader.Config())) != Task['Config']:
+            Previous = Reader
+            Reader = JobReader.FromConfig(Task['Config'])
+            Reader.ParseCache = Previous.ParseCache if Previous is not None else None
+            self.Listing.readers[Task['Platform']] = Reader
+        return Reader
+
+    def RunOnce(self):
+        """
+        Lease a batch of pages and scrape them
+        :returns number of pages leased
+        """
+        Leased = self.Queue.Lease(self.Name, self.BatchSize)
+        if len(Leased) == 0:
+            return 0
+
+        URLParamList = [(self.__Reader__(Task), Task['URL']) for TaskId, Task in Leased]
+        try:
+            Results = self.Listing.MapPages(URLParamList)
+        except Exception as Error:
+            for TaskId, Task in Leased:
+                self.Queue.Fail(TaskId, Error, self.Name)
+            self.Counters['Failed'] += len(Leased)
+            print('Worker {}: batch failed: {}'.format(self.Name, Error))
+            return len(Leased)
+
+        Failed = dict(self.Listing.Failures)
+        for (TaskId, Task), Rows in zip(Leased, Results):
+            if Task['URL'] in Failed:
+                # Given back: another attempt, possibly on another host
+                self.Queue.Fail(TaskId, Failed[Task['URL']], self.Name)
+                self.Counters['Failed'] += 1
+                continue
+            # Written once the queue took the rows: a lost page is written by
+            # the worker that completes it
+            if self.Queue.Complete(TaskId, Rows, self.Name):
+                self.Counters['Completed'] += 1
+                if self.Sink is not None:
+                    self.Sink.Write(Rows)
+            else:
+                self.Counters['Lost'] += 1
+        return len(Leased)
+
+    def Run(self, Idle=1.0, ExitWhenEmpty=False, MaxPages=None):
+        """
+        Scrape the pages of the queue until stopped
+        :param Idle seconds to wait when the queue is empty
+        :param ExitWhenEmpty return as soon as the queue is empty
+        :param MaxPages return after this number of pages, defaults to None
+        :returns number of pages leased
+        """
+        Total = 0
+        while MaxPages is None or Total < MaxPages:
+            Count = self.RunOnce()
+            Total += Count
+            if Count == 0:
+                if ExitWhenEmpty:
+                    break
+                sleep(Idle)
+        return Total
+
+class Coordinator:
+    """
+    Publishes the batches of pages and follows their progress
+    :param Queue IWorkQueue shared with the workers
+    """
+    def __init__(self, Queue):
+        self.Queue = Queue
+
+    def Submit(self, Listing, KeywordParams):
+        """
+        Publish the pages of the keyword parameters
+        :param Listing JobListing with the readers of the platforms
+        :param KeywordParams paramters for sending the requests
+        :returns id of the batch
+        """
+        return Listing.Publish(KeywordParams, self.Queue)
+
+    def Progress(self, Batch):
+        """
+        Returns the number of pages of the batch per state, and their total
+        """
+        Counts = self.Queue.Progress(Batch)
+        Counts['total'] = sum(Counts.values())
+        return Counts
+
+    def Wait(self, Batch, Interval=2.0, Timeout=None, Report=True):
+        """
+        Wait until all the pages of the batch are done or failed
+        :param Interval seconds between two progress checks
+        :param Timeout seconds to wait at most, defaults to None (no limit)
+        :param Report print the progress at each check
+        :returns last progress of the batch
+        """
+        Deadline = monotonic() + Timeout if Timeout is not None else None
+        while True:
+            Counts = self.Progress(Batch)
+            if Report:
+                print('Batch {}: {}/{} done, {} leased, {} pending, {} failed'.format(
+                    Batch, Counts[DONE], Counts['total'], Counts[LEASED], Counts[PENDING], Counts[FAILED]))
+            if Counts[PENDING] + Counts[LEASED] == 0:
+                return Counts
+            if Deadline is not None and monotonic() >= Deadline:
+                return Counts
+            sleep(Interval)
+
+    def Results(self, Batch):
+        """
+        Returns the merged rows of the done pages of the batch, in publication
+        order
+        """
+        return MergeResults(self.Queue.Results(Batch))
+
+    def Failures(self, Batch):
+        """
+        Returns (page, error) of the pages of the batch that failed for good
+        """
+        return self.Queue.Failures(Batch)
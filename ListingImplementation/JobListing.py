@@ -3,70 +3,646 @@ import requests
 import json
 from ReaderImplementation.JobReader import JobReader
 from Utility.HistoryList import HistoryList
-from TaskExecutor.TaskExecutor import SendParallelRequest
+from Utility.SessionPool import SessionPool, Decompressor
+from Utility.SeenIndex import SeenIndex
+from Utility.ColumnBatch import ColumnBatch
+from Utility.RetryPolicy import RetryPolicy, FetchError
+from Utility.ScrapeMetrics import ScrapeMetrics
+from Utility.CompactFrame import ExpandLinks, WriteParquet
+from ReaderImplementation.ReaderWorker import InitReaders, ExtractTimedInWorker
+from ReaderImplementation.ResultListScanner import ResultListScanner
+from ReaderImplementation.DetailReader import DetailReader
+from ReaderImplementation.ExtractionPlan import DETAIL_COLUMNS
+from Utility.DetailStore import DetailStore
+from Utility.JobStore import NormalizeLink
+from TaskExecutor.TaskExecutor import MapParallelRequest, MapAsyncRequest, MergeResults, \
+    StreamParallelRequest, StreamAsyncRequest, MapPipelinedRequest, StreamPipelinedRequest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 import pandas as pd
-from time import time
+import asyncio
+import os
+import zlib
+from threading import Lock
+from time import time, sleep, perf_counter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+EXECUTORS = ('thread', 'async', 'pipeline')
+# Bytes read at once from the body of a page
+CHUNK_SIZE = 16 << 10
+# After an early stop, the rest of a page still downloaded (so that its
+# connection stays alive) when it is known to be smaller than this
+EARLY_STOP_DRAIN = 64 << 10
 
 class JobListing:
     """
     Job listing class to list available Jobs from Multiple sites, default takes linkedin
     as website for Job Scraping
+    :param Executor 'thread' to fetch pages on a thread pool, 'async' to fetch
+    them concurrently on a single event loop (requires aiohttp), or 'pipeline'
+    to fetch them on a thread pool and parse them on a pool of processes
+    :param MaxConcurrency maximum number of requests in flight (threads for the
+    thread pool), defaults to 5
+    :param PerSiteConcurrency maximum number of requests in flight for a single
+    website with the async executor, defaults to MaxConcurrency
+    :param Headers headers sent with every request of the pooled sessions
+    :param Parser parser backend of the readers (see JobReader.PARSERS)
+    :param ResponseCache ResponseCache serving the pages fetched recently,
+    defaults to None (no cache)
+    :param ParseCache ParseCache of the rows extracted from unchanged pages,
+    defaults to None (no cache)
+    :param SeenIndex SeenIndex of the Job links already scraped per query, for
+    the incremental scraping
+    :param WaveSize pages of each query sent at once by the incremental scraping
+    :param Store JobStore where every scraped page is upserted, defaults to None
+    :param ParseProcesses number of parser processes of the pipeline executor,
+    defaults to the number of CPUs. The parse cache is not used by the workers.
+    :param RateLimiter RateLimiter pacing the requests and adapting their
+    concurrency per website, defaults to None. MaxConcurrency stays the upper
+    bound of the requests in flight.
+    :param Retry RetryPolicy of the fetches (timeouts, retries and hedging),
+    defaults to RetryPolicy(). Pages still failing after the retries come back
+    empty and are listed in Failures instead of raising.
+    :param Metrics ScrapeMetrics collecting the timings of the stages of each
+    page (see StageStats), defaults to ScrapeMetrics()
+    :param Profiler ScrapeProfiler sampling every SendRequests, defaults to
+    None (no profiling)
+    :param Compact intern the extracted strings and return compact DataFrames:
+    categorical repetitive columns, and JobLink split into LinkDomain and
+    LinkPath (see Utility.CompactFrame, ExpandLinks rebuilds JobLink)
+    :param Duplicates DuplicateIndex of the Job posts already returned: rows
+    duplicating one of them (the same Job post on another platform, query or
+    page) are dropped after the extraction, defaults to None. They are still
+    upserted into the Store.
+    :param EarlyStop stream the body of each page and stop downloading it once
+    its result list (RESULT_LIST_TAG and RESULT_LIST_CLASS) is closed, the rest
+    of the page is never parsed. The connection is closed, unless what is left
+    is known to be small (EARLY_STOP_DRAIN), defaults to False. Compare the
+    Bytes and WireBytes of StageStats with and without it.
+    :param DetailConcurrency detail pages (JobLink) fetched at once by
+    SendRequests for the Job posts without details yet, on their own threads
+    and connections, while the result pages are still being fetched. Their
+    details (DETAIL_* constants of the readers, see DETAIL_COLUMNS) are added
+    as columns. Defaults to 0 (no details). Failed detail pages are listed in
+    Failures and fetched again by the next SendRequests.
+    :param DetailStore DetailStore of the details already fetched, defaults to
+    an in memory one
+    :param Archive FetchArchive of the answers: in record mode every answer
+    fetched (result and detail pages) is archived, in replay mode the requests
+    are answered from the archive instead of the websites, at full speed or
+    at their recorded latency, without rate limiting nor hedging. The
+    ResponseCache is not used while an archive is attached. Defaults to None
+    (no archive).
+    :param HistoryBytes maximum size of the compressed results of the history
+    kept in memory (see HistoryList), defaults to 32 MiB
+    :param HistorySpillDirectory directory where the results of the history
+    evicted from memory are written, defaults to None (they are dropped)
     """
-    def __init__(self, website=['LinkedIn'], HistorySize=10):
-        self.HistoryList = HistoryList(HistorySize)
+    def __init__(self, website=['LinkedIn'], HistorySize=10, Executor='thread', MaxConcurrency=5,
+                 PerSiteConcurrency=None, Headers=None, Parser='html.parser',
+                 ResponseCache=None, ParseCache=None, SeenIndex=None, WaveSize=2,
+                 Store=None, ParseProcesses=None, RateLimiter=None, Retry=None, Metrics=None,
+                 Profiler=None, Compact=False, Duplicates=None, EarlyStop=False, DetailConcurrency=0,
+                 DetailStore=None, Archive=None, HistoryBytes=32 << 20, HistorySpillDirectory=None):
+        if Executor not in EXECUTORS:
+            raise ValueError('Executor must be one of {}: found {}'.format(EXECUTORS, Executor))
+        if Executor == 'async' and aiohttp is None:
+            raise ImportError('aiohttp is required for the async executor')
+        self.Executor = Executor
+        self.MaxConcurrency = MaxConcurrency
+        self.PerSiteConcurrency = PerSiteConcurrency
+        # Connections per platform: with the thread pool every worker may be
+        # sending to the same website.
+        PoolSize = MaxConcurrency if Executor != 'async' or PerSiteConcurrency is None else PerSiteConcurrency
+        self.Sessions = SessionPool(PoolSize, Headers)
+        self.ResponseCache = ResponseCache
+        self.Loop = None
+        self.SeenIndex = SeenIndex
+        self.WaveSize = WaveSize
+        self.Store = Store
+        self.ParseProcesses = ParseProcesses
+        self.ParserPool, self.ParserConfigs = None, None
+        self.RateLimiter = RateLimiter
+        self.RetryPolicy = Retry if Retry is not None else RetryPolicy()
+        self.Metrics = Metrics if Metrics is not None else ScrapeMetrics()
+        self.Profiler = Profiler
+        self.Compact = Compact
+        self.Duplicates = Duplicates
+        self.EarlyStop = EarlyStop
+        self.DetailConcurrency = DetailConcurrency
+        self.DetailStore = DetailStore
+        # Threads fetching the detail pages, started on first use; detail
+        # readers, (Job link, fetch) by normalized Job link and pages waiting
+        # for their details to be stored, of the running SendRequests (None
+        # out of SendRequests)
+        self.DetailPool = None
+        self.DetailReaders = {}
+        self.DetailFutures = None
+        self.DetailPages = None
+        self.DetailLock = Lock()
+        self.Archive = Archive
+        # When the pages of the running request were handed to the executor
+        self.Queued = perf_counter()
+        # Threads sending the hedged requests, started on first use
+        self.Hedges = None
+        # (QueryURL, FetchError) of the pages that failed in the last request
+        self.Failures = []
+        self.HistoryList = HistoryList(HistorySize, HistoryBytes, HistorySpillDirectory)
         self.readers = {}
         if "LinkedIn" in website:
-            self.readers["LinkedIn"] = JobReader('LinkedIn')
+            self.readers["LinkedIn"] = JobReader('LinkedIn', Parser)
         if "Indeed" in website:
-            self.readers["Indeed"] = JobReader('Indeed')
+            self.readers["Indeed"] = JobReader('Indeed', Parser)
+        for reader in self.readers.values():
+            reader.ParseCache = ParseCache
+            reader.Compact = Compact
         self.QueryResults = None
+        # Number of pages sent by the last SendRequests
+        self.LastPages = 0
+
+    def CreateSession(self, Platform):
+        """
+        Returns the persistent session for the platform, created on first use.
+        All the pages of a platform share its pooled keep-alive connections.
+        :param Platform name of the platform (as passed to the reader)
+        """
+        return self.Sessions.Session(Platform)
+
+    def ConnectionStats(self):
+        """
+        Returns the number of requests, handshakes and reused connections per
+        platform since the listing was created
+        """
+        return self.Sessions.Stats()
+
+    def CacheStats(self):
+        """
+        Returns the hits, misses and bytes saved by the response cache, None if
+        there is no cache
+        """
+        return self.ResponseCache.Stats() if self.ResponseCache is not None else None
+
+    def RateLimitStats(self):
+        """
+        Returns the concurrency limit, latency and responses (healthy,
+        throttled, failed, slow) per website, None if there is no rate limiter
+        """
+        return self.RateLimiter.Stats() if self.RateLimiter is not None else None
+
+    def RetryStats(self):
+        """
+        Returns the number of retries, hedged requests (and the ones won by the
+        hedge) and failed pages
+        """
+        return self.RetryPolicy.Stats()
+
+    def StageStats(self):
+        """
+        Returns per platform and per stage of the pages (URL, QueueWait,
+        Throttle, Connect, TTFB, Download, Parse, Extract, Bytes, WireBytes and
+        Rows; and
+        Assembly for the platform 'All') the count, sum, mean, p50, p95, p99
+        and maximum, since the listing was created
+        """
+        return self.Metrics.Stats()
+
+    def WriteMetrics(self, Path):
+        """
+        Write the stage metrics to a Prometheus text format file
+        """
+        self.Metrics.WritePrometheus(Path)
 
-    def CreateSession(WebsiteParams):
+    def DuplicateStats(self):
         """
-        To create a session for personalized session.
-        :param WebsiteParams parameter for website (to be read thorugh a file
-        for easier)
+        Returns the Job posts checked, duplicates found and Job posts indexed
+        by the duplicate index, None if there is none
         """
-        pass
+        return self.Duplicates.Stats() if self.Duplicates is not None else None
 
-    def SendRequests(self, KeywordParams):
+    def ParseCacheStats(self):
+        """
+        Returns the hits, misses and evictions of the parse cache, None if
+        there is no cache
+        """
+        Readers = [reader for reader in self.readers.values() if reader.ParseCache is not None]
+        return Readers[0].ParseCache.Stats() if len(Readers) > 0 else None
+
+    def SendRequests(self, KeywordParams, Incremental=False):
         """
         Sends multiple requests based on keyword parameters.
         :param KeywordParams paramters for sending the requests
+        :param Incremental fetch the pages of each query in waves, stop paging a
+        query once a page has no new Job posts and return only the new ones
+        (requires a SeenIndex)
         :returns Details from all the available list
         """
         if isinstance(KeywordParams, dict) == False:
             raise TypeError('KeywordParams not an instance of dictionary')
+        elif Incremental and self.SeenIndex is None:
+            raise ValueError('Incremental scraping requires a SeenIndex')
+        elif self.Profiler is not None:
+            with self.Profiler.Profile():
+                JobDetails = self.__SendRequests__(KeywordParams, Incremental)
+            print('Profile written to %s' % ', '.join(self.Profiler.Artifacts))
+            return JobDetails
         else:
-            start = time()
-            URLParamList = []
-            for ReaderNames, Queries in KeywordParams.items():
-                if ReaderNames in self.readers:
-                    reader = self.readers[ReaderNames]
-                    for query in Queries:
-                        TotalPages = query['NumberOfPages'] if 'NumberOfPages' in query else 1
-                        # Generate argument for the JobReader as tuples
-                        URLParamList += [(reader, reader.ConstructQueryURL(query, PageNumber))
-                                         for PageNumber in range(TotalPages)]
+            return self.__SendRequests__(KeywordParams, Incremental)
+
+    def __SendRequests__(self, KeywordParams, Incremental):
+        """
+        Internal method sending the requests of SendRequests
+        """
+        start = time()
+        self.Failures = []
+        QueryList = self.__QueryList__(KeywordParams)
+
+        JobDetails = None
+        if len(QueryList) > 0:
+            self.__StartDetails__()
+            try:
+                if Incremental:
+                    URLList, JobDetails = self.__SendIncremental__(QueryList)
                 else:
-                    print('No reader found for {}'.format(ReaderNames))
+                    URLParamList = self.__URLParamList__(QueryList)
+                    print(URLParamList)
+                    URLList = [URLTuple[1] for URLTuple in URLParamList]
+                    Results = self.__Map__(URLParamList)
+                    self.__StoreResults__(URLParamList, Results)
+                    JobDetails = self.__Merge__([self.__Unique__(reader, Rows)
+                                                 for (reader, QueryURL), Rows in zip(URLParamList, Results)])
+                JobDetails = self.__AddDetails__(JobDetails)
+            finally:
+                self.DetailFutures, self.DetailPages = None, None
+            self.QueryResults = JobDetails
+            self.LastPages = len(URLList)
+            self.HistoryList += (URLList, JobDetails)
+            end = time()
+            if len(self.Failures) > 0:
+                print('%d page(s) failed, see Failures' % len(self.Failures))
+            print('Finished.\nTime taken for scraping: %fs' % (end - start))
+
+        return JobDetails
+
+    def Publish(self, KeywordParams, Queue):
+        """
+        Distributed mode: publish the pages of the keyword parameters to a
+        shared work queue instead of sending them, to be scraped by the
+        QueueWorkers of any host (see ListingImplementation.DistributedListing)
+        :param KeywordParams paramters for sending the requests
+        :param Queue IWorkQueue shared by the workers
+        :returns id of the published batch
+        """
+        if isinstance(KeywordParams, dict) == False:
+            raise TypeError('KeywordParams not an instance of dictionary')
+
+        URLParamList = self.__URLParamList__(self.__QueryList__(KeywordParams))
+        return Queue.Publish([{'Platform': reader.Platform, 'URL': QueryURL, 'Config': reader.Config()}
+                              for reader, QueryURL in URLParamList])
+
+    def MapPages(self, URLParamList):
+        """
+        Fetch and parse the given pages with the executor, without merging them
+        nor keeping them in the Results or the history
+        :param URLParamList list of (reader, QueryURL)
+        :returns list of the rows (ColumnBatch) of each page, in the order of
+        URLParamList. Failed pages are empty and listed in Failures.
+        """
+        self.Failures = []
+        return self.__Map__(URLParamList)
+
+    def StreamRequests(self, KeywordParams):
+        """
+        Sends multiple requests based on keyword parameters, and yields the Job
+        posts of each page as soon as it is parsed, in completion order. The
+        pages are not merged, nor kept in the Results or the history, and at
+        most 2 * MaxConcurrency pages are fetched or waiting for the consumer
+        at once (the next page is sent when one is consumed), so the memory
+        does not grow with the number of pages, even with a slow consumer.
+        :param KeywordParams paramters for sending the requests
+        :returns generator of (QueryURL, DataFrame of the page)
+        """
+        if isinstance(KeywordParams, dict) == False:
+            raise TypeError('KeywordParams not an instance of dictionary')
+
+        self.Failures = []
+        URLParamList = self.__URLParamList__(self.__QueryList__(KeywordParams))
+        if self.Executor == 'async':
+            # Drive the async stream on the executor loop, one page at a time
+            Loop = self.__EventLoop__()
+            Stream = self.__StreamAsync__(URLParamList)
+            try:
+                while True:
+                    try:
+                        yield Loop.run_until_complete(Stream.__anext__())
+                    except StopAsyncIteration:
+                        return
+            finally:
+                Loop.run_until_complete(Stream.aclose())
+        elif self.Executor == 'pipeline':
+            self.Queued = perf_counter()
+            for Params, Parsed in StreamPipelinedRequest(self.__FetchForParser__, ExtractTimedInWorker, URLParamList,
+                                                         self.__ParserPool__(), self.MaxConcurrency):
+                yield Params[1], self.__Unique__(Params[0], self.__Parsed__(Params[0], *Parsed)).ToDataFrame(self.Compact)
+        else:
+            self.Queued = perf_counter()
+            for Params, Rows in StreamParallelRequest(self.__Send__, URLParamList, self.MaxConcurrency):
+                yield Params[1], self.__Unique__(Params[0], Rows).ToDataFrame(self.Compact)
+
+    async def AsyncStreamRequests(self, KeywordParams):
+        """
+        Same as StreamRequests, as an async generator running on the caller
+        event loop (requires aiohttp)
+        :param KeywordParams paramters for sending the requests
+        :returns async generator of (QueryURL, DataFrame of the page)
+        """
+        if aiohttp is None:
+            raise ImportError('aiohttp is required for the async stream')
+        if isinstance(KeywordParams, dict) == False:
+            raise TypeError('KeywordParams not an instance of dictionary')
+
+        self.Failures = []
+        async for Page in self.__StreamAsync__(self.__URLParamList__(self.__QueryList__(KeywordParams))):
+            yield Page
+
+    async def __StreamAsync__(self, URLParamList):
+        """
+        Internal async generator of the pages, as they are parsed
+        """
+        self.Queued = perf_counter()
+        async for Params, Rows in StreamAsyncRequest(self.__SendAsync__, URLParamList,
+                                                     self.MaxConcurrency,
+                                                     self.PerSiteConcurrency,
+                                                     SiteKey=lambda Params: Params[0].DomainName):
+            yield Params[1], self.__Unique__(Params[0], Rows).ToDataFrame(self.Compact)
+
+    def __QueryList__(self, KeywordParams):
+        """
+        Internal method listing the queries of the keyword parameters
+        :returns list of (reader, query, TotalPages)
+        """
+        QueryList = []
+        for ReaderNames, Queries in KeywordParams.items():
+            if ReaderNames in self.readers:
+                reader = self.readers[ReaderNames]
+                for query in Queries:
+                    TotalPages = query['NumberOfPages'] if 'NumberOfPages' in query else 1
+                    QueryList.append((reader, query, TotalPages))
+            else:
+                print('No reader found for {}'.format(ReaderNames))
+        return QueryList
+
+    def __URLParamList__(self, QueryList):
+        """
+        Internal method to generate argument for the JobReader as tuples
+        :returns list of (reader, QueryURL), for all the pages of the queries
+        """
+        return [(reader, self.__QueryURL__(reader, query, PageNumber))
+                for reader, query, TotalPages in QueryList
+                for PageNumber in range(TotalPages)]
+
+    def __QueryURL__(self, reader, query, PageNumber):
+        """
+        Internal method building the URL of a page of a query, timed
+        """
+        Start = perf_counter()
+        QueryURL = reader.ConstructQueryURL(query, PageNumber)
+        self.Metrics.Observe(reader.Platform, 'URL', perf_counter() - Start)
+        return QueryURL
+
+    def __SendIncremental__(self, QueryList):
+        """
+        Internal method for the incremental scraping: sends the pages of all
+        the queries in waves of WaveSize pages per query, and stops a query at
+        its first page without new Job posts.
+        :param QueryList list of (reader, query, TotalPages)
+        :returns (URLs fetched, DataFrame of the new Job posts)
+        """
+        Active = [(reader, query, TotalPages, SeenIndex.QueryKey(reader.Platform, query), 0)
+                  for reader, query, TotalPages in QueryList]
+        URLList, NewRows = [], []
+
+        while len(Active) > 0:
+            Wave, URLParamList = [], []
+            for reader, query, TotalPages, QueryKey, NextPage in Active:
+                Pages = range(NextPage, min(NextPage + self.WaveSize, TotalPages))
+                Wave.append((reader, query, TotalPages, QueryKey, NextPage + len(Pages), len(URLParamList), len(Pages)))
+                URLParamList += [(reader, self.__QueryURL__(reader, query, PageNumber)) for PageNumber in Pages]
+
+            Results = self.__Map__(URLParamList)
+            self.__StoreResults__(URLParamList, Results)
+            URLList += [URLTuple[1] for URLTuple in URLParamList]
+
+            Failed = set(QueryURL for QueryURL, Error in self.Failures)
+            Active = []
+            for reader, query, TotalPages, QueryKey, NextPage, First, Count in Wave:
+                Exhausted = False
+                for (reader, QueryURL), Rows in zip(URLParamList[First:First + Count], Results[First:First + Count]):
+                    New = self.SeenIndex.MarkSeen(QueryKey, Rows.Data['JobLink'])
+                    NewRows.append(self.__Unique__(reader, Rows.Select(New)))
+                    # A failed page is empty, but the next ones may still be new
+                    Exhausted = Exhausted or (len(New) == 0 and QueryURL not in Failed)
+                if not Exhausted and NextPage < TotalPages:
+                    Active.append((reader, query, TotalPages, QueryKey, NextPage))
+
+        return URLList, self.__Merge__(NewRows)
+
+    def __Unique__(self, Reader, Rows):
+        """
+        Internal method dropping the rows of a page that duplicate a Job post
+        already returned. With a duplicate index, the detail pages are
+        scheduled here, for the rows kept only.
+        """
+        if self.Duplicates is None:
+            return Rows
+        Rows = self.Duplicates.Unique(Rows, Reader.Platform)
+        if self.DetailFutures is not None:
+            self.__FetchDetails__(Reader, Rows)
+        return Rows
+
+    def __StoreResults__(self, URLParamList, Results):
+        """
+        Internal method upserting the pages into the store, one batch per
+        platform. During a SendRequests with detail pages, the pages are
+        upserted with their details, once they are fetched (__AddDetails__).
+        """
+        if self.Store is None:
+            return
+        if self.DetailPages is not None:
+            self.DetailPages.append((URLParamList, Results))
+            return
+        self.__Upsert__(URLParamList, Results)
+
+    def __Upsert__(self, URLParamList, Results):
+        """
+        Internal method upserting the pages into the store
+        """
+        Platforms = {}
+        for (reader, QueryURL), Rows in zip(URLParamList, Results):
+            Platforms.setdefault(reader.Platform, []).append(Rows)
+        SeenAt = time()
+        for Platform, Pages in Platforms.items():
+            self.Store.Upsert(ColumnBatch.Concat(Pages), Platform, SeenAt)
+
+    def __Map__(self, URLParamList):
+        """
+        Internal method to send the requests with the selected executor
+        :returns list of the rows of each page, in the order of URLParamList
+        """
+        if len(URLParamList) == 0:
+            return []
+        self.Queued = perf_counter()
+        if self.Executor == 'async':
+            return self.__EventLoop__().run_until_complete(self.__MapAllAsync__(URLParamList))
+        if self.Executor == 'pipeline':
+            Results = MapPipelinedRequest(self.__FetchForParser__, ExtractTimedInWorker, URLParamList,
+                                          self.__ParserPool__(), self.MaxConcurrency)
+            return [self.__Parsed__(reader, Rows, Timings)
+                    for (reader, QueryURL), (Rows, Timings) in zip(URLParamList, Results)]
+        return MapParallelRequest(self.__Send__, URLParamList, self.MaxConcurrency)
+
+    def __Merge__(self, Results):
+        """
+        Internal method merging the rows of the pages, timed
+        """
+        Start = perf_counter()
+        JobDetails = MergeResults(Results, self.Compact)
+        self.Metrics.Observe('All', 'Assembly', perf_counter() - Start)
+        return JobDetails
+
+    def __Parsed__(self, Reader, Rows, Timings):
+        """
+        Internal method recording the parse timings and the rows of a page
+        :returns the rows
+        """
+        Timings['Rows'] = Rows.Size
+        self.Metrics.ObserveMany(Reader.Platform, Timings)
+        if self.DetailFutures is not None and self.Duplicates is None:
+            # Scheduled as soon as the page is parsed, see __Unique__ otherwise
+            self.__FetchDetails__(Reader, Rows)
+        return Rows
+
+    def __StartDetails__(self):
+        """
+        Internal method preparing the detail pages of a SendRequests, when
+        DetailConcurrency is set
+        """
+        if self.DetailConcurrency <= 0:
+            return
+        if self.DetailStore is None:
+            self.DetailStore = DetailStore()
+        if self.DetailPool is None:
+            self.DetailPool = ThreadPoolExecutor(max_workers=self.DetailConcurrency)
+        # Built again for every request, the readers may have been pointed
+        # to another website
+        self.DetailReaders = {Platform: DetailReader(reader) for Platform, reader in self.readers.items()}
+        for reader in self.DetailReaders.values():
+            self.Sessions.SetPoolSize(reader.Platform, self.DetailConcurrency)
+        self.DetailFutures, self.DetailPages = {}, []
 
-            print(URLParamList)
+    def __FetchDetails__(self, Reader, Rows):
+        """
+        Internal method scheduling the detail pages of the Job posts of a page
+        that have no details yet, nor a detail page already scheduled
+        """
+        Detail = self.DetailReaders[Reader.Platform]
+        Queued = perf_counter()
+        with self.DetailLock:
+            for Link in self.DetailStore.Missing(Rows.Data['JobLink']):
+                Key = NormalizeLink(Link)
+                if Key not in self.DetailFutures:
+                    self.DetailFutures[Key] = (Link, self.DetailPool.submit(self.__SendDetail__, Detail, Link, Queued))
 
-            if len(URLParamList) > 0:
-                JobDetails = SendParallelRequest(self.__Send__, URLParamList)
-                self.QueryResults = JobDetails
-                self.HistoryList += ([URLTuple[1] for URLTuple in URLParamList], JobDetails)
-                end = time()
-                print('Finished.\nTime taken for scraping: %fs' % (end - start))
+    def __SendDetail__(self, Reader, Link, Queued):
+        """
+        Internal method fetching the detail page of a Job post, and storing
+        its details
+        """
+        self.Metrics.Observe(Reader.Platform, 'QueueWait', perf_counter() - Queued)
+        try:
+            Content = self.__Fetch__(Reader, Link)
+        except FetchError as Error:
+            self.Failures.append((Link, Error))
+            return
+        Timings = {}
+        Details = Reader.ExtractDetails(Content, Timings)
+        self.Metrics.ObserveMany(Reader.Platform, Timings)
+        self.DetailStore.Put(Link, Reader.Reader.Platform, Details)
 
+    def __AddDetails__(self, JobDetails):
+        """
+        Internal method waiting for the detail pages of the request, adding
+        the details of the Job posts as columns, and upserting the pages
+        waiting for them into the store
+        """
+        if self.DetailFutures is None:
             return JobDetails
+        with self.DetailLock:
+            Futures = list(self.DetailFutures.values())
+        for Link, Future in Futures:
+            try:
+                Future.result()
+            except Exception as Error:
+                self.Failures.append((Link, Error))
+        for URLParamList, Results in self.DetailPages:
+            for Rows in Results:
+                for Column, Values in self.__DetailValues__(Rows.Data.get('JobLink', [None] * Rows.Size)).items():
+                    if Column not in Rows.Data:
+                        Rows.Columns.append(Column)
+                    Rows.Data[Column] = Values
+            self.__Upsert__(URLParamList, Results)
+        Frame = ExpandLinks(JobDetails)
+        Links = Frame['JobLink'].tolist() if 'JobLink' in Frame.columns else []
+        for Column, Values in self.__DetailValues__(Links).items():
+            JobDetails[Column] = Values
+        return JobDetails
+
+    def __DetailValues__(self, Links):
+        """
+        Internal method returning the stored details of Job links, by column
+        (None for the Job posts without details)
+        """
+        Known = {NormalizeLink(Link): Details
+                 for Link, Details in self.DetailStore.Get([Link for Link in Links if isinstance(Link, str)]).items()}
+        Keys = [NormalizeLink(Link) if isinstance(Link, str) else None for Link in Links]
+        return {Column: [Known[Key].get(Column) if Key in Known else None for Key in Keys]
+                for Column in DETAIL_COLUMNS}
+
+    def __ParserPool__(self):
+        """
+        Internal method returning the parser processes of the pipeline executor.
+        The workers build their readers once, so the pool is started again
+        only when the readers (e.g. their user tags) have changed.
+        """
+        Configs = [reader.Config() for reader in self.readers.values()]
+        if self.ParserPool is None or Configs != self.ParserConfigs:
+            if self.ParserPool is not None:
+                self.ParserPool.shutdown()
+            self.ParserPool = ProcessPoolExecutor(max_workers=self.ParseProcesses,
+                                                  initializer=InitReaders, initargs=(Configs,))
+            self.ParserConfigs = Configs
+        return self.ParserPool
+
+    def __FetchForParser__(self, Params):
+        """
+        Internal method fetching a page for the parser processes
+        :returns (platform, page content)
+        """
+        Reader, QueryURL = Params
+        self.Metrics.Observe(Reader.Platform, 'QueueWait', perf_counter() - self.Queued)
+        try:
+            return Reader.Platform, self.__Fetch__(Reader, QueryURL)
+        except FetchError as Error:
+            self.Failures.append((QueryURL, Error))
+            return Reader.Platform, None
 
     def SetNewData(self, Platform, UserAttribute, TagName, TagClass=None, DOMAttr=None):
         """
         Sets custom data to retrieve from the user.
         """
-        self.Reader[Platform].SetTagsFromUser(UserAttribute, TagName, TagClass, DOMAttr)
+        self.readers[Platform].SetTagsFromUser(UserAttribute, TagName, TagClass, DOMAttr)
 
 
     def __Send__(self, Params):
@@ -74,18 +650,421 @@ class JobListing:
         Internal method to send the request to required URL parameter
         """
         Reader, QueryURL = Params
-        request = requests.get(QueryURL)
-        JobDetails = Reader.ListContents(request.content)
-        return JobDetails
+        self.Metrics.Observe(Reader.Platform, 'QueueWait', perf_counter() - self.Queued)
+        try:
+            Content = self.__Fetch__(Reader, QueryURL)
+        except FetchError as Error:
+            return self.__Failed__(Reader, QueryURL, Error)
+        Timings = {}
+        JobDetails = Reader.ExtractContents(Content, Timings=Timings)
+        return self.__Parsed__(Reader, JobDetails, Timings)
+
+    def __Failed__(self, Reader, QueryURL, Error):
+        """
+        Internal method recording a page that could not be fetched
+        :returns empty rows for the page
+        """
+        self.Failures.append((QueryURL, Error))
+        return ColumnBatch(Reader.Columns(None))
+
+    def __Fetch__(self, Reader, QueryURL):
+        """
+        Internal method returning the page of the URL, from the response cache
+        when it is fresh (or revalidated), else from the website
+        :raises FetchError when the page still fails after the retries
+        """
+        # With an archive, every page goes through it: recorded, or replayed
+        Cache = self.ResponseCache if self.Archive is None else None
+        Cached = Cache.Lookup(QueryURL, Reader.CacheTTL) if Cache is not None else None
+        if Cached is not None and Cached.Fresh:
+            return Cached.Body
+
+        Status, Headers, Content = self.__Retried__(Reader, QueryURL,
+                                                    Cached.Validators if Cached is not None else None)
+        if Cached is not None and Status == 304:
+            Cache.Refresh(QueryURL, len(Cached.Body))
+            return Cached.Body
+        if Cache is not None and Status == 200:
+            Cache.Store(QueryURL, Content, Headers)
+        return Content
+
+    def __Retried__(self, Reader, QueryURL, Validators):
+        """
+        Internal method sending the request again, after a backoff, while it
+        fails on an error or a retryable status
+        :returns (status, headers, content) of the answer
+        """
+        Policy = self.RetryPolicy
+        for Attempt in range(Policy.Retries + 1):
+            Answer, Cause = None, None
+            try:
+                Answer = self.__Hedged__(Reader, QueryURL, Validators)
+            except requests.RequestException as Error:
+                Cause = Error
+            Status = Answer[0] if Answer is not None else None
+            if Answer is not None and not Policy.ShouldRetry(Status):
+                if Status >= 400:
+                    Policy.Count('Failures')
+                    raise FetchError(QueryURL, Status, Attempt + 1)
+                return Answer
+            if Attempt == Policy.Retries:
+                Policy.Count('Failures')
+                raise FetchError(QueryURL, Status, Attempt + 1, Cause)
+            Policy.Count('Retries')
+            sleep(Policy.Backoff(Attempt, Answer[1].get('Retry-After') if Answer is not None else None))
+
+    def __Hedged__(self, Reader, QueryURL, Validators):
+        """
+        Internal method sending the request, and a second one when the first
+        is slower than most of the requests to the website
+        :returns (status, headers, content) of the first good answer
+        """
+        Policy = self.RetryPolicy
+        Delay = Policy.HedgeDelay(Reader.DomainName)
+        if Delay is None:
+            return self.__Get__(Reader, QueryURL, Validators)
+
+        if self.Hedges is None:
+            # Two requests per result page and per detail page fetched at once
+            self.Hedges = ThreadPoolExecutor(max_workers=2 * (self.MaxConcurrency + max(self.DetailConcurrency, 0)))
+        First = self.Hedges.submit(self.__Get__, Reader, QueryURL, Validators)
+        if len(wait([First], timeout=Delay).done) > 0:
+            return First.result()
+
+        Policy.Count('Hedged')
+        Second = self.Hedges.submit(self.__Get__, Reader, QueryURL, Validators)
+        Pending = {First, Second}
+        while len(Pending) > 0:
+            Done, Pending = wait(Pending, return_when=FIRST_COMPLETED)
+            for Request in Done:
+                if Request.exception() is None and not Policy.ShouldRetry(Request.result()[0]):
+                    if Request is Second:
+                        Policy.Count('HedgeWins')
+                    return Request.result()
+        return First.result()
+
+    def __Get__(self, Reader, QueryURL, Validators):
+        """
+        Internal method sending a single request, paced by the rate limiter
+        :returns (status, headers, content) of the answer
+        """
+        if self.Archive is not None and self.Archive.Replaying:
+            Sent = perf_counter()
+            Answer = self.__Archived__(QueryURL)
+            if self.Archive.Latency:
+                sleep(Answer.TTFB)
+            Answered = perf_counter()
+            if self.Archive.Latency:
+                sleep(Answer.Download)
+            self.__Timed__(Reader, None, 0.0, Sent, Answered, perf_counter(), len(Answer.Content), Answer.WireBytes)
+            return Answer.Status, Answer.Headers, Answer.Content
+        Limiter = self.RateLimiter.For(Reader) if self.RateLimiter is not None else None
+        Waiting = perf_counter()
+        Start = Limiter.Acquire() if Limiter is not None else None
+        Sent = perf_counter()
+        SessionPool.ConnectSeconds()
+        try:
+            # Streamed, to time the headers and the body apart
+            request = self.CreateSession(Reader.Platform).get(QueryURL, headers=Validators, stream=True,
+                                                              timeout=self.RetryPolicy.Timeout())
+            Answered = perf_counter()
+            Content = self.__Download__(Reader, request)
+        except Exception:
+            if Limiter is not None:
+                Limiter.Release(Start, None)
+            raise
+        Received = perf_counter()
+        if Limiter is not None:
+            Limiter.Release(Start, request.status_code, request.headers.get('Retry-After'))
+        if request.status_code < 400:
+            self.RetryPolicy.Record(Reader.DomainName, Received - Sent)
+        Connect = SessionPool.ConnectSeconds()
+        self.__Timed__(Reader, Sent - Waiting if Limiter is not None else None, Connect,
+                       Sent, Answered, Received, len(Content), request.raw.tell())
+        if self.Archive is not None:
+            self.Archive.Record(Reader.Platform, QueryURL, request.status_code, request.headers, Content,
+                                max(Answered - Sent - Connect, 0.0), Received - Answered, request.raw.tell())
+        return request.status_code, request.headers, Content
+
+    def __Archived__(self, QueryURL):
+        """
+        Internal method returning the next recorded answer of a request
+        :raises FetchError when the URL is not in the archive
+        """
+        Answer = self.Archive.Answer(QueryURL)
+        if Answer is None:
+            raise FetchError(QueryURL, None, 1, KeyError('{} is not in the archive'.format(QueryURL)))
+        return Answer
+
+    def __Download__(self, Reader, Response):
+        """
+        Internal method reading the body of a streamed response, up to the end
+        of its result list with EarlyStop
+        """
+        if not self.EarlyStop or Response.status_code != 200:
+            return Response.content
+        if isinstance(Reader, DetailReader):
+            # Detail pages have no result list
+            return Response.content
+        Scanner = ResultListScanner.ForReader(Reader)
+        Chunks = Response.iter_content(CHUNK_SIZE)
+        for Chunk in Chunks:
+            if Scanner.Feed(Chunk):
+                break
+        else:
+            return Scanner.Content()
+        Length = Response.headers.get('Content-Length')
+        if Length is not None and Length.isdigit() and int(Length) - Response.raw.tell() <= EARLY_STOP_DRAIN:
+            # Read to the end, the connection goes back to the pool
+            for Chunk in Chunks:
+                pass
+        Response.close()
+        return Scanner.Content()
+
+    def __Timed__(self, Reader, Throttle, Connect, Sent, Answered, Received, Bytes, WireBytes):
+        """
+        Internal method recording the network timings of a request
+        """
+        Timings = {'Connect': Connect, 'TTFB': max(Answered - Sent - Connect, 0.0),
+                   'Download': Received - Answered, 'Bytes': Bytes, 'WireBytes': WireBytes}
+        if Throttle is not None:
+            Timings['Throttle'] = Throttle
+        self.Metrics.ObserveMany(Reader.Platform, Timings)
+
+    async def __SendAsync__(self, Params):
+        """
+        Internal coroutine to send the request to required URL parameter on the
+        event loop
+        """
+        Reader, QueryURL = Params
+        self.Metrics.Observe(Reader.Platform, 'QueueWait', perf_counter() - self.Queued)
+        try:
+            Content = await self.__FetchAsync__(Reader, QueryURL)
+        except FetchError as Error:
+            return self.__Failed__(Reader, QueryURL, Error)
+        Timings = {}
+        JobDetails = Reader.ExtractContents(Content, Timings=Timings)
+        return self.__Parsed__(Reader, JobDetails, Timings)
+
+    async def __FetchAsync__(self, Reader, QueryURL):
+        """
+        Internal coroutine returning the page of the URL, same as __Fetch__
+        """
+        # With an archive, every page goes through it: recorded, or replayed
+        Cache = self.ResponseCache if self.Archive is None else None
+        Cached = Cache.Lookup(QueryURL, Reader.CacheTTL) if Cache is not None else None
+        if Cached is not None and Cached.Fresh:
+            return Cached.Body
+
+        Status, Headers, Content = await self.__RetriedAsync__(Reader, QueryURL,
+                                                               Cached.Validators if Cached is not None else None)
+        if Cached is not None and Status == 304:
+            Cache.Refresh(QueryURL, len(Cached.Body))
+            return Cached.Body
+        if Cache is not None and Status == 200:
+            Cache.Store(QueryURL, Content, Headers)
+        return Content
+
+    async def __RetriedAsync__(self, Reader, QueryURL, Validators):
+        """
+        Internal coroutine sending the request with retries, same as __Retried__
+        """
+        Policy = self.RetryPolicy
+        for Attempt in range(Policy.Retries + 1):
+            Answer, Cause = None, None
+            try:
+                Answer = await self.__HedgedAsync__(Reader, QueryURL, Validators)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as Error:
+                Cause = Error
+            Status = Answer[0] if Answer is not None else None
+            if Answer is not None and not Policy.ShouldRetry(Status):
+                if Status >= 400:
+                    Policy.Count('Failures')
+                    raise FetchError(QueryURL, Status, Attempt + 1)
+                return Answer
+            if Attempt == Policy.Retries:
+                Policy.Count('Failures')
+                raise FetchError(QueryURL, Status, Attempt + 1, Cause)
+            Policy.Count('Retries')
+            await asyncio.sleep(Policy.Backoff(Attempt, Answer[1].get('Retry-After') if Answer is not None else None))
+
+    async def __HedgedAsync__(self, Reader, QueryURL, Validators):
+        """
+        Internal coroutine sending the request with hedging, same as __Hedged__.
+        The slower request is cancelled.
+        """
+        Policy = self.RetryPolicy
+        Delay = Policy.HedgeDelay(Reader.DomainName)
+        if Delay is None:
+            return await self.__GetAsync__(Reader, QueryURL, Validators)
+
+        First = asyncio.ensure_future(self.__GetAsync__(Reader, QueryURL, Validators))
+        Second = None
+        try:
+            Done, Pending = await asyncio.wait({First}, timeout=Delay)
+            if len(Done) > 0:
+                return First.result()
+
+            Policy.Count('Hedged')
+            Second = asyncio.ensure_future(self.__GetAsync__(Reader, QueryURL, Validators))
+            Pending = {First, Second}
+            while len(Pending) > 0:
+                Done, Pending = await asyncio.wait(Pending, return_when=asyncio.FIRST_COMPLETED)
+                for Request in Done:
+                    if Request.exception() is None and not Policy.ShouldRetry(Request.result()[0]):
+                        if Request is Second:
+                            Policy.Count('HedgeWins')
+                        return Request.result()
+            Second.exception()
+            return First.result()
+        finally:
+            for Request in (First, Second):
+                if Request is not None and not Request.done():
+                    Request.cancel()
+
+    async def __GetAsync__(self, Reader, QueryURL, Validators):
+        """
+        Internal coroutine sending a single request, same as __Get__
+        """
+        if self.Archive is not None and self.Archive.Replaying:
+            Sent = perf_counter()
+            Answer = self.__Archived__(QueryURL)
+            if self.Archive.Latency:
+                await asyncio.sleep(Answer.TTFB)
+            Answered = perf_counter()
+            if self.Archive.Latency:
+                await asyncio.sleep(Answer.Download)
+            self.__Timed__(Reader, None, 0.0, Sent, Answered, perf_counter(), len(Answer.Content), Answer.WireBytes)
+            return Answer.Status, Answer.Headers, Answer.Content
+        Limiter = self.RateLimiter.For(Reader) if self.RateLimiter is not None else None
+        Waiting = perf_counter()
+        Start, Status, Headers = None, None, None
+        Timing = {'Connect': 0.0}
+        try:
+            # Under the try: a request cancelled (hedge loser, closed stream)
+            # while waiting for its slot or token gives them back
+            Start = await Limiter.AcquireAsync() if Limiter is not None else None
+            Sent = perf_counter()
+            Session = self.Sessions.AsyncSession(Reader.Platform)
+            Timeout = aiohttp.ClientTimeout(sock_connect=self.RetryPolicy.ConnectTimeout,
+                                            sock_read=self.RetryPolicy.ReadTimeout)
+            async with Session.get(QueryURL, headers=Validators, timeout=Timeout,
+                                   trace_request_ctx=Timing) as response:
+                Answered = perf_counter()
+                Status, Headers = response.status, response.headers
+                try:
+                    Content, WireBytes = await self.__DownloadAsync__(Reader, response)
+                except (ValueError, zlib.error) as Error:
+                    # Body that cannot be decoded: this page fails, not the others
+                    raise FetchError(QueryURL, Status, 1, Error)
+        except asyncio.CancelledError:
+            if Start is not None:
+                # Not a failure of the website, the controller must not back off
+                Limiter.Free()
+                Start = None
+            raise
+        finally:
+            if Start is not None:
+                Limiter.Release(Start, Status, Headers.get('Retry-After') if Headers is not None else None)
+        Received = perf_counter()
+        if Status < 400:
+            self.RetryPolicy.Record(Reader.DomainName, Received - Sent)
+        self.__Timed__(Reader, Sent - Waiting if Limiter is not None else None, Timing['Connect'],
+                       Sent, Answered, Received, len(Content), WireBytes)
+        if self.Archive is not None:
+            self.Archive.Record(Reader.Platform, QueryURL, Status, Headers, Content,
+                                max(Answered - Sent - Timing['Connect'], 0.0), Received - Answered, WireBytes)
+        return Status, Headers, Content
+
+    async def __DownloadAsync__(self, Reader, Response):
+        """
+        Internal coroutine reading and decompressing the body of a response
+        (the aiohttp sessions do not decompress them), up to the end of its
+        result list with EarlyStop
+        :returns (body, bytes received)
+        :raises ValueError or zlib.error when the body cannot be decoded
+        """
+        Decoder = Decompressor(Response.headers.get('Content-Encoding'))
+        if not self.EarlyStop or Response.status != 200:
+            Content = await Response.read()
+            if Decoder is None:
+                return Content, len(Content)
+            return Decoder.decompress(Content) + Decoder.flush(), len(Content)
+
+        Scanner, WireBytes = ResultListScanner.ForReader(Reader), 0
+        async for Chunk in Response.content.iter_chunked(CHUNK_SIZE):
+            WireBytes += len(Chunk)
+            if Scanner.Feed(Decoder.decompress(Chunk) if Decoder is not None else Chunk):
+                break
+        else:
+            if Decoder is not None:
+                Scanner.Feed(Decoder.flush())
+            return Scanner.Content(), WireBytes
+        Length = Response.content_length
+        if Length is not None and Length - WireBytes <= EARLY_STOP_DRAIN:
+            # Read to the end, the connection goes back to the pool
+            async for Chunk in Response.content.iter_chunked(CHUNK_SIZE):
+                WireBytes += len(Chunk)
+        else:
+            Response.close()
+        return Scanner.Content(), WireBytes
+
+    async def __MapAllAsync__(self, URLParamList):
+        """
+        Internal coroutine to send all the requests with the async executor,
+        limited globally and per website
+        """
+        return await MapAsyncRequest(self.__SendAsync__, URLParamList,
+                                     self.MaxConcurrency,
+                                     self.PerSiteConcurrency,
+                                     SiteKey=lambda Params: Params[0].DomainName)
+
+    def __EventLoop__(self):
+        """
+        Internal method returning the event loop of the async executor. The
+        loop is kept between the requests, with the sessions bound to it, so
+        that their connections stay alive from one SendRequests to the next.
+        """
+        if self.Loop is None or self.Loop.is_closed():
+            self.Loop = asyncio.new_event_loop()
+        return self.Loop
+
+    async def CloseAsync(self):
+        """
+        Close the sessions opened on the running event loop by AsyncStreamRequests
+        """
+        await self.Sessions.CloseAsync()
+
+    def Close(self):
+        """
+        Close the sessions, their pooled connections, the event loop, the
+        parser processes and the hedging threads
+        """
+        if self.ParserPool is not None:
+            self.ParserPool.shutdown()
+            self.ParserPool = None
+        if self.Hedges is not None:
+            self.Hedges.shutdown()
+            self.Hedges = None
+        if self.DetailPool is not None:
+            self.DetailPool.shutdown()
+            self.DetailPool = None
+        if self.Loop is not None and not self.Loop.is_closed():
+            self.Loop.run_until_complete(self.Sessions.CloseAsync())
+            self.Loop.close()
+        self.Sessions.Close()
 
     def FileHandle(self, mode, saveAs):
         """
         Save the file with certain mode (either w, w+, wb, a+)
-        :param mode
+        :param mode w, w+ or wb overwrite the file, a or a+ append the results
+        (with the header only if the file is new)
         :param saveAs file name
         """
         if self.QueryResults is not None and isinstance(self.QueryResults, pd.DataFrame):
-            self.QueryResults.to_csv(saveAs, index=False)
+            Append = mode.startswith('a')
+            Header = not Append or not os.path.exists(saveAs) or os.path.getsize(saveAs) == 0
+            ExpandLinks(self.QueryResults).to_csv(saveAs, mode='a' if Append else 'w', header=Header, index=False)
         else:
             print('No search has been done to be saved')
 
@@ -98,11 +1077,22 @@ class JobListing:
             return None
         return self.QueryResults
 
-    def StoreCurrResults(self, saveAs='Output.csv'):
+    def StoreCurrResults(self, saveAs='Output.csv', mode='w'):
         """
-        Creates a new file and stores the result in a new file
+        Creates a new file and stores the result in a new file (or appends them
+        with mode a)
         """
-        self.FileHandle('w', saveAs)   
+        self.FileHandle(mode, saveAs)
+
+    def StoreParquet(self, saveAs='Output.parquet'):
+        """
+        Stores the result in a Parquet file (requires pyarrow), dictionary
+        encoded and compressed
+        """
+        if self.QueryResults is not None and isinstance(self.QueryResults, pd.DataFrame):
+            WriteParquet(self.QueryResults, saveAs)
+        else:
+            print('No search has been done to be saved')
 
     def PrintRecentHistory(self):
         """
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+Long running scheduler of recurring queries. Each query has a freshness
+target and a priority; the scheduler learns how fast new Job posts appear
+for it (new JobLink values per second, from the incremental scrapes) and
+spends a global budget of requests where the most new Job posts are
+expected per page sent.
+"""
+import json
+import os
+from time import time, sleep
+from Utility.SeenIndex import SeenIndex
+
+class ScheduledQuery:
+    """
+    A recurring query and what was learned about it
+    :param Platform platform of the query (as passed to the reader)
+    :param Query query parameters, as in SendRequests (NumberOfPages is the
+    most pages a scrape may send)
+    :param Freshness seconds after which its results are considered stale
+    :param Priority weight of its new Job posts against the other queries
+    """
+    def __init__(self, Platform, Query, Freshness=3600, Priority=1.0):
+        self.Platform = Platform
+        self.Query = Query
+        self.Freshness = Freshness
+        self.Priority = Priority
+        self.Key = SeenIndex.QueryKey(Platform, Query)
+        self.LastScraped = None
+        # New Job posts per second, and pages sent per scrape (moving averages)
+        self.ChurnRate = None
+        self.PagesPerScrape = None
+        self.Scrapes, self.Pages, self.NewJobs = 0, 0, 0
+
+    def Cost(self):
+        """
+        Returns the number of pages a scrape is expected to send
+        """
+        MaxPages = self.Query.get('NumberOfPages', 1)
+        return MaxPages if self.PagesPerScrape is None else min(MaxPages, max(1.0, self.PagesPerScrape))
+
+    def Learn(self, Now, NewJobs, Pages, Smoothing):
+        """
+        Update the churn rate and the cost of the query after a scrape
+        """
+        if self.LastScraped is not None and Now > self.LastScraped:
+            Rate = NewJobs / (Now - self.LastScraped)
+            self.ChurnRate = Rate if self.ChurnRate is None else (1 - Smoothing) * self.ChurnRate + Smoothing * Rate
+        # The first scrape finds everything new: only its cost is learned
+        if self.Scrapes > 0:
+            self.PagesPerScrape = Pages if self.PagesPerScrape is None else \
+                (1 - Smoothing) * self.PagesPerScrape + Smoothing * Pages
+        self.LastScraped = Now
+        self.Scrapes += 1
+        self.Pages += Pages
+        self.NewJobs += NewJobs
+
+    def State(self):
+        return {'LastScraped': self.LastScraped, 'ChurnRate': self.ChurnRate,
+                'PagesPerScrape': self.PagesPerScrape, 'Scrapes': self.Scrapes,
+                'Pages': self.Pages, 'NewJobs': self.NewJobs}
+
+    def Restore(self, State):
+        for Name, Value in State.items():
+            setattr(self, Name, Value)
+
+class Scheduler:
+    """
+    Scrapes the queries with the incremental mode of a JobListing, within a
+    budget of requests per hour. A query is due once its results are older
+    than its freshness target, or earlier when its new Job posts are about
+    to overflow the pages of a scrape (Fill x NumberOfPages x results per
+    page, at its learned churn rate): scraping it sooner would only send more
+    pages for the same Job posts, later would miss some. Due queries are
+    scraped by priority x lateness among the ones the budget allows, so that
+    a due query sending more pages than the tokens left does not hold back
+    the cheaper ones; a query scraped only once is scraped again after
+    ProbeInterval to learn its churn.
+    :param Listing JobListing with a SeenIndex and the readers of the queries
+    :param Queries list of ScheduledQuery
+    :param RequestsPerHour global budget of pages sent
+    :param Burst most pages that can be sent back to back, at least the
+    largest NumberOfPages of the queries (so that each can be afforded),
+    defaults to it
+    :param Fill fraction of the pages of a scrape the new Job posts may fill
+    before the query is due
+    :param ProbeInterval seconds before the second scrape of a query
+    :param Smoothing weight of the last scrape in the learned rates
+    :param StatePath JSON file where what was learned is kept between runs,
+    defaults to None
+    :param Sink ResultSink where the new Job posts are written, defaults to None
+    :param Clock function returning the current time, defaults to time.time
+    """
+    def __init__(self, Listing, Queries, RequestsPerHour=600, Burst=None, Fill=0.8, ProbeInterval=3600,
+                 Smoothing=0.3, StatePath=None, Sink=None, Clock=time):
+        if Listing.SeenIndex is None:
+            raise ValueError('The scheduler requires a JobListing with a SeenIndex')
+        self.Listing = Listing
+        self.Queries = list(Queries)
+        self.Rate = RequestsPerHour / 3600.0
+        MaxPages = max(Query.Query.get('NumberOfPages', 1) for Query in self.Queries)
+        if Burst is not None and Burst < MaxPages:
+            # Tokens never exceed Burst: the largest queries could never be scraped
+            raise ValueError('Burst must be at least the largest NumberOfPages of the queries: '
+                             'found {} and {}'.format(Burst, MaxPages))
+        self.Burst = Burst if Burst is not None else MaxPages
+        self.Fill = Fill
+        self.ProbeInterval = ProbeInterval
+        self.Smoothing = Smoothing
+        self.StatePath = StatePath
+        self.Sink = Sink
+        self.Clock = Clock
+        self.Tokens = float(self.Burst)
+        self.Updated = Clock()
+        if StatePath is not None and os.path.exists(StatePath):
+            with open(StatePath) as File:
+                State = json.load(File)
+            for Query in self.Queries:
+                if Query.Key in State:
+                    Query.Restore(State[Query.Key])
+
+    def __Refill__(self, Now):
+        self.Tokens = min(self.Burst, self.Tokens + (Now - self.Updated) * self.Rate)
+        self.Updated = Now
+
+    def Interval(self, Query):
+        """
+        Returns the seconds between two scrapes of the query
+        """
+        if Query.ChurnRate is None:
+            return min(Query.Freshness, self.ProbeInterval)
+        if Query.ChurnRate <= 0:
+            return Query.Freshness
+        Reader = self.Listing.readers[Query.Platform]
+        Capacity = Query.Query.get('NumberOfPages', 1) * Reader.ResultsPerPage
+        return min(Query.Freshness, self.Fill * Capacity / Query.ChurnRate)
+
+    def Pick(self, Now):
+        """
+        Returns the query to scrape next among the ones the tokens left allow,
+        None if no such query is due
+        """
+        Affordable = [Query for Query in self.Queries if Query.Cost() <= self.Tokens]
+        New = [Query for Query in Affordable if Query.LastScraped is None]
+        if len(New) > 0:
+            return max(New, key=lambda Query: Query.Priority)
+
+        Best, BestUrgency = None, 0.0
+        for Query in Affordable:
+            if Query.LastScraped is None:
+                continue
+            Urgency = (Now - Query.LastScraped) / self.Interval(Query)
+            if Urgency >= 1.0 and Query.Priority * Urgency >= BestUrgency:
+                Best, BestUrgency = Query, Query.Priority * Urgency
+        return Best
+
+    def RunOnce(self):
+        """
+        Scrape the next query if the budget allows it
+        :returns (query, DataFrame of its new Job posts), or None when nothing
+        was scraped
+        """
+        Now = self.Clock()
+        self.__Refill__(Now)
+        Query = self.Pick(Now)
+        if Query is None:
+            return None
+
+        Rows = self.Listing.SendRequests({Query.Platform: [Query.Query]}, Incremental=True)
+        NewJobs = len(Rows) if Rows is not None else 0
+        Pages = self.Listing.LastPages
+        self.Tokens -= Pages
+        Query.Learn(self.Clock(), NewJobs, Pages, self.Smoothing)
+        if self.Sink is not None and NewJobs > 0:
+            self.Sink.Write(Rows)
+        self.__SaveState__()
+        return Query, Rows
+
+    def Run(self, Until=None, Idle=1.0):
+        """
+        Scrape the queries until stopped
+        :param Until time (Clock) at which to stop, defaults to None (never)
+        :param Idle seconds to wait when nothing is worth scraping
+        """
+        while Until is None or self.Clock() < Until:
+            if self.RunOnce() is None:
+                sleep(Idle)
+
+    def __SaveState__(self):
+        if self.StatePath is None:
+            return
+        Temporary = self.StatePath + '.tmp'
+        with open(Temporary, 'w') as File:
+            json.dump({Query.Key: Query.State() for Query in self.Queries}, File)
+        os.replace(Temporary, self.StatePath)
+
+    def Stats(self):
+        """
+        Returns what was learned for each query: scrapes, pages, new Job posts,
+        new Job posts per page and per hour
+        """
+        Now = self.Clock()
+        return [{'Query': Query.Key, 'Scrapes': Query.Scrapes, 'Pages': Query.Pages, 'NewJobs': Query.NewJobs,
+                 'NewPerPage': Query.NewJobs / Query.Pages if Query.Pages else None,
+                 'ChurnPerHour': Query.ChurnRate * 3600 if Query.ChurnRate is not None else None,
+                 'Staleness': Now - Query.LastScraped if Query.LastScraped is not None else None}
+                for Query in self.Queries]
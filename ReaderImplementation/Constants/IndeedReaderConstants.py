@@ -43,3 +43,34 @@ RESULT_POSTED_TAG='span'
 RESULT_LINK_CLASS='result'
 
 RESULT_LINK_TAG='a'
+
+# Seconds a fetched result page stays fresh in the response cache
+RESPONSE_CACHE_TTL=600
+
+# Requests per second sent to the website, and requests that may be sent back
+# to back (see Utility.RateLimiter)
+RATE_LIMIT_PER_SECOND=3
+
+RATE_LIMIT_BURST=5
+
+# Job posts on a full result page
+RESULTS_PER_PAGE=15
+
+
+# Constants for classes and tags of the Job detail pages (JobLink), for the
+# enrichment of the Job posts (see ReaderImplementation.DetailReader)
+DETAIL_DESCRIPTION_CLASS='jobsearch-jobDescriptionText'
+
+DETAIL_DESCRIPTION_TAG='div'
+
+DETAIL_SALARY_CLASS='jobsearch-JobMetadataHeader-item'
+
+DETAIL_SALARY_TAG='div'
+
+# Not shown by Indeed
+DETAIL_SENIORITY_CLASS=None
+
+DETAIL_SENIORITY_TAG=None
+
+# Seconds a fetched detail page stays fresh in the response cache
+DETAIL_CACHE_TTL=86400
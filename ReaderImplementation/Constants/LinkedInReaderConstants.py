@@ -58,3 +58,33 @@ RESULT_LOCATION_TAG='span'
 RESULT_POSTED_TAG='time'
 
 RESULT_POSTED_CLASS=None
+
+# Seconds a fetched result page stays fresh in the response cache
+RESPONSE_CACHE_TTL=300
+
+# Requests per second sent to the website, and requests that may be sent back
+# to back (see Utility.RateLimiter)
+RATE_LIMIT_PER_SECOND=2
+
+RATE_LIMIT_BURST=4
+
+# Job posts on a full result page
+RESULTS_PER_PAGE=25
+
+
+# Constants for classes and tags of the Job detail pages (JobLink), for the
+# enrichment of the Job posts (see ReaderImplementation.DetailReader)
+DETAIL_DESCRIPTION_CLASS='show-more-less-html__markup'
+
+DETAIL_DESCRIPTION_TAG='div'
+
+DETAIL_SALARY_CLASS='compensation__salary'
+
+DETAIL_SALARY_TAG='div'
+
+DETAIL_SENIORITY_CLASS='description__job-criteria-text'
+
+DETAIL_SENIORITY_TAG='span'
+
+# Seconds a fetched detail page stays fresh in the response cache
+DETAIL_CACHE_TTL=86400
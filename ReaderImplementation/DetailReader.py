@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+from bs4 import BeautifulSoup
+from time import perf_counter
+from ReaderImplementation.ExtractionPlan import CompileDetailPlan
+
+class DetailReader:
+    """
+    Reader of the Job detail pages (the JobLink of the Job posts) of a
+    platform, with the DETAIL_* constants of its JobReader (see
+    ExtractionPlan.DETAIL_COLUMNS). JobListing fetches them as the platform
+    '<Platform>Details', so that their sessions and stage metrics are kept
+    apart from the result pages, while the rate limit of the website (by
+    DomainName) is shared.
+    :param Reader JobReader of the platform
+    """
+    def __init__(self, Reader):
+        self.Reader = Reader
+        self.Platform = '%sDetails' % Reader.Platform
+        self.DomainName = Reader.DomainName
+        self.RateLimit = Reader.RateLimit
+        self.RateBurst = Reader.RateBurst
+        self.CacheTTL = getattr(Reader.Constants, 'DETAIL_CACHE_TTL', None)
+        self.Fields = CompileDetailPlan(Reader.Constants)
+        self.Columns = [Column for Column, Extract in self.Fields]
+
+    def ExtractDetails(self, Content, Timings=None):
+        """
+        Parse a detail page and extract its details
+        :param Timings dictionary where the parse and extraction seconds are
+        set, defaults to None
+        :returns dictionary of column to value (None when not found)
+        """
+        Start = perf_counter()
+        Soup = BeautifulSoup(Content, features=self.Reader.ParserFeatures, from_encoding='UTF-8')
+        Parsed = perf_counter()
+        Details = {Column: Extract(Soup) for Column, Extract in self.Fields}
+        if Timings is not None:
+            Timings['Parse'] = Parsed - Start
+            Timings['Extract'] = perf_counter() - Parsed
+        return Details
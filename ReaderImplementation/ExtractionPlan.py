@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+Extraction plans: the tags, classes and attributes of a reader resolved once
+into plain functions of the Job post DOM, so that extracting a card does not
+re-check the constants or look up the user tags again.
+"""
+import sys
+from collections import namedtuple
+from bs4 import SoupStrainer
+
+# Link: extractor of the Job link (as found in the page), rows without a link are skipped.
+# Fields: tuple of (Column, extractor) for the other columns, in display order.
+ExtractionPlan = namedtuple('ExtractionPlan', ['Columns', 'Link', 'Fields'])
+
+def NoData(JobPostDOM):
+    return None
+
+def CompileFieldExtractor(Tag, ClassName=None, Attribute=None):
+    """
+    Compile the lookup of a tag (and class) in the Job post DOM. Same result as
+    JobReader.GetDataFromJobPostDOM for the same arguments.
+    :param Tag tag to be searched, if not a string nothing is extracted
+    :param ClassName class associated with the tag, defaults to None
+    :param Attribute attribute to be returned, defaults to None (inner text)
+    :returns function of the Job post DOM returning the data or None
+    """
+    if not isinstance(Tag, str):
+        return NoData
+
+    # The strainer is built once here instead of on each find
+    Target = SoupStrainer(Tag, class_=ClassName) if isinstance(ClassName, str) else Tag
+
+    if isinstance(Attribute, str):
+        def Extract(JobPostDOM):
+            Found = JobPostDOM.find(Target)
+            return Found[Attribute] if Found is not None else None
+    else:
+        def Extract(JobPostDOM):
+            Found = JobPostDOM.find(Target)
+            return Found.text.strip() if Found is not None else None
+
+    return Extract
+
+def Interned(Extract):
+    """
+    Returns the extractor returning the interned strings of Extract, so that
+    the values repeated across the Job posts (companies, locations, ...) are
+    stored once
+    """
+    Intern = sys.intern
+
+    def InternedExtract(JobPostDOM):
+        Value = Extract(JobPostDOM)
+        return Intern(Value) if type(Value) is str else Value
+
+    return InternedExtract
+
+def CompileLinkExtractor(Tag, ClassName):
+    """
+    Compile the lookup of the Job link, which is either the Job post DOM itself
+    or a tag inside it. Same result as JobReader.GetLinkOfJobPostFromJobPostDOM.
+    """
+    FindLink = CompileFieldExtractor(Tag, ClassName, 'href')
+
+    def Extract(JobPostDOM):
+        Link = None
+        # Sometimes the link is the main Job post DOM element
+        if ClassName is not None and JobPostDOM.name == Tag:
+            Classes = JobPostDOM.get('class')
+            if Classes is not None and ClassName in Classes:
+                Link = JobPostDOM['href'].strip()
+        if Link is None:
+            Link = FindLink(JobPostDOM)
+        return Link
+
+    return Extract
+
+def CompilePlan(Constants, Columns, UserFields):
+    """
+    Compile the extraction plan of a reader
+    :param Constants reader constants module
+    :param Columns columns to extract, in display order (JobLink first)
+    :param UserFields dictionary of user attribute to (Tag, Class, DOMAttr)
+    :returns ExtractionPlan
+    """
+    Standard = {
+        'JobTitle':    (Constants.RESULT_TITLE_TAG, Constants.RESULT_TITLE_CLASS, None),
+        'CompanyName': (Constants.RESULT_COMPANY_TAG, Constants.RESULT_COMPANY_CLASS, None),
+        'TimePosted':  (Constants.RESULT_POSTED_TAG, Constants.RESULT_POSTED_CLASS, None),
+        'JobLocation': (Constants.RESULT_LOCATION_TAG, Constants.RESULT_LOCATION_CLASS, None),
+    }
+    Fields = []
+    for Column in Columns:
+        if Column == 'JobLink':
+            continue
+        Definition = Standard.get(Column, UserFields.get(Column, (None, None, None)))
+        Fields.append((Column, CompileFieldExtractor(*Definition)))
+
+    return ExtractionPlan(tuple(Columns),
+                          CompileLinkExtractor(Constants.RESULT_LINK_TAG, Constants.RESULT_LINK_CLASS),
+                          tuple(Fields))
+
+# Columns of the Job detail pages, extracted with the DETAIL_<COLUMN>_TAG,
+# DETAIL_<COLUMN>_CLASS and DETAIL_<COLUMN>_ATTR constants of the reader
+DETAIL_COLUMNS = ('Description', 'Salary', 'Seniority')
+
+def CompileDetailPlan(Constants):
+    """
+    Compile the extraction of the Job detail pages: nothing is extracted for
+    a column whose constants are missing or None
+    :param Constants reader constants module
+    :returns tuple of (Column, extractor of the page DOM), in DETAIL_COLUMNS order
+    """
+    return tuple((Column, CompileFieldExtractor(getattr(Constants, 'DETAIL_%s_TAG' % Column.upper(), None),
+                                                getattr(Constants, 'DETAIL_%s_CLASS' % Column.upper(), None),
+                                                getattr(Constants, 'DETAIL_%s_ATTR' % Column.upper(), None)))
+                 for Column in DETAIL_COLUMNS)
@@ -1,9 +1,12 @@
 #!/usr/bin/env python
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import importlib
+from time import perf_counter
+from hashlib import sha1
 from ReaderInterfaces.IReader import IReader
+from ReaderImplementation.ExtractionPlan import CompilePlan, Interned
 from ReaderImplementation.Constants.LinkedInReaderConstants import *
-from pandas import DataFrame
+from Utility.ColumnBatch import ColumnBatch
 
 class DOMNotFoundException(Exception):
     """
@@ -17,6 +20,30 @@ class TagException(Exception):
     """
     pass
 
+# Parser backends: (BeautifulSoup feature, whether only the result list subtree
+# is materialized)
+PARSERS = {
+    'html.parser':    ('html.parser', False),
+    'selective':      ('html.parser', True),
+    'lxml':           ('lxml', False),
+    'lxml-selective': ('lxml', True),
+}
+
+def ClassMatcher(ClassName):
+    """
+    Returns a class_ filter matching ClassName among the classes of a tag. A
+    SoupStrainer sees the raw attribute ("a b") and not the list of classes,
+    so a plain string filter would miss tags having more than one class.
+    """
+    if ClassName is None:
+        return None
+
+    def Matches(Value):
+        if Value is None:
+            return False
+        return ClassName in (Value.split() if isinstance(Value, str) else Value)
+    return Matches
+
 class JobReader(IReader):
     """
     An attempt to generalize Job post retrieving, according to the user requests.
@@ -25,11 +52,15 @@ class JobReader(IReader):
     reader is totally dependent on the constants. If classes are not known or they are empty,
     you can put them as None.
     For reference, you can see ./Constants/LinkedInReaderConstants.py
+    The Parser selects the parser backend: 'html.parser' builds the whole page,
+    'selective' only builds the result list (RESULT_LIST_TAG/RESULT_LIST_CLASS),
+    'lxml' and 'lxml-selective' do the same with the faster lxml parser.
     """
-    def __init__(self, Platform=None):
+    def __init__(self, Platform=None, Parser='html.parser'):
         # Dynamic module loading:
         # This is where constants defined are loaded and helpful for searching the 
         # required data from the pages
+        self.Platform = Platform if Platform is not None else 'LinkedIn'
         if Platform is not None:
             self.Constants = importlib.import_module('ReaderImplementation.Constants.%sReaderConstants' % Platform)
         else:
@@ -49,6 +80,70 @@ class JobReader(IReader):
         self.UserTags, self.UserClass, self.UserAttr = {}, {}, {}
         self.QueryKeyLen = len(self.QueryParams)
         self.PageMultiplier = self.Constants.JOB_SEARCH_PAGE_MULTIPLIER
+        # Seconds a fetched page stays fresh in the response cache
+        self.CacheTTL = getattr(self.Constants, 'RESPONSE_CACHE_TTL', None)
+        # Requests per second to the website and burst, for the RateLimiter
+        self.RateLimit = getattr(self.Constants, 'RATE_LIMIT_PER_SECOND', None)
+        self.RateBurst = getattr(self.Constants, 'RATE_LIMIT_BURST', 1)
+        # Job posts on a full result page
+        self.ResultsPerPage = getattr(self.Constants, 'RESULTS_PER_PAGE', 25)
+        self.SetParser(Parser)
+        # Extraction plans by requested columns, compiled when the reader is built
+        # and again whenever the user tags change.
+        self.Plans = {}
+        self.Plan()
+        self.ConfigDigest = self.ExtractionDigest()
+        # Optional ParseCache of the rows already extracted from unchanged pages
+        self.ParseCache = None
+        # Intern the extracted strings (compact results)
+        self.Compact = False
+
+    def Config(self):
+        """
+        Returns what is needed to build the same reader in another process: the
+        platform, parser backend, URLs and user tags
+        """
+        return {'Platform': self.Platform,
+                'Parser': self.Parser,
+                'DomainName': self.DomainName,
+                'SearchURL': self.SearchURL,
+                'Compact': self.Compact,
+                'UserFields': [(Attr, self.UserTags[Attr], self.UserClass[Attr], self.UserAttr[Attr])
+                               for Attr in self.UserTags]}
+
+    @staticmethod
+    def FromConfig(Config):
+        """
+        Build a reader from the Config of another one
+        """
+        Reader = JobReader(Config['Platform'], Config['Parser'])
+        Reader.DomainName = Config['DomainName']
+        Reader.SearchURL = Config['SearchURL']
+        Reader.Compact = Config.get('Compact', False)
+        for UserField in Config['UserFields']:
+            Reader.SetTagsFromUser(*UserField)
+        return Reader
+
+    def SetParser(self, Parser):
+        """
+        Select the parser backend used for the result pages
+        :param Parser one of html.parser, selective, lxml or lxml-selective
+        """
+        if Parser not in PARSERS:
+            raise ValueError('Parser must be one of {}: found {}'.format(list(PARSERS), Parser))
+        Features, Selective = PARSERS[Parser]
+        if Features == 'lxml':
+            try:
+                import lxml
+            except ImportError:
+                raise ImportError('lxml is required for the %s parser' % Parser)
+
+        self.Parser = Parser
+        self.ParserFeatures = Features
+        # Only the result list, with everything inside it, is kept in the tree
+        self.ParseOnly = SoupStrainer(self.Constants.RESULT_LIST_TAG,
+                                      class_=ClassMatcher(self.Constants.RESULT_LIST_CLASS)) \
+            if Selective else None
 
     def ConstructQueryURL(self, KeywordParams, PageNumber):
         """
@@ -87,6 +182,36 @@ class JobReader(IReader):
         self.UserTags[UserAttr] = TagName
         self.UserClass[UserAttr] = TagClass
         self.UserAttr[UserAttr] = DOMAttr
+        self.Plans = {}
+        self.Plan()
+        # Rows cached with the previous tags no longer match
+        self.ConfigDigest = self.ExtractionDigest()
+
+    def ExtractionDigest(self):
+        """
+        Digest of the extraction configuration: the result constants and the
+        user tags, i.e. everything the rows depend on besides the page
+        """
+        Constants = sorted((Name, repr(Value)) for Name, Value in vars(self.Constants).items()
+                           if Name.startswith('RESULT_'))
+        UserFields = [(Attr, self.UserTags[Attr], self.UserClass[Attr], self.UserAttr[Attr])
+                      for Attr in sorted(self.UserTags)]
+        return sha1(repr((self.Platform, Constants, UserFields)).encode('UTF-8')).hexdigest()
+
+    def Plan(self, ToDisplay=None):
+        """
+        Returns the compiled extraction plan for the requested columns
+        :param ToDisplay columns to display besides the default ones, defaults
+        to all the user defined ones
+        :returns ExtractionPlan
+        """
+        Key = tuple(ToDisplay) if ToDisplay is not None else None
+        Plan = self.Plans.get(Key)
+        if Plan is None:
+            UserFields = {Attr: (self.UserTags[Attr], self.UserClass[Attr], self.UserAttr[Attr])
+                          for Attr in self.UserTags}
+            Plan = self.Plans[Key] = CompilePlan(self.Constants, self.Columns(ToDisplay), UserFields)
+        return Plan
 
     def GetLinkOfJobPostFromJobPostDOM(self, JobPostDOM):
         """
@@ -190,16 +315,14 @@ class JobReader(IReader):
 
     def Columns(self, ToDisplay):
         """
-        Set the columns
+        Set the columns: the default ones, then the requested ones (all the user
+        defined ones if ToDisplay is None)
         """
         columns = list(self.ToDisplay)
-        if ToDisplay is not None:
-            ToDisplay = set(ToDisplay)
-            for Attr in ToDisplay:
-                if Attr in self.ToDisplay:
-                    ToDisplay.remove(Attr)
-
-            columns += list(ToDisplay)
+        ToDisplay = self.UserTags if ToDisplay is None else ToDisplay
+        for Attr in ToDisplay:
+            if Attr not in columns:
+                columns.append(Attr)
 
         return columns
 
@@ -208,52 +331,85 @@ class JobReader(IReader):
         Returns the list of Job list to the Listing
         To prepare: Custom data as per the user requests.
         """
-        ToDisplay = self.Columns(ToDisplay)
+        return self.ExtractContents(Content, ToDisplay).ToDataFrame()
 
-        Soup = BeautifulSoup(Content, features="html.parser", from_encoding="UTF-8")
+    def ExtractContents(self, Content, ToDisplay=None, Timings=None):
+        """
+        Same as ListContents, but returns the rows column wise, to be merged
+        with other pages before building a single DataFrame
+        :param Timings dictionary where the seconds spent parsing the page
+        ('Parse') and extracting the Job posts ('Extract') are set, not set
+        when the rows come from the parse cache, defaults to None
+        :returns ColumnBatch of the Job posts in the page
+        """
+        if self.ParseCache is not None:
+            Digest = sha1(Content if isinstance(Content, bytes) else Content.encode('UTF-8'))
+            Digest.update(repr((self.ConfigDigest, self.DomainName, ToDisplay)).encode('UTF-8'))
+            Key = Digest.hexdigest()
+            Rows = self.ParseCache.Get(Key)
+            if Rows is None:
+                Rows = self.ParseContents(Content, ToDisplay, Timings)
+                self.ParseCache.Put(Key, Rows)
+            return Rows
+
+        return self.ParseContents(Content, ToDisplay, Timings)
+
+    def ParseContents(self, Content, ToDisplay=None, Timings=None):
+        """
+        Parse the page and extract the Job posts, without the parse cache
+        :param Timings dictionary where the parse and extraction seconds are
+        set, defaults to None
+        :returns ColumnBatch of the Job posts in the page
+        """
+        Start = perf_counter()
+        Soup = BeautifulSoup(Content, features=self.ParserFeatures, from_encoding="UTF-8", parse_only=self.ParseOnly)
         JobPostResult = Soup.find(self.Constants.RESULT_LIST_TAG, class_=self.Constants.RESULT_LIST_CLASS)
+        Parsed = perf_counter()
 
         if JobPostResult is not None:
-            AllJobPostDOMList = JobPostResult.findAll(self.Constants.RESULT_PARENT_TAG)
+            AllJobPostDOMList = JobPostResult.find_all(self.Constants.RESULT_PARENT_TAG)
 
             if AllJobPostDOMList is not None:
-                return self.ListAllAvailableCompaniesInfo(AllJobPostDOMList, ToDisplay)
+                Rows = self.ExtractAllAvailableCompaniesInfo(AllJobPostDOMList, ToDisplay)
             else:
                 raise DOMNotFoundException('No DOM element related to search list found')
+        else:
+            Rows = ColumnBatch(self.Plan(ToDisplay).Columns)
 
-        return DataFrame(columns=ToDisplay)
+        if Timings is not None:
+            Timings['Parse'] = Parsed - Start
+            Timings['Extract'] = perf_counter() - Parsed
+        return Rows
 
     def ListAllAvailableCompaniesInfo(self, AllJobPostDOMList, ToDisplay=None):
         """
         Prepares and returns the link associated to the Job details.
         :param AllJobPostDOMList List of all DOM denoting the Job post.
-        :returns a dictionary of links and required details for the Job Post.
+        :returns a DataFrame of links and required details for the Job Post.
         """
-        # To be replaced with dataframe or np array.
-        # Useful for people performing data analytics
-        dataframe = DataFrame(columns=ToDisplay)
+        return self.ExtractAllAvailableCompaniesInfo(AllJobPostDOMList, ToDisplay).ToDataFrame()
+
+    def ExtractAllAvailableCompaniesInfo(self, AllJobPostDOMList, ToDisplay=None):
+        """
+        Prepares the link associated to the Job details, column wise.
+        :param AllJobPostDOMList List of all DOM denoting the Job post.
+        :returns a ColumnBatch of links and required details for the Job Post.
+        """
+        Plan = self.Plan(ToDisplay)
+        Result = ColumnBatch(Plan.Columns)
+        Links = Result.Data['JobLink']
+        Fields = [(Interned(Extract) if self.Compact else Extract, Result.Data[Column].append)
+                  for Column, Extract in Plan.Fields]
+        DomainName = self.DomainName
 
         for JobPostDOM in AllJobPostDOMList:
-            Link = self.GetLinkOfJobPostFromJobPostDOM(JobPostDOM)
+            Link = Plan.Link(JobPostDOM)
             # to check whether if the link has relative path or absolute path
             if Link is not None:
                 # Check if domain name is given or not
-                Link = '%s%s' % (self.DomainName, Link) if Link is not None and not(Link.startswith('https://')) else Link
-                Dictionary = {
-                        'JobLink': Link,
-                        'JobTitle': self.GetJobTitleFromJobPostDOM(JobPostDOM), 
-                        'CompanyName': self.GetCompanyFromJobPostDOM(JobPostDOM), 
-                        'TimePosted': self.GetPostedTimeFromJobPostDOM(JobPostDOM),
-                        'JobLocation': self.GetJobLocationFromJobPostDOM(JobPostDOM)}
-
-                if ToDisplay is not None:
-                    for DisplayAttr in ToDisplay:
-                        if DisplayAttr not in self.ToDisplay:
-                            Dictionary[DisplayAttr] = self.GetDataFromJobPostDOM(JobPostDOM,
-                                                                                self.UserTags[DisplayAttr],
-                                                                                self.UserClass[DisplayAttr],
-                                                                                self.UserAttr[DisplayAttr])
-
-                dataframe = dataframe.append(Dictionary, ignore_index=True)
-
-        return dataframe
+                Links.append(Link if Link.startswith('https://') else '%s%s' % (DomainName, Link))
+                for Extract, Append in Fields:
+                    Append(Extract(JobPostDOM))
+                Result.Size += 1
+
+        return Result
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+"""
+Entry points of the parser worker processes (JobListing pipeline executor).
+Each worker builds its own readers once, from the Config of the readers of
+the listing, and returns the extracted rows as a ColumnBatch: plain lists are
+much cheaper to send back than a pickled DataFrame.
+"""
+from ReaderImplementation.JobReader import JobReader
+from Utility.ColumnBatch import ColumnBatch
+
+WorkerReaders = {}
+
+def InitReaders(Configs):
+    """
+    Worker initializer: build the readers from their Config
+    :param Configs list of JobReader.Config()
+    """
+    WorkerReaders.clear()
+    for Config in Configs:
+        WorkerReaders[Config['Platform']] = JobReader.FromConfig(Config)
+
+def ExtractInWorker(Platform, Content):
+    """
+    Parse a page with the reader of the platform
+    :param Content page content, None for a page that could not be fetched
+    :returns ColumnBatch of the Job posts in the page
+    """
+    if Content is None:
+        return ColumnBatch(WorkerReaders[Platform].Columns(None))
+    return WorkerReaders[Platform].ExtractContents(Content)
+
+def ExtractTimedInWorker(Platform, Content):
+    """
+    Same as ExtractInWorker, with the timings of the parse
+    :returns (ColumnBatch of the Job posts in the page, dictionary of the
+    'Parse' and 'Extract' seconds)
+    """
+    Timings = {}
+    if Content is None:
+        return ColumnBatch(WorkerReaders[Platform].Columns(None)), Timings
+    return WorkerReaders[Platform].ExtractContents(Content, Timings=Timings), Timings
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+import re
+
+CLASS_ATTRIBUTE = re.compile(rb'\sclass\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.IGNORECASE)
+
+class ResultListScanner:
+    """
+    Incremental scanner of a result page, fed with the body as it is
+    downloaded: finds the result list (RESULT_LIST_TAG with the class
+    RESULT_LIST_CLASS, see ClassMatcher) and the end tag closing it, counting
+    the tags of the same name nested in it. Only the tags are scanned, not
+    the markup: an end tag of the list tag inside a comment or a script of
+    the list would end it early.
+    :param Tag tag of the result list
+    :param ClassName class of the result list, defaults to None (any class)
+    """
+    def __init__(self, Tag, ClassName=None):
+        self.Tags = re.compile(rb'<(/?)%s(?=[\s/>])[^>]*>' % re.escape(Tag.encode('UTF-8')), re.IGNORECASE)
+        self.ClassName = ClassName.encode('UTF-8') if ClassName is not None else None
+        self.Buffer = bytearray()
+        # Where the next scan starts, and tags of the list opened (0 before
+        # the list)
+        self.Position = 0
+        self.Depth = 0
+        # End of the result list in the body, None until it is closed
+        self.End = None
+
+    @staticmethod
+    def ForReader(Reader):
+        """
+        Returns a scanner of the result list of the reader's pages
+        """
+        return ResultListScanner(Reader.Constants.RESULT_LIST_TAG, Reader.Constants.RESULT_LIST_CLASS)
+
+    def Feed(self, Chunk):
+        """
+        Append the next chunk of the body
+        :returns True once the result list is closed, the rest of the body is
+        not needed
+        """
+        if self.End is not None:
+            return True
+        self.Buffer += Chunk
+        for Match in self.Tags.finditer(self.Buffer, self.Position):
+            self.Position = Match.end()
+            Tag = Match.group(0)
+            if self.Depth == 0:
+                if not Match.group(1) and self.__IsList__(Tag):
+                    self.Depth = 1
+            elif Match.group(1):
+                self.Depth -= 1
+                if self.Depth == 0:
+                    self.End = Match.end()
+                    return True
+            elif not Tag.endswith(b'/>'):
+                self.Depth += 1
+        # A tag cut by the end of the chunk is scanned again with the next one
+        self.Position = max(self.Position, self.Buffer.rfind(b'<', self.Position))
+        return False
+
+    def __IsList__(self, Tag):
+        """
+        Internal method checking the class of an opening tag of the list tag
+        """
+        if self.ClassName is None:
+            return True
+        Match = CLASS_ATTRIBUTE.search(Tag)
+        if Match is None:
+            return False
+        Classes = next(Group for Group in Match.groups() if Group is not None)
+        return self.ClassName in Classes.split()
+
+    def Content(self):
+        """
+        Returns the body received, up to the end of the result list once it is
+        closed
+        """
+        return bytes(self.Buffer[:self.End] if self.End is not None else self.Buffer)
@@ -1,20 +1,225 @@
-from concurrent.futures import ThreadPoolExecutor
-from pandas import DataFrame
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from queue import Queue
+import asyncio
+from pandas import DataFrame, concat
+from Utility.ColumnBatch import ColumnBatch
+from Utility.CompactFrame import CompactDataFrame, ExpandLinks
 
-def SendParallelRequest(Method, URLParamList):
+def MergeResults(Results, Compact=False):
+    """
+    Merge the results of the pages into a single DataFrame, built only once.
+    :param Results list of ColumnBatch or DataFrame, one per page
+    :param Compact build the compact DataFrame (see Utility.CompactFrame)
+    :returns DataFrame from multiple sources
+    """
+    Results = list(Results)
+    if len(Results) == 0:
+        return DataFrame()
+    if all(isinstance(Result, ColumnBatch) for Result in Results):
+        return ColumnBatch.Concat(Results).ToDataFrame(Compact)
+    Results = [Result.ToDataFrame() if isinstance(Result, ColumnBatch) else ExpandLinks(Result)
+               for Result in Results]
+    Merged = concat(Results, ignore_index=True)
+    return CompactDataFrame(Merged) if Compact else Merged
+
+def SendParallelRequest(Method, URLParamList, MaxWorkers=5):
     """
     Parallel execution of method
     :param method, method to execute
     :param URLParamList URL parameters to be passed to the method
+    :param MaxWorkers number of threads sending the requests, defaults to 5
+    :returns DataFrame from multiple sources
+    """
+    return MergeResults(MapParallelRequest(Method, URLParamList, MaxWorkers))
+
+def MapParallelRequest(Method, URLParamList, MaxWorkers=5):
+    """
+    Parallel execution of method, without merging the results
+    :param method, method to execute
+    :param URLParamList URL parameters to be passed to the method
+    :param MaxWorkers number of threads sending the requests, defaults to 5
+    :returns list of the results, in the order of URLParamList
+    """
+    with ThreadPoolExecutor(max_workers=MaxWorkers) as Executor:
+        return list(Executor.map(Method, URLParamList))
+
+def StreamParallelRequest(Method, URLParamList, MaxWorkers=5, MaxPending=None):
+    """
+    Parallel execution of method, yielding the results as soon as they are
+    available. At most MaxPending calls are submitted and not yet handed
+    over: the next one is submitted when a result is consumed, so that a slow
+    consumer does not keep the results of all the pages in memory.
+    :param method, method to execute
+    :param URLParamList URL parameters to be passed to the method
+    :param MaxWorkers number of threads sending the requests, defaults to 5
+    :param MaxPending calls in flight or waiting for the consumer, defaults to
+    2 * MaxWorkers
+    :returns generator of (URL parameter, result), in completion order
+    """
+    MaxPending = 2 * MaxWorkers if MaxPending is None else MaxPending
+    Remaining = iter(URLParamList)
+    with ThreadPoolExecutor(max_workers=MaxWorkers) as Executor:
+        Futures = {Executor.submit(Method, Params): Params for Params in islice(Remaining, MaxPending)}
+        try:
+            while len(Futures) > 0:
+                Done, _ = wait(list(Futures), return_when=FIRST_COMPLETED)
+                while len(Done) > 0:
+                    # Drop the references to the result once it is handed over
+                    Future = Done.pop()
+                    Params, Result = Futures.pop(Future), Future.result()
+                    del Future
+                    yield Params, Result
+                    for Params in islice(Remaining, 1):
+                        Futures[Executor.submit(Method, Params)] = Params
+        finally:
+            # The consumer stopped early (or a request failed): do not send the rest
+            for Future in Futures:
+                Future.cancel()
+
+def LimitConcurrency(Method, MaxConcurrency=100, PerSiteConcurrency=None, SiteKey=None):
+    """
+    Wrap a coroutine method so that at most MaxConcurrency calls run at once,
+    and at most PerSiteConcurrency for the same site
+    :param SiteKey function returning the site of a URL parameter, defaults to
+    the first element of the parameter (the reader)
+    :returns coroutine function with the same arguments as Method
+    """
+    PerSiteConcurrency = MaxConcurrency if PerSiteConcurrency is None else PerSiteConcurrency
+    SiteKey = (lambda Params: Params[0]) if SiteKey is None else SiteKey
+    GlobalLimit = asyncio.Semaphore(MaxConcurrency)
+    SiteLimits = {}
+
+    async def Bounded(Params):
+        Site = SiteKey(Params)
+        if Site not in SiteLimits:
+            SiteLimits[Site] = asyncio.Semaphore(PerSiteConcurrency)
+        # Site slot first: a request waiting on a busy site should not hold a
+        # global slot that another site could use.
+        async with SiteLimits[Site]:
+            async with GlobalLimit:
+                return await Method(Params)
+
+    return Bounded
+
+def StreamPipelinedRequest(Fetch, Parse, URLParamList, Parsers, MaxWorkers=5, MaxPending=None):
+    """
+    Pipelined execution: the fetches run on threads, and each fetched page is
+    handed over to a pool of processes for the parsing, so that the parsing is
+    not limited to one core by the GIL. At most MaxPending pages are fetched,
+    parsed or waiting for the consumer at once, as in StreamParallelRequest.
+    :param Fetch method returning the arguments of Parse for a URL parameter
+    :param Parse function run in the worker processes (must be picklable)
+    :param URLParamList URL parameters to be passed to Fetch
+    :param Parsers ProcessPoolExecutor running Parse
+    :param MaxWorkers number of threads fetching the pages, defaults to 5
+    :param MaxPending pages not yet handed over, defaults to 2 * MaxWorkers
+    :returns generator of (URL parameter, result of Parse), in completion order
+    """
+    MaxPending = 2 * MaxWorkers if MaxPending is None else MaxPending
+    Remaining = iter(URLParamList)
+    Done = Queue()
+
+    def FetchAndParse(Params):
+        try:
+            Parsed = Parsers.submit(Parse, *Fetch(Params))
+        except BaseException as Error:
+            Done.put((Params, None, Error))
+            return
+        Parsed.add_done_callback(lambda Parsed: Done.put((Params, Parsed, None)))
+
+    with ThreadPoolExecutor(max_workers=MaxWorkers) as Executor:
+        Fetches = [Executor.submit(FetchAndParse, Params) for Params in islice(Remaining, MaxPending)]
+        Pending = len(Fetches)
+        try:
+            while Pending > 0:
+                Params, Parsed, Error = Done.get()
+                Pending -= 1
+                if Error is not None:
+                    raise Error
+                yield Params, Parsed.result()
+                for Params in islice(Remaining, 1):
+                    Fetches.append(Executor.submit(FetchAndParse, Params))
+                    Pending += 1
+        finally:
+            for Fetched in Fetches:
+                Fetched.cancel()
+
+def MapPipelinedRequest(Fetch, Parse, URLParamList, Parsers, MaxWorkers=5):
+    """
+    Same as StreamPipelinedRequest, without streaming the results
+    :returns list of the results, in the order of URLParamList
+    """
+    Results = [None] * len(URLParamList)
+    IndexedFetch = lambda Indexed: Fetch(Indexed[1])
+    # Every result is kept anyway, no need to bound the pages in flight
+    for (Index, Params), Result in StreamPipelinedRequest(IndexedFetch, Parse, list(enumerate(URLParamList)),
+                                                          Parsers, MaxWorkers, len(URLParamList)):
+        Results[Index] = Result
+    return Results
+
+async def SendAsyncRequest(Method, URLParamList, MaxConcurrency=100, PerSiteConcurrency=None, SiteKey=None):
+    """
+    Concurrent execution of a coroutine method on the running event loop
+    :param Method coroutine function to execute
+    :param URLParamList URL parameters to be passed to the method
+    :param MaxConcurrency maximum number of requests in flight, defaults to 100
+    :param PerSiteConcurrency maximum number of requests in flight for a single
+    site, defaults to MaxConcurrency
+    :param SiteKey function returning the site of a URL parameter, defaults to
+    the first element of the parameter (the reader)
     :returns DataFrame from multiple sources
     """
-    URLListResult = DataFrame()
-    with ThreadPoolExecutor(max_workers=5) as Executor:
-        Executor.submit(Method, len(URLParamList))
-        
-        result = Executor.map(Method, URLParamList)
+    return MergeResults(await MapAsyncRequest(Method, URLParamList, MaxConcurrency, PerSiteConcurrency, SiteKey))
+
+async def MapAsyncRequest(Method, URLParamList, MaxConcurrency=100, PerSiteConcurrency=None, SiteKey=None):
+    """
+    Concurrent execution of a coroutine method on the running event loop,
+    without merging the results
+    :param Method coroutine function to execute
+    :param URLParamList URL parameters to be passed to the method
+    :param MaxConcurrency maximum number of requests in flight, defaults to 100
+    :param PerSiteConcurrency maximum number of requests in flight for a single
+    site, defaults to MaxConcurrency
+    :param SiteKey function returning the site of a URL parameter, defaults to
+    the first element of the parameter (the reader)
+    :returns list of the results, in the order of URLParamList
+    """
+    Bounded = LimitConcurrency(Method, MaxConcurrency, PerSiteConcurrency, SiteKey)
+    return await asyncio.gather(*[Bounded(Params) for Params in URLParamList])
+
+async def StreamAsyncRequest(Method, URLParamList, MaxConcurrency=100, PerSiteConcurrency=None, SiteKey=None,
+                             MaxPending=None):
+    """
+    Concurrent execution of a coroutine method on the running event loop,
+    yielding the results as soon as they are available. At most MaxPending
+    calls are started and not yet handed over, as in StreamParallelRequest.
+    :param Method coroutine function to execute
+    :param URLParamList URL parameters to be passed to the method
+    :param MaxConcurrency maximum number of requests in flight, defaults to 100
+    :param PerSiteConcurrency maximum number of requests in flight for a single
+    site, defaults to MaxConcurrency
+    :param SiteKey function returning the site of a URL parameter, defaults to
+    the first element of the parameter (the reader)
+    :param MaxPending calls started and not yet handed over, defaults to
+    2 * MaxConcurrency
+    :returns async generator of (URL parameter, result), in completion order
+    """
+    Bounded = LimitConcurrency(Method, MaxConcurrency, PerSiteConcurrency, SiteKey)
+    MaxPending = 2 * MaxConcurrency if MaxPending is None else MaxPending
+    Remaining = iter(URLParamList)
 
-    for dictionary in result:
-        URLListResult = URLListResult.append(dictionary)
+    async def WithParams(Params):
+        return Params, await Bounded(Params)
 
-    return URLListResult
+    Tasks = {asyncio.ensure_future(WithParams(Params)) for Params in islice(Remaining, MaxPending)}
+    try:
+        while len(Tasks) > 0:
+            Done, Tasks = await asyncio.wait(Tasks, return_when=asyncio.FIRST_COMPLETED)
+            while len(Done) > 0:
+                yield Done.pop().result()
+                for Params in islice(Remaining, 1):
+                    Tasks.add(asyncio.ensure_future(WithParams(Params)))
+    finally:
+        for Task in Tasks:
+            Task.cancel()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+import json
+import sqlite3
+import uuid
+from abc import ABC, abstractmethod
+from threading import Lock
+from time import time
+from Utility.ColumnBatch import ColumnBatch
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+# Task states
+PENDING, LEASED, DONE, FAILED = 'pending', 'leased', 'done', 'failed'
+
+def EncodeRows(Rows):
+    """
+    JSON of the rows of a page, to be stored in a queue
+    """
+    return json.dumps({'Columns': Rows.Columns, 'Data': Rows.Data}, default=str)
+
+def DecodeRows(Encoded):
+    """
+    ColumnBatch from EncodeRows
+    """
+    Decoded = json.loads(Encoded)
+    Rows = ColumnBatch(Decoded['Columns'])
+    Rows.Data = Decoded['Data']
+    Rows.Size = len(Rows.Data[Rows.Columns[0]]) if len(Rows.Columns) > 0 else 0
+    return Rows
+
+class IWorkQueue(ABC):
+    """
+    Queue of pages to scrape shared by the scraper hosts. Tasks are published
+    in batches (one per SendRequests), leased by the workers for LeaseSeconds,
+    and go back to the queue when their lease expires without being completed
+    (crashed worker), up to MaxAttempts leases.
+    A task is a JSON serializable dict, see JobListing.Publish.
+    """
+    @abstractmethod
+    def Publish(self, Tasks):
+        """
+        Add a batch of tasks to the queue
+        :param Tasks list of tasks
+        :returns id of the batch
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def Lease(self, Worker, Count=1):
+        """
+        Lease pending tasks (or tasks whose lease expired)
+        :param Worker name of the worker
+        :param Count maximum number of tasks
+        :returns list of (task id, task)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def Complete(self, TaskId, Rows, Worker):
+        """
+        Mark a task done, with the rows of its page (ColumnBatch)
+        :param Worker name of the worker that leased the task
+        :returns False when the worker no longer holds the lease (it expired
+        and the task was leased again or failed), the rows are dropped
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def Fail(self, TaskId, Error, Worker):
+        """
+        Give a task back: it is leased again later, or failed for good after
+        MaxAttempts leases
+        :param Worker name of the worker that leased the task
+        :returns False when the worker no longer holds the lease
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def Progress(self, Batch):
+        """
+        Returns the number of tasks of the batch per state (pending, leased,
+        done, failed)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def Results(self, Batch):
+        """
+        Returns the rows of the done tasks of the batch, in publication order
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def Failures(self, Batch):
+        """
+        Returns (task, error) of the failed tasks of the batch
+        """
+        raise NotImplementedError
+
+    def Close(self):
+        pass
+
+class SQLiteWorkQueue(IWorkQueue):
+    """
+    Work queue in an SQLite file, for the workers of a single host (or hosts
+    sharing a file system with working locks).
+    :param Path SQLite file of the queue
+    :param LeaseSeconds seconds a worker has to complete a leased task
+    :param MaxAttempts number of leases of a task before it is failed
+    """
+    def __init__(self, Path='WorkQueue.db', LeaseSeconds=120, MaxAttempts=3):
+        self.LeaseSeconds = LeaseSeconds
+        self.MaxAttempts = MaxAttempts
+        self.QueueLock = Lock()
+        self.Connection = sqlite3.connect(Path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.Connection.execute('PRAGMA journal_mode=WAL')
+        self.Connection.execute('CREATE TABLE IF NOT EXISTS Tasks ('
+                                'TaskId TEXT PRIMARY KEY, Batch TEXT, Position INTEGER, Task TEXT, '
+                                'State TEXT, Worker TEXT, LeaseUntil REAL, Attempts INTEGER, '
+                                'Result TEXT, Error TEXT)')
+        self.Connection.execute('CREATE INDEX IF NOT EXISTS TasksByState ON Tasks (State, LeaseUntil)')
+        self.Connection.execute('CREATE INDEX IF NOT EXISTS TasksByBatch ON Tasks (Batch, State)')
+
+    def Publish(self, Tasks):
+        Batch = uuid.uuid4().hex
+        with self.QueueLock:
+            self.Connection.execute('BEGIN IMMEDIATE')
+            self.Connection.executemany('INSERT INTO Tasks VALUES (?, ?, ?, ?, ?, NULL, 0, 0, NULL, NULL)',
+                                        [('%s:%d' % (Batch, Position), Batch, Position, json.dumps(Task), PENDING)
+                                         for Position, Task in enumerate(Tasks)])
+            self.Connection.execute('COMMIT')
+        return Batch
+
+    def Lease(self, Worker, Count=1):
+        Now = time()
+        with self.QueueLock:
+            # Write lock first: two workers must not lease the same tasks
+            self.Connection.execute('BEGIN IMMEDIATE')
+            try:
+                self.Connection.execute('UPDATE Tasks SET State = ?, Error = ? '
+                                        'WHERE State = ? AND LeaseUntil < ? AND Attempts >= ?',
+                                        (FAILED, 'lease expired', LEASED, Now, self.MaxAttempts))
+                Leased = self.Connection.execute(
+                    'SELECT TaskId, Task FROM Tasks WHERE State = ? OR (State = ? AND LeaseUntil < ?) '
+                    'ORDER BY rowid LIMIT ?', (PENDING, LEASED, Now, Count)).fetchall()
+                self.Connection.executemany('UPDATE Tasks SET State = ?, Worker = ?, LeaseUntil = ?, '
+                                            'Attempts = Attempts + 1 WHERE TaskId = ?',
+                                            [(LEASED, Worker, Now + self.LeaseSeconds, TaskId)
+                                             for TaskId, Task in Leased])
+                self.Connection.execute('COMMIT')
+            except BaseException:
+                self.Connection.execute('ROLLBACK')
+                raise
+        return [(TaskId, json.loads(Task)) for TaskId, Task in Leased]
+
+    def Complete(self, TaskId, Rows, Worker):
+        with self.QueueLock:
+            Cursor = self.Connection.execute('UPDATE Tasks SET State = ?, Result = ?, Error = NULL '
+                                             'WHERE TaskId = ? AND State = ? AND Worker = ?',
+                                             (DONE, EncodeRows(Rows), TaskId, LEASED, Worker))
+        return Cursor.rowcount > 0
+
+    def Fail(self, TaskId, Error, Worker):
+        with self.QueueLock:
+            Cursor = self.Connection.execute('UPDATE Tasks SET State = CASE WHEN Attempts >= ? THEN ? ELSE ? END, '
+                                             'Error = ? WHERE TaskId = ? AND State = ? AND Worker = ?',
+                                             (self.MaxAttempts, FAILED, PENDING, str(Error), TaskId, LEASED,
+                                              Worker))
+        return Cursor.rowcount > 0
+
+    def Progress(self, Batch):
+        Now = time()
+        Counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        with self.QueueLock:
+            for State, Expired, Count in self.Connection.execute(
+                    'SELECT State, State = ? AND LeaseUntil < ?, COUNT(*) FROM Tasks WHERE Batch = ? '
+                    'GROUP BY 1, 2', (LEASED, Now, Batch)):
+                # An expired lease is pending again
+                Counts[PENDING if Expired else State] += Count
+        return Counts
+
+    def Results(self, Batch):
+        with self.QueueLock:
+            return [DecodeRows(Result) for Result, in self.Connection.execute(
+                'SELECT Result FROM Tasks WHERE Batch = ? AND State = ? ORDER BY Position', (Batch, DONE))]
+
+    def Failures(self, Batch):
+        with self.QueueLock:
+            return [(json.loads(Task), Error) for Task, Error in self.Connection.execute(
+                'SELECT Task, Error FROM Tasks WHERE Batch = ? AND State = ? ORDER BY Position', (Batch, FAILED))]
+
+    def Close(self):
+        with self.QueueLock:
+            self.Connection.close()
+
+class RedisWorkQueue(IWorkQueue):
+    """
+    Work queue on a Redis (or Redis compatible) server, shared by hosts. Each
+    batch has a list of pending task ids, leases are a sorted set of task ids
+    by expiry, and the moves between them are Lua scripts so that a task is
+    never lost nor leased twice. The worker holding the lease of a task is
+    kept in a hash, only it can complete or fail the task.
+    :param Client redis client, defaults to a client of URL
+    :param URL URL of the server, when no Client is given
+    :param Name prefix of the keys of the queue
+    :param LeaseSeconds seconds a worker has to complete a leased task
+    :param MaxAttempts number of leases of a task before it is failed
+    """
+    # KEYS: pending, leases, attempts, prefix of the failed sets (the batch
+    # is appended), errors, owners; ARGV: now, lease until, count, max
+    # attempts, worker
+    LEASE_SCRIPT = """
+    local Expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+    for _, TaskId in ipairs(Expired) do
+        redis.call('ZREM', KEYS[2], TaskId)
+        redis.call('HDEL', KEYS[6], TaskId)
+        if tonumber(redis.call('HGET', KEYS[3], TaskId) or '0') >= tonumber(ARGV[4]) then
+            redis.call('SADD', KEYS[4] .. string.match(TaskId, '^[^:]+'), TaskId)
+            redis.call('HSET', KEYS[5], TaskId, 'lease expired')
+        else
+            redis.call('LPUSH', KEYS[1], TaskId)
+        end
+    end
+    local Leased = {}
+    for Index = 1, tonumber(ARGV[3]) do
+        local TaskId = redis.call('RPOP', KEYS[1])
+        if not TaskId then break end
+        redis.call('ZADD', KEYS[2], ARGV[2], TaskId)
+        redis.call('HSET', KEYS[6], TaskId, ARGV[5])
+        redis.call('HINCRBY', KEYS[3], TaskId, 1)
+        table.insert(Leased, TaskId)
+    end
+    return Leased
+    """
+    # KEYS: leases, owners, results of the batch, done set; ARGV: task id,
+    # worker, encoded rows
+    COMPLETE_SCRIPT = """
+    if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then return 0 end
+    if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then return 0 end
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    redis.call('HSET', KEYS[3], ARGV[1], ARGV[3])
+    redis.call('SADD', KEYS[4], ARGV[1])
+    return 1
+    """
+    # KEYS: leases, pending, attempts, failed set, errors, owners; ARGV: task
+    # id, max attempts, error, worker
+    FAIL_SCRIPT = """
+    if redis.call('HGET', KEYS[6], ARGV[1]) ~= ARGV[4] then return 0 end
+    if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then return 0 end
+    redis.call('HDEL', KEYS[6], ARGV[1])
+    if tonumber(redis.call('HGET', KEYS[3], ARGV[1]) or '0') >= tonumber(ARGV[2]) then
+        redis.call('SADD', KEYS[4], ARGV[1])
+        redis.call('HSET', KEYS[5], ARGV[1], ARGV[3])
+    else
+        redis.call('LPUSH', KEYS[2], ARGV[1])
+    end
+    return 1
+    """
+
+    def __init__(self, Client=None, URL='redis://localhost:6379/0', Name='scraping', LeaseSeconds=120,
+                 MaxAttempts=3):
+        if Client is None:
+            if redis is None:
+                raise ImportError('redis is required for the RedisWorkQueue')
+            Client = redis.Redis.from_url(URL)
+        self.Client = Client
+        self.Name = Name
+        self.LeaseSeconds = LeaseSeconds
+        self.MaxAttempts = MaxAttempts
+        self.LeaseScript = Client.register_script(self.LEASE_SCRIPT)
+        self.CompleteScript = Client.register_script(self.COMPLETE_SCRIPT)
+        self.FailScript = Client.register_script(self.FAIL_SCRIPT)
+
+    def __Key__(self, *Parts):
+        return ':'.join((self.Name,) + Parts)
+
+    @staticmethod
+    def __Text__(Value):
+        return Value.decode('UTF-8') if isinstance(Value, bytes) else Value
+
+    def Publish(self, Tasks):
+        Batch = uuid.uuid4().hex
+        TaskIds = ['%s:%d' % (Batch, Position) for Position in range(len(Tasks))]
+        Pipeline = self.Client.pipeline()
+        if len(Tasks) > 0:
+            Pipeline.hset(self.__Key__('tasks'), mapping={TaskId: json.dumps(Task)
+                                                           for TaskId, Task in zip(TaskIds, Tasks)})
+            # Oldest first: tasks are pushed on the left and popped on the right
+            Pipeline.lpush(self.__Key__('pending'), *TaskIds)
+        Pipeline.hset(self.__Key__('batches'), Batch, len(Tasks))
+        Pipeline.execute()
+        return Batch
+
+    def Lease(self, Worker, Count=1):
+        Now = time()
+        TaskIds = [self.__Text__(TaskId) for TaskId in self.LeaseScript(
+            keys=[self.__Key__('pending'), self.__Key__('leases'), self.__Key__('attempts'),
+                  self.__Key__('failed', ''), self.__Key__('errors'), self.__Key__('owners')],
+            args=[Now, Now + self.LeaseSeconds, Count, self.MaxAttempts, Worker])]
+        if len(TaskIds) == 0:
+            return []
+        Tasks = self.Client.hmget(self.__Key__('tasks'), TaskIds)
+        return [(TaskId, json.loads(Task)) for TaskId, Task in zip(TaskIds, Tasks)]
+
+    def Complete(self, TaskId, Rows, Worker):
+        Batch = TaskId.split(':')[0]
+        return self.CompleteScript(keys=[self.__Key__('leases'), self.__Key__('owners'),
+                                         self.__Key__('results', Batch), self.__Key__('done', Batch)],
+                                   args=[TaskId, Worker, EncodeRows(Rows)]) == 1
+
+    def Fail(self, TaskId, Error, Worker):
+        Batch = TaskId.split(':')[0]
+        return self.FailScript(keys=[self.__Key__('leases'), self.__Key__('pending'), self.__Key__('attempts'),
+                                     self.__Key__('failed', Batch), self.__Key__('errors'), self.__Key__('owners')],
+                               args=[TaskId, self.MaxAttempts, str(Error), Worker]) == 1
+
+    def Progress(self, Batch):
+        Total = int(self.Client.hget(self.__Key__('batches'), Batch) or 0)
+        Done = self.Client.scard(self.__Key__('done', Batch))
+        Failed = self.Client.scard(self.__Key__('failed', Batch))
+        Prefix = Batch + ':'
+        Leased = sum(1 for TaskId in self.Client.zrangebyscore(self.__Key__('leases'), time(), '+inf')
+                     if self.__Text__(TaskId).startswith(Prefix))
+        return {PENDING: Total - Done - Failed - Leased, LEASED: Leased, DONE: Done, FAILED: Failed}
+
+    def Results(self, Batch):
+        Results = self.Client.hgetall(self.__Key__('results', Batch))
+        Ordered = sorted(Results.items(), key=lambda Item: int(self.__Text__(Item[0]).split(':')[1]))
+        return [DecodeRows(Result) for TaskId, Result in Ordered]
+
+    def Failures(self, Batch):
+        TaskIds = sorted((self.__Text__(TaskId) for TaskId in self.Client.smembers(self.__Key__('failed', Batch))),
+                         key=lambda TaskId: int(TaskId.split(':')[1]))
+        if len(TaskIds) == 0:
+            return []
+        Tasks = self.Client.hmget(self.__Key__('tasks'), TaskIds)
+        Errors = self.Client.hmget(self.__Key__('errors'), TaskIds)
+        return [(json.loads(Task), self.__Text__(Error)) for Task, Error in zip(Tasks, Errors)]
+
+    def Close(self):
+        self.Client.close()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+import unittest
+from pandas import DataFrame
+from Utility.ColumnBatch import ColumnBatch
+from Utility.DuplicateIndex import DuplicateIndex
+
+COLUMNS = ['JobLink', 'JobTitle', 'CompanyName', 'JobLocation']
+
+def Batch(*Posts):
+    Rows = ColumnBatch(COLUMNS)
+    for Post in Posts:
+        Rows.AppendRow(dict(zip(COLUMNS, Post)))
+    return Rows
+
+class UniqueTest(unittest.TestCase):
+    def setUp(self):
+        self.Index = DuplicateIndex()
+
+    def tearDown(self):
+        self.Index.Close()
+
+    def test_same_link_is_a_duplicate(self):
+        Link = 'https://www.linkedin.com/jobs/view/1'
+        self.assertEqual(len(self.Index.Unique(Batch((Link, 'Software Engineer', 'Acme', 'Pune')), 'LinkedIn')), 1)
+        # Another host spelling and tracking parameters, another title: the link is the identity
+        Again = Batch(('https://linkedin.com/jobs/view/1/?utm_source=mail', 'Data Analyst', 'Acme', 'Pune'))
+        self.assertEqual(len(self.Index.Unique(Again, 'LinkedIn')), 0)
+        self.assertEqual(self.Index.MarkSeen(Again, 'Indeed'), [Link])
+
+    def test_repost_on_another_platform_is_a_duplicate(self):
+        Original = 'https://www.linkedin.com/jobs/view/1'
+        self.Index.Unique(Batch((Original, 'Senior Software Engineer', 'Acme', 'Bengaluru, India')), 'LinkedIn')
+        Repost = Batch(('https://www.indeed.com/viewjob?jk=9', 'Sr. Software Engg', 'Acme Pvt Ltd',
+                        'Bangalore, Karnataka, India'))
+        self.assertEqual(self.Index.MarkSeen(Repost, 'Indeed'), [Original])
+
+    def test_other_links_of_the_same_platform_are_kept(self):
+        Rows = Batch(('https://www.linkedin.com/jobs/view/1', 'Software Engineer', 'Acme', 'Pune'),
+                     ('https://www.linkedin.com/jobs/view/2', 'Software Engineer', 'Acme', 'Pune'))
+        self.assertEqual(len(self.Index.Unique(Rows, 'LinkedIn')), 2)
+        # Unknown platforms are never near duplicates either
+        Rows = Batch(('https://example.com/3', 'Software Engineer', 'Acme', 'Pune'),
+                     ('https://example.com/4', 'Software Engineer', 'Acme', 'Pune'))
+        self.assertEqual(len(self.Index.Unique(Rows)), 2)
+
+    def test_seniority_is_not_a_duplicate(self):
+        self.Index.Unique(Batch(('https://www.linkedin.com/jobs/view/1', 'Software Engineer', 'Acme', 'Pune')),
+                          'LinkedIn')
+        Rows = Batch(('https://www.indeed.com/viewjob?jk=1', 'Senior Software Engineer', 'Acme', 'Pune'))
+        self.assertEqual(len(self.Index.Unique(Rows, 'Indeed')), 1)
+
+    def test_platform_per_row(self):
+        Rows = Batch(('https://www.linkedin.com/jobs/view/1', 'Data Scientist', 'Acme', 'Pune'),
+                     ('https://www.indeed.com/viewjob?jk=1', 'Data Scientist', 'Acme Inc.', 'Poona'),
+                     ('https://www.linkedin.com/jobs/view/2', 'Data Scientist', 'Acme', 'Pune'))
+        self.assertEqual(self.Index.MarkSeen(Rows, ['LinkedIn', 'Indeed', 'LinkedIn']),
+                         [None, 'https://www.linkedin.com/jobs/view/1', None])
+
+    def test_data_frame(self):
+        Rows = DataFrame([('https://www.linkedin.com/jobs/view/1', 'Designer', 'Acme', 'Pune'),
+                          ('https://www.linkedin.com/jobs/view/1?refId=feed', 'Designer', 'Acme', 'Pune')],
+                         columns=COLUMNS)
+        Unique = self.Index.Unique(Rows, 'LinkedIn')
+        self.assertEqual(Unique['JobLink'].tolist(), ['https://www.linkedin.com/jobs/view/1'])
+        self.assertEqual(self.Index.Stats()['Indexed'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
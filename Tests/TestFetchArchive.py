@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from ListingImplementation.JobListing import JobListing
+from Utility.FetchArchive import FetchArchive
+from Benchmarks.StubServer import StubServer
+
+URL = 'https://www.linkedin.com/jobs/search?keywords=python&start=0'
+
+class ArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.Directory = tempfile.TemporaryDirectory()
+        self.Path = os.path.join(self.Directory.name, 'Scrape.archive')
+
+    def tearDown(self):
+        self.Directory.cleanup()
+
+    def test_modes(self):
+        with self.assertRaises(ValueError):
+            FetchArchive(self.Path, 'rewrite')
+        with self.assertRaises(FileNotFoundError):
+            FetchArchive(self.Path, 'replay')
+
+    def test_record_then_replay(self):
+        Archive = FetchArchive(self.Path, 'record')
+        Archive.Record('LinkedIn', URL, 503, {'Retry-After': '1'}, b'', 0.1, 0.0, 0)
+        Archive.Record('LinkedIn', URL, 200, {'ETag': '"1"', 'Content-Encoding': 'gzip', 'Content-Length': '20'},
+                       b'<html>page</html>', 0.2, 0.05, 20)
+        Archive.Record('Indeed', 'https://in.indeed.com/jobs?q=python', 200, {}, b'<html>other</html>', 0.3, 0.0, 18)
+        self.assertEqual(len(Archive), 3)
+        Archive.Close()
+
+        Archive = FetchArchive(self.Path, 'replay')
+        self.assertTrue(Archive.Replaying)
+        self.assertEqual(Archive.URLs(), [('LinkedIn', URL), ('Indeed', 'https://in.indeed.com/jobs?q=python')])
+        self.assertEqual(Archive.URLs('Indeed'), [('Indeed', 'https://in.indeed.com/jobs?q=python')])
+        # The answers of a URL in sequence (the retry replays the same way), the last one repeated
+        First, Second, Third = [Archive.Answer(URL) for Attempt in range(3)]
+        self.assertEqual((First.Status, First.Headers['retry-after']), (503, '1'))
+        self.assertEqual((Second.Status, Second.Content, Second.TTFB, Second.Download, Second.WireBytes),
+                         (200, b'<html>page</html>', 0.2, 0.05, 20))
+        # The body is kept decoded: the headers describing its transfer are dropped
+        self.assertEqual(dict(Second.Headers), {'ETag': '"1"'})
+        self.assertEqual(Third.Content, Second.Content)
+        self.assertIsNone(Archive.Answer('https://www.linkedin.com/jobs/search?keywords=java'))
+        Archive.Rewind()
+        self.assertEqual(Archive.Answer(URL).Status, 503)
+        Stats = Archive.Stats()
+        self.assertEqual((Stats['Records'], Stats['URLs'], Stats['Bytes']), (3, 2, 35))
+        Archive.Close()
+
+    def test_record_appends(self):
+        for Status in (500, 200):
+            Archive = FetchArchive(self.Path, 'record')
+            Archive.Record('LinkedIn', URL, Status, {}, b'page', 0.1, 0.0, 4)
+            Archive.Close()
+        Archive = FetchArchive(self.Path, 'replay')
+        self.assertEqual([Archive.Answer(URL).Status for Attempt in range(2)], [500, 200])
+        Archive.Close()
+
+class ReplayTest(unittest.TestCase):
+    """
+    A scrape of the stub recorded, then replayed with the stub shut down
+    """
+    def test_replayed_rows_are_the_recorded_ones(self):
+        Query = {'SearchQuery': 'python', 'NumberOfPages': 3}
+        with tempfile.TemporaryDirectory() as Directory:
+            Path = os.path.join(Directory, 'Scrape.archive')
+            Archive = FetchArchive(Path, 'record')
+            with StubServer(NoiseBlocks=10) as Server:
+                Listing = JobListing(['LinkedIn', 'Indeed'], Archive=Archive)
+                for Platform, Reader in Listing.readers.items():
+                    Server.PointReader(Reader, Platform)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    Recorded = Listing.SendRequests({Platform: [Query] for Platform in Listing.readers})
+                Listing.Close()
+                Base = Server.URL()
+            Archive.Close()
+            self.assertEqual(len(Recorded), 2 * 3 * 25)
+
+            for Executor in ('thread', 'async'):
+                Archive = FetchArchive(Path, 'replay')
+                Listing = JobListing(['LinkedIn', 'Indeed'], Executor=Executor, Archive=Archive)
+                for Platform, Reader in Listing.readers.items():
+                    Reader.SearchURL = '%s/%s/jobs' % (Base, Platform)
+                    Reader.DomainName = Base
+                with contextlib.redirect_stdout(io.StringIO()):
+                    Replayed = Listing.SendRequests({Platform: [Query] for Platform in Listing.readers})
+                    Missing = Listing.SendRequests({'LinkedIn': [{'SearchQuery': 'java', 'NumberOfPages': 1}]})
+                Failures = Listing.Failures
+                Listing.Close()
+                Archive.Close()
+                Columns = list(Recorded.columns)
+                self.assertTrue(Replayed.sort_values(Columns).reset_index(drop=True).equals(
+                    Recorded.sort_values(Columns).reset_index(drop=True)), Executor)
+                # Not in the archive: failed as a page that could not be fetched
+                self.assertTrue(Missing is None or len(Missing) == 0, Executor)
+                self.assertEqual(len(Failures), 1, Executor)
+
+if __name__ == '__main__':
+    unittest.main()
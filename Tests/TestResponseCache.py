@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from time import sleep
+from ListingImplementation.JobListing import JobListing
+from Utility.ResponseCache import ResponseCache
+from Benchmarks.StubServer import StubServer
+
+URL = 'https://www.linkedin.com/jobs/search?keywords=python&start=0'
+BODY = b'<html>' + b'job card ' * 1000 + b'</html>'
+
+class TTLTest(unittest.TestCase):
+    def setUp(self):
+        self.Directory = tempfile.TemporaryDirectory()
+        self.Cache = ResponseCache(self.Directory.name, DefaultTTL=60)
+
+    def tearDown(self):
+        self.Directory.cleanup()
+
+    def test_fresh_within_its_ttl(self):
+        self.assertIsNone(self.Cache.Lookup(URL))
+        self.Cache.Store(URL, BODY, {'ETag': '"1"'})
+        Cached = self.Cache.Lookup(URL)
+        self.assertTrue(Cached.Fresh)
+        self.assertEqual(Cached.Body, BODY)
+        self.assertEqual(self.Cache.Stats()['Hits'], 1)
+        self.assertEqual(self.Cache.Stats()['BytesSaved'], len(BODY))
+
+    def test_stale_entry_is_revalidated(self):
+        self.Cache.Store(URL, BODY, {'ETag': '"1"', 'Last-Modified': 'Mon, 05 Oct 2026 10:00:00 GMT'})
+        Cached = self.Cache.Lookup(URL, TTL=0)
+        self.assertFalse(Cached.Fresh)
+        self.assertEqual(Cached.Validators, {'If-None-Match': '"1"',
+                                             'If-Modified-Since': 'Mon, 05 Oct 2026 10:00:00 GMT'})
+
+    def test_stale_entry_without_validators_is_a_miss(self):
+        self.Cache.Store(URL, BODY, {})
+        self.assertIsNone(self.Cache.Lookup(URL, TTL=0))
+        self.assertEqual(self.Cache.Stats()['Misses'], 1)
+
+    def test_refresh_restarts_the_ttl(self):
+        self.Cache.Store(URL, BODY, {'ETag': '"1"'})
+        sleep(0.1)
+        self.assertFalse(self.Cache.Lookup(URL, TTL=0.1).Fresh)
+        self.Cache.Refresh(URL, len(BODY))
+        self.assertTrue(self.Cache.Lookup(URL, TTL=0.1).Fresh)
+        self.assertEqual(self.Cache.Stats()['Revalidated'], 1)
+
+    def test_least_recently_used_are_evicted(self):
+        Cache = ResponseCache(self.Directory.name + '/small', MaxBytes=1024)
+        # Random bodies do not compress: only two of them fit
+        Pages = [('%s&page=%d' % (URL, Page), os.urandom(400)) for Page in range(3)]
+        for Link, Body in Pages[:2]:
+            Cache.Store(Link, Body, {'ETag': '"1"'})
+        self.assertIsNotNone(Cache.Lookup(Pages[0][0]))
+        Cache.Store(*Pages[2], {'ETag': '"1"'})
+        self.assertIsNone(Cache.Lookup(Pages[1][0]))
+        self.assertIsNotNone(Cache.Lookup(Pages[0][0]))
+        self.assertLessEqual(Cache.Stats()['StoredBytes'], 1024)
+
+class RevalidationTest(unittest.TestCase):
+    """
+    A stale page is fetched with its validators and served from the cache
+    when the website answers 304
+    """
+    def test_not_modified(self):
+        with tempfile.TemporaryDirectory() as Directory, StubServer(NoiseBlocks=10) as Server:
+            Cache = ResponseCache(Directory)
+            Listing = JobListing(['LinkedIn'], ResponseCache=Cache)
+            Reader = Listing.readers['LinkedIn']
+            Server.PointReader(Reader, 'LinkedIn')
+            # Always stale: every page is revalidated
+            Reader.CacheTTL = 0
+            Query = {'LinkedIn': [{'SearchQuery': 'python', 'NumberOfPages': 3}]}
+            with contextlib.redirect_stdout(io.StringIO()):
+                First = Listing.SendRequests(Query)
+                Second = Listing.SendRequests(Query)
+            Listing.Close()
+
+            self.assertEqual(len(First), 3 * Server.CardsPerPage)
+            self.assertTrue(First.equals(Second))
+            Stats = Cache.Stats()
+            self.assertEqual((Stats['Stores'], Stats['Revalidated'], Stats['Hits']), (3, 3, 0))
+            self.assertEqual(Stats['BytesSaved'], sum(len(Server.Page('LinkedIn', Page))
+                                                     for Page in {Key[1] for Key in Server.Pages}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+import unittest
+from ListingImplementation.Scheduler import Scheduler, ScheduledQuery
+from ReaderImplementation.JobReader import JobReader
+
+class StubListing:
+    """
+    Stands for a JobListing with a SeenIndex: every scrape sends the pages
+    asked and finds no new Job post
+    """
+    def __init__(self):
+        self.SeenIndex = True
+        self.readers = {'LinkedIn': JobReader('LinkedIn')}
+        self.LastPages = 0
+
+    def SendRequests(self, KeywordParams, Incremental=False):
+        (Platform, [Query]), = KeywordParams.items()
+        self.LastPages = Query['NumberOfPages']
+        return []
+
+class PickTest(unittest.TestCase):
+    def setUp(self):
+        self.Now = 0.0
+        self.Large = ScheduledQuery('LinkedIn', {'SearchQuery': 'large', 'NumberOfPages': 10}, 3600, Priority=5.0)
+        self.Small = ScheduledQuery('LinkedIn', {'SearchQuery': 'small', 'NumberOfPages': 1}, 3600)
+        self.Schedule = Scheduler(StubListing(), [self.Large, self.Small], RequestsPerHour=36,
+                                  Clock=lambda: self.Now)
+
+    def test_burst_below_the_largest_query(self):
+        with self.assertRaises(ValueError):
+            Scheduler(StubListing(), [self.Large, self.Small], Burst=5)
+
+    def test_unaffordable_query_does_not_block_the_others(self):
+        # Both due, the large one more urgent but the tokens left only pay for the small one
+        self.Large.LastScraped = self.Small.LastScraped = -7200.0
+        self.Schedule.Tokens = 3.0
+        self.assertIs(self.Schedule.Pick(self.Now), self.Small)
+        Query, Rows = self.Schedule.RunOnce()
+        self.assertIs(Query, self.Small)
+        self.assertEqual(self.Schedule.Tokens, 2.0)
+        self.assertIsNone(self.Schedule.RunOnce())
+
+        # Refilled (36 pages per hour): the large one is scraped as soon as it is affordable
+        self.Now += 800.0
+        Query, Rows = self.Schedule.RunOnce()
+        self.assertIs(Query, self.Large)
+
+    def test_new_queries_first(self):
+        Query, Rows = self.Schedule.RunOnce()
+        self.assertIs(Query, self.Large)
+        self.assertIsNone(self.Schedule.RunOnce())
+        self.Now += 100.0
+        Query, Rows = self.Schedule.RunOnce()
+        self.assertIs(Query, self.Small)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+import asyncio
+import tracemalloc
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from time import sleep
+from TaskExecutor.TaskExecutor import StreamParallelRequest, StreamPipelinedRequest, StreamAsyncRequest
+
+PAGE_SIZE = 1 << 20
+PAGES = 60
+WORKERS = 4
+
+def Page(Params):
+    return bytes(PAGE_SIZE)
+
+def Parse(Size):
+    return bytes(Size)
+
+class StreamMemoryTest(unittest.TestCase):
+    """
+    The streams keep at most 2 * MaxWorkers pages in flight or waiting for the
+    consumer: with a consumer slower than the fetches, the peak memory stays
+    far below the size of all the pages
+    """
+    # Pages in flight or waiting, the one being consumed, and some slack
+    BOUND = (2 * WORKERS + 4) * PAGE_SIZE
+
+    def setUp(self):
+        tracemalloc.start()
+
+    def tearDown(self):
+        tracemalloc.stop()
+
+    def Consume(self, Stream):
+        Count = 0
+        for Params, Result in Stream:
+            self.assertEqual(len(Result), PAGE_SIZE)
+            Count += 1
+            sleep(0.002)
+        return Count
+
+    def test_parallel_stream(self):
+        self.assertEqual(self.Consume(StreamParallelRequest(Page, range(PAGES), WORKERS)), PAGES)
+        self.assertLess(tracemalloc.get_traced_memory()[1], self.BOUND)
+
+    def test_pipelined_stream(self):
+        with ProcessPoolExecutor(max_workers=2) as Parsers:
+            Stream = StreamPipelinedRequest(lambda Params: (PAGE_SIZE,), Parse, range(PAGES), Parsers, WORKERS)
+            self.assertEqual(self.Consume(Stream), PAGES)
+        self.assertLess(tracemalloc.get_traced_memory()[1], self.BOUND)
+
+    def test_async_stream(self):
+        async def Fetch(Params):
+            return bytes(PAGE_SIZE)
+
+        async def Run():
+            Count = 0
+            async for Params, Result in StreamAsyncRequest(Fetch, range(PAGES), WORKERS, SiteKey=lambda Params: 0):
+                Count += 1
+                await asyncio.sleep(0.002)
+            return Count
+
+        self.assertEqual(asyncio.run(Run()), PAGES)
+        self.assertLess(tracemalloc.get_traced_memory()[1], self.BOUND)
+
+    def test_early_stop_cancels_the_rest(self):
+        Sent = []
+
+        def Record(Params):
+            Sent.append(Params)
+            return Params
+
+        Stream = StreamParallelRequest(Record, range(PAGES), WORKERS)
+        next(Stream)
+        Stream.close()
+        self.assertLessEqual(len(Sent), 2 * WORKERS + 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+import unittest
+from time import sleep
+from ListingImplementation.DistributedListing import QueueWorker
+from ReaderImplementation.JobReader import JobReader
+from TaskExecutor.WorkQueue import SQLiteWorkQueue, PENDING, LEASED, DONE, FAILED
+from Utility.ColumnBatch import ColumnBatch
+
+LEASE_SECONDS = 0.05
+
+def Rows(*Links):
+    Batch = ColumnBatch(['JobLink'])
+    for Link in Links:
+        Batch.AppendRow({'JobLink': Link})
+    return Batch
+
+class LeaseTest(unittest.TestCase):
+    def setUp(self):
+        self.Queue = SQLiteWorkQueue(':memory:', LeaseSeconds=LEASE_SECONDS, MaxAttempts=2)
+        self.Batch = self.Queue.Publish([{'URL': 'page1'}, {'URL': 'page2'}])
+
+    def tearDown(self):
+        self.Queue.Close()
+
+    def Expire(self):
+        sleep(LEASE_SECONDS * 2)
+
+    def test_lease_is_exclusive(self):
+        First = self.Queue.Lease('first', 1)
+        Second = self.Queue.Lease('second', 2)
+        self.assertEqual([Task['URL'] for TaskId, Task in First], ['page1'])
+        self.assertEqual([Task['URL'] for TaskId, Task in Second], ['page2'])
+        self.assertEqual(self.Queue.Lease('third', 2), [])
+        self.assertEqual(self.Queue.Progress(self.Batch)[LEASED], 2)
+
+    def test_complete(self):
+        (TaskId, Task), = self.Queue.Lease('first', 1)
+        self.assertTrue(self.Queue.Complete(TaskId, Rows('a', 'b'), 'first'))
+        self.assertEqual(self.Queue.Progress(self.Batch), {PENDING: 1, LEASED: 0, DONE: 1, FAILED: 0})
+        Results = self.Queue.Results(self.Batch)
+        self.assertEqual(len(Results), 1)
+        self.assertEqual(Results[0].Data['JobLink'], ['a', 'b'])
+
+    def test_expired_lease_is_taken_over(self):
+        (TaskId, Task), = self.Queue.Lease('first', 1)
+        self.Expire()
+        self.assertEqual(self.Queue.Progress(self.Batch)[PENDING], 2)
+        Leased = self.Queue.Lease('second', 2)
+        self.assertIn(TaskId, [Other for Other, Task in Leased])
+
+        # The first worker lost the lease: its rows and its failure are dropped
+        self.assertFalse(self.Queue.Complete(TaskId, Rows('stale'), 'first'))
+        self.assertFalse(self.Queue.Fail(TaskId, 'timeout', 'first'))
+        self.assertTrue(self.Queue.Complete(TaskId, Rows('fresh'), 'second'))
+        self.assertEqual(self.Queue.Results(self.Batch)[0].Data['JobLink'], ['fresh'])
+        # Done: not even the holder of the last lease can complete it again
+        self.assertFalse(self.Queue.Complete(TaskId, Rows('again'), 'second'))
+
+    def test_fail_gives_the_task_back_until_max_attempts(self):
+        (TaskId, Task), = self.Queue.Lease('first', 1)
+        self.assertTrue(self.Queue.Fail(TaskId, 'error 1', 'first'))
+        self.assertEqual(self.Queue.Progress(self.Batch)[PENDING], 2)
+        (Again, Task), = self.Queue.Lease('second', 1)
+        self.assertEqual(Again, TaskId)
+        self.assertTrue(self.Queue.Fail(TaskId, 'error 2', 'second'))
+        self.assertEqual(self.Queue.Failures(self.Batch), [({'URL': 'page1'}, 'error 2')])
+
+    def test_expired_lease_fails_after_max_attempts(self):
+        for Worker in ('first', 'second'):
+            self.assertEqual(len(self.Queue.Lease(Worker, 1)), 1)
+            self.Expire()
+        self.assertEqual(self.Queue.Lease('third', 2)[0][1], {'URL': 'page2'})
+        self.assertEqual(self.Queue.Failures(self.Batch), [({'URL': 'page1'}, 'lease expired')])
+
+class StubListing:
+    """
+    Listing answering every page with one row, the URL, after calling Scrape
+    (e.g. to wait or to let another worker run)
+    """
+    def __init__(self, Scrape=None):
+        self.Scrape = Scrape
+        self.readers = {}
+        self.Failures = []
+        self.MaxConcurrency = 2
+
+    def MapPages(self, URLParamList):
+        if self.Scrape is not None:
+            self.Scrape()
+        return [Rows(URL) for Reader, URL in URLParamList]
+
+class ListSink:
+    def __init__(self):
+        self.Links = []
+
+    def Write(self, Rows):
+        self.Links.extend(Rows.Data['JobLink'])
+
+class QueueWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.Queue = SQLiteWorkQueue(':memory:', LeaseSeconds=LEASE_SECONDS, MaxAttempts=3)
+        Reader = JobReader('LinkedIn')
+        Reader.SetTagsFromUser('Salary', 'span', 'salary', None)
+        self.Config = Reader.Config()
+
+    def tearDown(self):
+        self.Queue.Close()
+
+    def test_reader_is_reused(self):
+        self.Queue.Publish([{'Platform': 'LinkedIn', 'URL': 'page%d' % Page, 'Config': self.Config}
+                            for Page in range(4)])
+        Worker = QueueWorker(self.Queue, StubListing(), Name='worker', BatchSize=2)
+        Worker.RunOnce()
+        Reader = Worker.Listing.readers['LinkedIn']
+        Worker.RunOnce()
+        self.assertIs(Worker.Listing.readers['LinkedIn'], Reader)
+        self.assertEqual(Worker.Counters['Completed'], 4)
+
+    def test_lost_pages_are_not_written(self):
+        Batch = self.Queue.Publish([{'Platform': 'LinkedIn', 'URL': 'page', 'Config': self.Config}])
+        Sink = ListSink()
+        Fast = QueueWorker(self.Queue, StubListing(), Sink=Sink, Name='fast')
+
+        def TakenOver():
+            # The slow worker scrapes past its lease, the fast one takes the page over meanwhile
+            sleep(LEASE_SECONDS * 2)
+            self.assertEqual(Fast.RunOnce(), 1)
+
+        Slow = QueueWorker(self.Queue, StubListing(TakenOver), Sink=Sink, Name='slow')
+        self.assertEqual(Slow.RunOnce(), 1)
+        self.assertEqual(Slow.Counters, {'Completed': 0, 'Failed': 0, 'Lost': 1})
+        self.assertEqual(Fast.Counters['Completed'], 1)
+        self.assertEqual(Sink.Links, ['page'])
+        self.assertEqual(self.Queue.Progress(Batch)[DONE], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+from pandas import DataFrame
+from Utility.CompactFrame import CompactFrame
+
+class ColumnBatch:
+    """
+    Column wise storage of the scraped rows: one list per column, filled while
+    the pages are parsed and converted to a DataFrame only once, at the end of
+    the scrape. Appending a row is O(1) instead of copying the whole frame.
+    :param Columns names of the columns, in display order
+    """
+    def __init__(self, Columns):
+        self.Columns = list(Columns)
+        self.Data = {Column: [] for Column in self.Columns}
+        self.Size = 0
+
+    def AppendRow(self, Row):
+        """
+        Append a row given as a dictionary of column to value, missing columns
+        are filled with None
+        """
+        for Column in self.Columns:
+            self.Data[Column].append(Row.get(Column))
+        self.Size += 1
+
+    def Extend(self, Other):
+        """
+        Append all the rows of another batch, columns present only in one of
+        the batches are filled with None for the rows of the other.
+        """
+        for Column in Other.Columns:
+            if Column not in self.Data:
+                self.Columns.append(Column)
+                self.Data[Column] = [None] * self.Size
+
+        for Column in self.Columns:
+            if Column in Other.Data:
+                self.Data[Column].extend(Other.Data[Column])
+            else:
+                self.Data[Column].extend([None] * Other.Size)
+        self.Size += Other.Size
+        return self
+
+    def Select(self, Positions):
+        """
+        Returns a new batch with only the rows at the given positions
+        """
+        Result = ColumnBatch(self.Columns)
+        for Column in self.Columns:
+            Values = self.Data[Column]
+            Result.Data[Column] = [Values[Position] for Position in Positions]
+        Result.Size = len(Positions)
+        return Result
+
+    @staticmethod
+    def Concat(Batches):
+        """
+        Merge batches (from multiple pages) into a single new batch
+        """
+        Columns = []
+        for Batch in Batches:
+            Columns += [Column for Column in Batch.Columns if Column not in Columns]
+
+        Result = ColumnBatch(Columns)
+        for Batch in Batches:
+            Result.Extend(Batch)
+        return Result
+
+    def ToDataFrame(self, Compact=False):
+        """
+        Build the DataFrame from the columns
+        :param Compact build the compact DataFrame (see Utility.CompactFrame)
+        """
+        if Compact:
+            return CompactFrame(self.Data, self.Columns)
+        return DataFrame(self.Data, columns=self.Columns)
+
+    def __len__(self):
+        return self.Size
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Compact representation of the results: the repetitive columns (company,
+location, time posted, and any column with few distinct values) become
+categorical, and JobLink is split into a categorical LinkDomain (scheme and
+host) and its LinkPath. Converted to Arrow, the categorical columns are
+dictionary encoded.
+"""
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+LINK_DOMAIN, LINK_PATH = 'LinkDomain', 'LinkPath'
+# A column is categorical when it has at most this many distinct values per row
+CATEGORY_RATIO = 0.5
+
+def SplitLinks(Links):
+    """
+    Returns the scheme and host, and the path of each link (the scheme and
+    host are empty when the link is relative)
+    """
+    Domains, Paths = [], []
+    AddDomain, AddPath = Domains.append, Paths.append
+    for Link in Links:
+        if not isinstance(Link, str):
+            AddDomain(None)
+            AddPath(None)
+            continue
+        Start = Link.find('//')
+        End = Link.find('/', Start + 2) if Start >= 0 else 0
+        End = End if End >= 0 else len(Link)
+        AddDomain(Link[:End])
+        AddPath(Link[End:])
+    return Domains, Paths
+
+def CompactFrame(Data, Columns=None, Ratio=CATEGORY_RATIO):
+    """
+    Build the compact DataFrame of columns of values
+    :param Data dictionary of column to list of values (ColumnBatch.Data)
+    :param Columns columns in display order, defaults to the order of Data
+    :param Ratio distinct values per row under which a column is categorical
+    """
+    Frame = {}
+    for Column in Columns if Columns is not None else list(Data):
+        Values = Data[Column]
+        if Column == 'JobLink':
+            Domains, Paths = SplitLinks(Values)
+            Frame[LINK_DOMAIN] = pd.Categorical(Domains)
+            Frame[LINK_PATH] = pd.array(Paths, dtype='str')
+        else:
+            Categories = pd.Categorical(Values)
+            Repetitive = len(Values) > 0 and len(Categories.categories) <= Ratio * len(Values)
+            Frame[Column] = Categories if Repetitive else Values
+    return pd.DataFrame(Frame)
+
+def CompactDataFrame(Frame, Ratio=CATEGORY_RATIO):
+    """
+    Returns the compact form of a result DataFrame (unchanged if it is
+    already compact)
+    """
+    if LINK_DOMAIN in Frame.columns:
+        return Frame
+    return CompactFrame({Column: Frame[Column].tolist() for Column in Frame.columns}, list(Frame.columns), Ratio)
+
+def ExpandLinks(Frame):
+    """
+    Returns the result DataFrame with JobLink rebuilt from LinkDomain and
+    LinkPath, in its place (unchanged if the links are not split)
+    """
+    if LINK_DOMAIN not in Frame.columns:
+        return Frame
+    Links = (Frame[LINK_DOMAIN].astype(object) + Frame[LINK_PATH].astype(object)).astype('str')
+    Columns = list(Frame.columns)
+    Position = Columns.index(LINK_DOMAIN)
+    Frame = Frame.drop(columns=[LINK_DOMAIN, LINK_PATH])
+    Frame.insert(Position, 'JobLink', Links)
+    return Frame
+
+def ToArrow(Frame):
+    """
+    Returns the Arrow table of a result DataFrame, categorical columns are
+    dictionary encoded
+    """
+    if pyarrow is None:
+        raise ImportError('pyarrow is required for the Arrow and Parquet conversions')
+    return pyarrow.Table.from_pandas(Frame, preserve_index=False)
+
+def FromArrow(Table):
+    """
+    Returns the DataFrame of an Arrow table, dictionary encoded columns become
+    categorical
+    """
+    return Table.to_pandas()
+
+def WriteParquet(Frame, Path, Compression='zstd'):
+    """
+    Write a result DataFrame (compact or not) to a Parquet file
+    """
+    if pyarrow is None:
+        raise ImportError('pyarrow is required for the Arrow and Parquet conversions')
+    pyarrow.parquet.write_table(ToArrow(Frame), Path, compression=Compression)
+
+def ReadParquet(Path, Columns=None):
+    """
+    Read a result DataFrame from a Parquet file
+    :param Columns columns to read, defaults to all of them
+    """
+    if pyarrow is None:
+        raise ImportError('pyarrow is required for the Arrow and Parquet conversions')
+    return FromArrow(pyarrow.parquet.read_table(Path, columns=Columns))
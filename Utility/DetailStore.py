@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+import json
+import sqlite3
+from threading import Lock
+from time import time
+from Utility.JobStore import NormalizeLink
+
+class DetailStore:
+    """
+    Persistent store of the details of the Job posts (extracted from their
+    detail page), by normalized Job link (see NormalizeLink), so that the
+    detail page of a Job post is fetched once whatever the queries and pages
+    it shows up on.
+    :param Path SQLite file of the store, defaults to ':memory:' (not persisted)
+    """
+    def __init__(self, Path=':memory:'):
+        self.StoreLock = Lock()
+        self.Connection = sqlite3.connect(Path, check_same_thread=False)
+        self.Connection.execute('CREATE TABLE IF NOT EXISTS Details ('
+                                'LinkKey TEXT PRIMARY KEY, JobLink TEXT, Platform TEXT, Details TEXT, '
+                                'FetchedAt REAL)')
+        self.Connection.commit()
+
+    def Missing(self, Links):
+        """
+        Returns the Job links whose details are not stored, in their order
+        """
+        Keys = [NormalizeLink(Link) for Link in Links]
+        Stored = self.__Stored__(Keys)
+        return [Link for Link, Key in zip(Links, Keys) if Key not in Stored]
+
+    def Put(self, Link, Platform, Details):
+        """
+        Store the details of a Job post
+        :param Details dictionary of column to value
+        """
+        with self.StoreLock:
+            with self.Connection:
+                self.Connection.execute('INSERT OR REPLACE INTO Details VALUES (?, ?, ?, ?, ?)',
+                                        (NormalizeLink(Link), Link, Platform, json.dumps(Details), time()))
+
+    def Get(self, Links):
+        """
+        Returns the details stored for the Job links
+        :returns dictionary of Job link (as given) to its details, the links
+        without details are left out
+        """
+        Keys = {NormalizeLink(Link): Link for Link in Links}
+        Stored = self.__Stored__(list(Keys))
+        return {Keys[Key]: json.loads(Details) for Key, Details in Stored.items()}
+
+    def __Stored__(self, Keys):
+        """
+        Internal method returning the details (JSON) of the stored keys
+        """
+        Stored = {}
+        with self.StoreLock:
+            # Bounded by the number of SQLite parameters
+            for First in range(0, len(Keys), 500):
+                Batch = Keys[First:First + 500]
+                Stored.update(self.Connection.execute(
+                    'SELECT LinkKey, Details FROM Details WHERE LinkKey IN (%s)' % ','.join('?' * len(Batch)),
+                    Batch))
+        return Stored
+
+    def __len__(self):
+        with self.StoreLock:
+            return self.Connection.execute('SELECT COUNT(*) FROM Details').fetchone()[0]
+
+    def Close(self):
+        with self.StoreLock:
+            self.Connection.close()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+import re
+import sqlite3
+import unicodedata
+import zlib
+from threading import Lock
+from time import time
+import numpy as np
+from Utility.ColumnBatch import ColumnBatch
+from Utility.CompactFrame import ExpandLinks
+from Utility.JobStore import NormalizeLink
+
+# Abbreviations of the titles, spelled out before comparing them
+TITLE_WORDS = {'sr': 'senior', 'snr': 'senior', 'jr': 'junior', 'jnr': 'junior', 'eng': 'engineer',
+               'engg': 'engineer', 'engr': 'engineer', 'dev': 'developer', 'mgr': 'manager', 'mngr': 'manager',
+               'assoc': 'associate', 'asst': 'assistant', 'ii': '2', 'iii': '3', 'sde': 'software engineer',
+               'swe': 'software engineer', 'qa': 'quality assurance', 'sre': 'site reliability engineer'}
+
+# Words of the normalized titles giving the seniority of the Job post
+SENIORITY_WORDS = {'senior', 'junior', 'lead', 'principal', 'staff', 'associate', 'intern', 'trainee', 'head',
+                   'chief', 'entry', 'fresher'}
+
+# Legal suffixes dropped from the company names
+COMPANY_SUFFIXES = {'inc', 'incorporated', 'llc', 'llp', 'ltd', 'limited', 'pvt', 'private', 'corp',
+                    'corporation', 'co', 'company', 'plc', 'gmbh', 'ag', 'sa', 'the'}
+
+# Former names of the cities, as listed by some platforms
+CITY_NAMES = {'bangalore': 'bengaluru', 'gurgaon': 'gurugram', 'bombay': 'mumbai', 'madras': 'chennai',
+              'calcutta': 'kolkata', 'new delhi': 'delhi', 'poona': 'pune'}
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+def Words(Text):
+    """
+    Returns the lower case words of a text, without accents nor punctuation
+    """
+    if not isinstance(Text, str):
+        return []
+    Text = unicodedata.normalize('NFKD', Text).encode('ascii', 'ignore').decode('ascii').lower()
+    return re.findall(r'[a-z0-9]+', Text)
+
+def NormalizeTitle(Title):
+    return ' '.join(TITLE_WORDS.get(Word, Word) for Word in Words(Title))
+
+def NormalizeCompany(Company):
+    return ' '.join(Word for Word in Words(Company) if Word not in COMPANY_SUFFIXES)
+
+def NormalizeLocation(Location):
+    """
+    Returns the city of a location ('Bengaluru, Karnataka, India' -> 'bengaluru')
+    """
+    City = ' '.join(Words(Location.split(',')[0] if isinstance(Location, str) else None))
+    return CITY_NAMES.get(City, City)
+
+class DuplicateIndex:
+    """
+    Duplicate detection of the Job posts across platforms, queries and pages.
+    A Job post whose normalized link (NormalizeLink) is already indexed is a
+    duplicate. Otherwise, a Job post is reduced to its scope, its company
+    (without legal suffix), its city and the seniority words of its title
+    (SENIORITY_WORDS), and to the other words of its normalized title (see
+    TITLE_WORDS); two Job posts of another link and another platform, of the
+    same scope and whose title words have a Jaccard similarity of at least
+    Threshold are near duplicates, the same post listed by both platforms
+    ('Senior Software Engineer' and 'Software Engineer' are not). Two links of
+    the same platform are always distinct Job posts, however similar, and so
+    are the Job posts of an unknown platform.
+    Candidates are found with MinHash and locality sensitive hashing: the
+    MinHash signature of a Job post is cut in Bands, each band (with the
+    scope) is a bucket key, and only the Job posts sharing a bucket are
+    compared. A lookup costs one indexed read of Bands keys whatever the
+    number of Job posts indexed. The index
+    is kept in SQLite, so that it can be persisted and new scrapes checked
+    against the previous ones.
+    :param Path SQLite file of the index, defaults to ':memory:' (not persisted)
+    :param Threshold Jaccard similarity from which two Job posts are duplicates
+    :param Permutations number of hash functions of the signatures
+    :param Bands number of bands of the signatures (Permutations must be a
+    multiple of it): more bands find less similar candidates
+    :param Seed seed of the hash functions, must stay the same for a
+    persisted index
+    """
+    def __init__(self, Path=':memory:', Threshold=0.8, Permutations=64, Bands=16, Seed=1):
+        if Permutations % Bands != 0:
+            raise ValueError('Permutations must be a multiple of Bands: found {} and {}'.format(Permutations, Bands))
+        self.Threshold = Threshold
+        self.Bands = Bands
+        self.Rows = Permutations // Bands
+        Random = np.random.RandomState(Seed)
+        # Hash functions (A x + B) mod p of the 32 bit word hashes: A x stays below 2^64
+        self.A = Random.randint(1, 1 << 31, size=(Permutations, 1)).astype(np.uint64)
+        self.B = Random.randint(0, 1 << 31, size=(Permutations, 1)).astype(np.uint64)
+        self.IndexLock = Lock()
+        self.Index = sqlite3.connect(Path, check_same_thread=False)
+        self.Index.execute('CREATE TABLE IF NOT EXISTS Posts ('
+                           'Id INTEGER PRIMARY KEY, JobLink TEXT, Link TEXT, Platform TEXT, Scope TEXT, '
+                           'Words TEXT, FirstSeen REAL)')
+        self.Index.execute('CREATE INDEX IF NOT EXISTS PostsByLink ON Posts (Link)')
+        self.Index.execute('CREATE TABLE IF NOT EXISTS Buckets ('
+                           'Bucket INTEGER, Id INTEGER, PRIMARY KEY (Bucket, Id)) WITHOUT ROWID')
+        self.Index.commit()
+        self.Counters = {'Checked': 0, 'Duplicates': 0, 'Compared': 0}
+
+    @staticmethod
+    def Key(Title, Company, Location):
+        """
+        Returns the scope (normalized company, city and seniority) and the set
+        of the other title words of a Job post
+        """
+        Words = NormalizeTitle(Title).split()
+        Seniority = ' '.join(sorted({Word for Word in Words if Word in SENIORITY_WORDS}))
+        Scope = '\t'.join((NormalizeCompany(Company), NormalizeLocation(Location), Seniority))
+        # An empty title is a word of its own, so that the signature is defined
+        Tokens = {Word for Word in Words if Word not in SENIORITY_WORDS} or {''}
+        return Scope, Tokens
+
+    def Buckets(self, Scope, Tokens):
+        """
+        Returns the LSH buckets of the title words of a Job post, one per band.
+        Buckets are per scope, Job posts of other companies, cities or
+        seniorities are never candidates.
+        """
+        Hashes = np.array([zlib.crc32(Token.encode('UTF-8')) for Token in Tokens], dtype=np.uint64)
+        Signature = ((self.A * Hashes + self.B) % MERSENNE_PRIME).min(axis=1)
+        Seed = zlib.crc32(Scope.encode('UTF-8'))
+        return [(Band << 32) | zlib.crc32(Signature[Band * self.Rows:(Band + 1) * self.Rows].tobytes(), Seed)
+                for Band in range(self.Bands)]
+
+    @staticmethod
+    def Similarity(First, Second):
+        return len(First & Second) / len(First | Second)
+
+    def __Match__(self, Platform, Scope, Tokens, Buckets):
+        """
+        Internal method returning the Id of the most similar near duplicate of
+        a Job post on another platform, None if there is none. The index lock
+        must be held.
+        """
+        if Platform is None:
+            return None
+        Candidates = self.Index.execute(
+            'SELECT Id, Platform, Scope, Words FROM Posts WHERE Id IN '
+            '(SELECT Id FROM Buckets WHERE Bucket IN (%s))' % ','.join('?' * len(Buckets)), Buckets)
+        Best, BestSimilarity = None, self.Threshold
+        for Id, OtherPlatform, Other, Stored in Candidates:
+            self.Counters['Compared'] += 1
+            if Other != Scope or OtherPlatform is None or OtherPlatform == Platform:
+                continue
+            Similarity = self.Similarity(Tokens, set(Stored.split('\t')))
+            if Similarity >= BestSimilarity:
+                Best, BestSimilarity = Id, Similarity
+        return Best
+
+    def MarkSeen(self, Rows, Platform=None):
+        """
+        Check the Job posts against the ones already indexed (and the previous
+        ones of the rows), and index the ones that are not duplicates
+        :param Rows ColumnBatch or DataFrame with the JobLink, JobTitle,
+        CompanyName and JobLocation columns
+        :param Platform platform the rows were scraped from, or list of the
+        platform of each row, defaults to None (unknown: only the same links
+        are duplicates)
+        :returns list of the JobLink each row duplicates, None for the new ones
+        """
+        if isinstance(Rows, ColumnBatch):
+            Data = Rows.Data
+        else:
+            Rows = ExpandLinks(Rows)
+            Data = {Column: Rows[Column].tolist() for Column in Rows.columns}
+        Missing = [None] * len(Rows)
+        Platforms = Platform if isinstance(Platform, (list, tuple)) else [Platform] * len(Rows)
+        Posts = zip(Data.get('JobLink', Missing), Platforms, Data.get('JobTitle', Missing),
+                    Data.get('CompanyName', Missing), Data.get('JobLocation', Missing))
+        Duplicates = []
+        Now = time()
+        with self.IndexLock:
+            for Link, Platform, Title, Company, Location in Posts:
+                Normalized = NormalizeLink(Link) if isinstance(Link, str) and Link else None
+                Scope, Tokens = self.Key(Title, Company, Location)
+                Buckets = self.Buckets(Scope, Tokens)
+                Match = None
+                if Normalized is not None:
+                    Match = self.Index.execute('SELECT Id FROM Posts WHERE Link = ? LIMIT 1',
+                                               (Normalized,)).fetchone()
+                Match = Match[0] if Match is not None else self.__Match__(Platform, Scope, Tokens, Buckets)
+                self.Counters['Checked'] += 1
+                if Match is not None:
+                    self.Counters['Duplicates'] += 1
+                    Duplicates.append(self.Index.execute('SELECT JobLink FROM Posts WHERE Id = ?',
+                                                         (Match,)).fetchone()[0])
+                    continue
+                Id = self.Index.execute('INSERT INTO Posts (JobLink, Link, Platform, Scope, Words, FirstSeen) '
+                                        'VALUES (?, ?, ?, ?, ?, ?)',
+                                        (Link, Normalized, Platform, Scope, '\t'.join(sorted(Tokens)),
+                                         Now)).lastrowid
+                self.Index.executemany('INSERT OR IGNORE INTO Buckets VALUES (?, ?)',
+                                       [(Bucket, Id) for Bucket in Buckets])
+                Duplicates.append(None)
+            self.Index.commit()
+        return Duplicates
+
+    def Unique(self, Rows, Platform=None):
+        """
+        Returns the rows that are not duplicates (same type as Rows), and
+        index them
+        """
+        Positions = [Position for Position, Duplicate in enumerate(self.MarkSeen(Rows, Platform))
+                     if Duplicate is None]
+        if isinstance(Rows, ColumnBatch):
+            return Rows.Select(Positions)
+        return Rows.iloc[Positions].reset_index(drop=True)
+
+    def Stats(self):
+        """
+        Returns the number of Job posts checked, the duplicates found, the
+        candidates compared and the Job posts indexed
+        """
+        with self.IndexLock:
+            Stats = dict(self.Counters)
+            Stats['Indexed'] = self.Index.execute('SELECT COUNT(*) FROM Posts').fetchone()[0]
+        return Stats
+
+    def __len__(self):
+        with self.IndexLock:
+            return self.Index.execute('SELECT COUNT(*) FROM Posts').fetchone()[0]
+
+    def Close(self):
+        with self.IndexLock:
+            self.Index.close()
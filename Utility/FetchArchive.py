@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+import json
+import os
+import sqlite3
+import struct
+import zlib
+from threading import Lock
+from time import time
+from requests.structures import CaseInsensitiveDict
+
+MODES = ('record', 'replay')
+# Headers describing the body as it was sent, the archive keeps it decoded
+TRANSFER_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding'}
+RECORD_LENGTH = struct.Struct('<I')
+
+class ArchivedAnswer:
+    """
+    An answer of the archive: the status, headers and body of the page as it
+    was fetched, with its time to first byte, download seconds and bytes
+    received
+    """
+    __slots__ = ('Status', 'Headers', 'Content', 'TTFB', 'Download', 'WireBytes')
+
+    def __init__(self, Status, Headers, Content, TTFB, Download, WireBytes):
+        self.Status = Status
+        self.Headers = Headers
+        self.Content = Content
+        self.TTFB = TTFB
+        self.Download = Download
+        self.WireBytes = WireBytes
+
+class FetchArchive:
+    """
+    Archive of the pages fetched by a JobListing, to replay a scrape offline.
+    In record mode every answer (result and detail pages, retries included)
+    is appended to the segment file at Path as a zlib compressed record: a
+    JSON line (platform, URL, status, headers, timings) and the decoded body.
+    The index (Path + '.index', SQLite) lists the records by URL. In replay
+    mode, the n-th request of a URL is answered with its n-th record (the
+    last one once they are all used), so that retries replay the same way;
+    a URL missing from the archive fails as a page that could not be
+    fetched. Answers are replayed at full speed, or after the time to first
+    byte and download time they were recorded with.
+    :param Path segment file of the archive
+    :param Mode 'record' (appending to an existing archive) or 'replay'
+    :param Latency replay the answers at their recorded latency, defaults to
+    False (full speed)
+    :param Level zlib compression level of the records
+    """
+    def __init__(self, Path, Mode='record', Latency=False, Level=6):
+        if Mode not in MODES:
+            raise ValueError('Mode must be one of {}: found {}'.format(MODES, Mode))
+        if Mode == 'replay' and not os.path.exists(Path):
+            raise FileNotFoundError('No archive to replay at {}'.format(Path))
+        self.Path = Path
+        self.Mode = Mode
+        self.Latency = Latency
+        self.Level = Level
+        self.ArchiveLock = Lock()
+        self.Index = sqlite3.connect(Path + '.index', check_same_thread=False)
+        self.Index.execute('CREATE TABLE IF NOT EXISTS Records ('
+                           'Id INTEGER PRIMARY KEY, Platform TEXT, URL TEXT, Offset INTEGER, Length INTEGER, '
+                           'Status INTEGER, Bytes INTEGER, RecordedAt REAL)')
+        self.Index.execute('CREATE INDEX IF NOT EXISTS RecordsByURL ON Records (URL, Id)')
+        self.Index.commit()
+        self.Segment = open(Path, 'ab' if Mode == 'record' else 'rb')
+        # Replay: records of each URL, and how many of them were served
+        self.Records, self.Served = {}, {}
+        if Mode == 'replay':
+            for URL, Offset, Length in self.Index.execute('SELECT URL, Offset, Length FROM Records ORDER BY Id'):
+                self.Records.setdefault(URL, []).append((Offset, Length))
+
+    @property
+    def Replaying(self):
+        return self.Mode == 'replay'
+
+    def Record(self, Platform, URL, Status, Headers, Content, TTFB, Download, WireBytes):
+        """
+        Append an answer to the archive
+        :param Headers response headers
+        :param Content decoded body
+        """
+        Meta = {'Platform': Platform, 'URL': URL, 'Status': Status, 'TTFB': TTFB, 'Download': Download,
+                'WireBytes': WireBytes, 'Time': time(),
+                'Headers': {Key: Value for Key, Value in Headers.items() if Key.lower() not in TRANSFER_HEADERS}}
+        Record = zlib.compress(json.dumps(Meta).encode('UTF-8') + b'\n' + Content, self.Level)
+        with self.ArchiveLock:
+            Offset = self.Segment.tell()
+            self.Segment.write(RECORD_LENGTH.pack(len(Record)) + Record)
+            self.Segment.flush()
+            self.Index.execute('INSERT INTO Records (Platform, URL, Offset, Length, Status, Bytes, RecordedAt) '
+                               'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                               (Platform, URL, Offset, len(Record), Status, len(Content), Meta['Time']))
+            self.Index.commit()
+
+    def Answer(self, URL):
+        """
+        Returns the next recorded answer of the URL, None if it was never
+        recorded
+        """
+        with self.ArchiveLock:
+            Records = self.Records.get(URL)
+            if Records is None:
+                return None
+            Served = self.Served.get(URL, 0)
+            self.Served[URL] = Served + 1
+            Offset, Length = Records[min(Served, len(Records) - 1)]
+        Record = zlib.decompress(os.pread(self.Segment.fileno(), Length, Offset + RECORD_LENGTH.size))
+        Meta, Content = Record.split(b'\n', 1)
+        Meta = json.loads(Meta)
+        return ArchivedAnswer(Meta['Status'], CaseInsensitiveDict(Meta['Headers']), Content, Meta['TTFB'],
+                              Meta['Download'], Meta['WireBytes'])
+
+    def URLs(self, Platform=None):
+        """
+        Returns the (platform, URL) recorded, in the order of their first
+        record, e.g. to fetch the same pages again (JobListing.MapPages)
+        """
+        SQL = 'SELECT Platform, URL FROM Records'
+        Params = ()
+        if Platform is not None:
+            SQL += ' WHERE Platform = ?'
+            Params = (Platform,)
+        SQL += ' GROUP BY Platform, URL ORDER BY MIN(Id)'
+        with self.ArchiveLock:
+            return [tuple(Row) for Row in self.Index.execute(SQL, Params)]
+
+    def Rewind(self):
+        """
+        Replay the answers of every URL from their first record again
+        """
+        with self.ArchiveLock:
+            self.Served = {}
+
+    def Stats(self):
+        """
+        Returns the number of records, URLs, the bytes of the bodies and the
+        bytes of the archive
+        """
+        with self.ArchiveLock:
+            Records, URLs, Bytes = self.Index.execute('SELECT COUNT(*), COUNT(DISTINCT URL), '
+                                                      'COALESCE(SUM(Bytes), 0) FROM Records').fetchone()
+        return {'Records': Records, 'URLs': URLs, 'Bytes': Bytes, 'ArchiveBytes': os.path.getsize(self.Path)}
+
+    def __len__(self):
+        with self.ArchiveLock:
+            return self.Index.execute('SELECT COUNT(*) FROM Records').fetchone()[0]
+
+    def Close(self):
+        with self.ArchiveLock:
+            self.Segment.close()
+            self.Index.close()
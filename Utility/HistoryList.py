@@ -1,79 +1,176 @@
 #!/usr/bin/env python
-import json
+import os
+import pickle
+import zlib
+from itertools import count
+from time import time
 
-class Node:
+class HistoryEntry:
     """
-    Node to store the history of data search
+    A query of the history: its URLs, and its results kept compressed in
+    memory (Blob), or on disk (Path) once evicted from memory
     """
-    def __init__(self, data):
-        self.data = data
-        self.NextData = None
-        self.PreviousData = None
+    __slots__ = ('URLList', 'Rows', 'Time', 'Blob', 'Path', 'Bytes')
+
+    def __init__(self, URLList, Rows, Blob):
+        self.URLList = URLList
+        self.Rows = Rows
+        self.Time = time()
+        self.Blob = Blob
+        self.Path = None
+        self.Bytes = len(Blob)
 
 class HistoryList:
     """
-    History List stores the history of n previous searches, defaults to 10
-    Maintains in a form of doubly linked list, and deletes nth query from Head
-    (if limit size is n)
+    History List stores the history of n previous searches, defaults to 10.
+    Kept in a ring buffer of MaxSize entries, the oldest query is dropped
+    when a new one is added to a full history. The results are stored
+    compressed, bounded by MaxBytes in memory: the oldest ones are moved to
+    the spill directory (or dropped when there is none) when the bound is
+    exceeded, and are only decompressed (rehydrated) when requested.
+    :param MaxSize maximum number of queries kept
+    :param MaxBytes maximum size of the compressed results kept in memory
+    :param SpillDirectory directory for the results evicted from memory,
+    defaults to None (evicted results are dropped)
+    :param Level zlib compression level of the results
     """
-    def __init__(self, MaxSize=10):
-        self.Head = None
-        self.Tail = None
+    __slots__ = ('MaxSize', 'MaxBytes', 'SpillDirectory', 'Level', 'Entries', 'Start', 'Size', 'TotalBytes',
+                 'Names')
+
+    def __init__(self, MaxSize=10, MaxBytes=32 << 20, SpillDirectory=None, Level=6):
+        if MaxSize < 1:
+            raise ValueError('History size must be at least 1: found {}'.format(MaxSize))
         self.MaxSize = MaxSize
+        self.MaxBytes = MaxBytes
+        self.SpillDirectory = SpillDirectory
+        if SpillDirectory is not None:
+            os.makedirs(SpillDirectory, exist_ok=True)
+        self.Level = Level
+        self.Entries = [None] * MaxSize
+        # Position of the oldest entry, and number of entries
+        self.Start = 0
         self.Size = 0
+        self.TotalBytes = 0
+        self.Names = count()
 
     def __iadd__(self, data):
         """
         :details Add the next data onto the list
         operator is historyList += data
-        :param data: json/dictionary
+        :param data: (URLList, results) of a query
         :returns this
         """
-        # trivial case: if list is empty
-        if self.Head is None and self.Tail is None:
-            self.Head = self.Tail = Node(data)
-        # else add to the Tail of the list
-        else:
-            # if size is at the limit, remove the Head and set the next node as 
-            # new Head
-            if self.Size == 10:
-                TempReference = self.Head
-                self.Head = self.Head.NextData
-                self.Head.PreviousData = None
-                del TempReference
-                self.Size -= 1
-            # add to the list
-            NewData = Node(data)
-            self.Tail.NextData = NewData
-            NewData.PreviousData = self.Tail
-            self.Tail = NewData
-            self.Size += 1
+        URLList, Results = data
+        Blob = zlib.compress(pickle.dumps(Results, pickle.HIGHEST_PROTOCOL), self.Level)
+        Entry = HistoryEntry(tuple(URLList), len(Results) if Results is not None else 0, Blob)
+
+        if self.Size == self.MaxSize:
+            self.__Drop__(self.Entries[self.Start])
+            self.Start = (self.Start + 1) % self.MaxSize
+            self.Size -= 1
+        self.Entries[(self.Start + self.Size) % self.MaxSize] = Entry
+        self.Size += 1
+        self.TotalBytes += Entry.Bytes
 
+        # Evict the oldest results from memory, the last query is always kept
+        Position = 0
+        while self.TotalBytes > self.MaxBytes and Position < self.Size - 1:
+            self.__Evict__(self.Entries[(self.Start + Position) % self.MaxSize])
+            Position += 1
         return self
 
+    def __Evict__(self, Entry):
+        """
+        Internal method moving the results of an entry out of memory
+        """
+        if Entry.Blob is None:
+            return
+        if self.SpillDirectory is not None:
+            Entry.Path = os.path.join(self.SpillDirectory, 'History-%d-%d.pkl.z' % (os.getpid(), next(self.Names)))
+            with open(Entry.Path, 'wb') as File:
+                File.write(Entry.Blob)
+        self.TotalBytes -= Entry.Bytes
+        Entry.Blob = None
+
+    def __Drop__(self, Entry):
+        """
+        Internal method releasing an entry leaving the history
+        """
+        if Entry.Blob is not None:
+            self.TotalBytes -= Entry.Bytes
+        if Entry.Path is not None:
+            try:
+                os.remove(Entry.Path)
+            except OSError:
+                pass
+
+    def __len__(self):
+        return self.Size
+
+    def __Entry__(self, Index):
+        """
+        Internal method returning the entry at the index, 0 being the most
+        recent query
+        """
+        if Index < 0 or Index >= self.Size:
+            raise IndexError('History index out of range: {} (size {})'.format(Index, self.Size))
+        return self.Entries[(self.Start + self.Size - 1 - Index) % self.MaxSize]
+
+    def __Rehydrate__(self, Entry):
+        """
+        Internal method returning the results of an entry, None if they were
+        dropped
+        """
+        Blob = Entry.Blob
+        if Blob is None and Entry.Path is not None:
+            with open(Entry.Path, 'rb') as File:
+                Blob = File.read()
+        return pickle.loads(zlib.decompress(Blob)) if Blob is not None else None
+
+    def __getitem__(self, Index):
+        """
+        Returns (URLList, results) of a query, 0 being the most recent one.
+        The results are None when they were evicted without a spill directory.
+        """
+        Entry = self.__Entry__(Index)
+        return list(Entry.URLList), self.__Rehydrate__(Entry)
+
     def __str__(self):
         """
         String representation of the HistoryList
         """
-        Traverse = self.Tail
-        index = 0
-        display = "Recent History Size: %d\n" % self.Size
-        while Traverse is not None:
-            display += '%d:\n:::\n[\n%s\n]\n:::\n' % (index, Traverse.data.__str__())
-            Traverse, index = Traverse.PreviousData, index + 1
-        return display
+        Parts = ["Recent History Size: %d\n" % self.Size]
+        for index in range(self.Size):
+            Parts.append('%d:\n:::\n[\n%s\n]\n:::\n' % (index, self[index].__str__()))
+        return ''.join(Parts)
+
+    def Summary(self):
+        """
+        Returns the pages, rows, time and compressed size of each query, most
+        recent first, without decompressing their results
+        """
+        return [{'Pages': len(Entry.URLList), 'Rows': Entry.Rows, 'Time': Entry.Time, 'Bytes': Entry.Bytes,
+                 'InMemory': Entry.Blob is not None, 'OnDisk': Entry.Path is not None}
+                for Entry in map(self.__Entry__, range(self.Size))]
 
     def RetrieveRecentNthQuery(self, n):
         """
-        Return recently nth query, if exists in the list, else returns None
+        Return recently nth query (1 being the most recent one), if exists in
+        the list, else returns None
         """
-        if n < 0:
-            raise TypeError('Invalid nth query, n cannot be negative: found {}'.format(n))
+        if n < 1:
+            raise TypeError('Invalid nth query, n must be at least 1: found {}'.format(n))
         if n > self.Size:
             print('Recent nth query value n: {} exceeds history size: {}'.format(n, self.Size))
             return None
         else:
-            Traverse, n = self.Tail, n - 1
-            while n > 0:
-                Traverse = Traverse.NextData
-            return Traverse.Data
+            return self[n - 1]
+
+    def Clear(self):
+        """
+        Remove all the queries, and their spilled results
+        """
+        for Index in range(self.Size):
+            self.__Drop__(self.__Entry__(Index))
+        self.Entries = [None] * self.MaxSize
+        self.Start = self.Size = self.TotalBytes = 0
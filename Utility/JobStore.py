@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+import json
+import sqlite3
+from threading import Lock
+from time import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from pandas import DataFrame
+from Utility.ColumnBatch import ColumnBatch
+from Utility.CompactFrame import ExpandLinks
+
+STANDARD_COLUMNS = ['JobLink', 'CompanyName', 'JobTitle', 'JobLocation', 'TimePosted']
+
+# Query parameters that only track the click, the same Job post is linked
+# with different values on every page
+TRACKING_PARAMS = {'refid', 'trackingid', 'position', 'pagenum', 'from', 'tk', 'vjs', 'advn', 'xkcb',
+                   'fromage', 'sjdu', 'acatk'}
+
+def NormalizeLink(Link):
+    """
+    Normalize a Job link for deduplication: https, lower case host without
+    www, no fragment, no trailing slash, no tracking parameters and the other
+    parameters sorted.
+    """
+    Parts = urlsplit(Link.strip())
+    Host = Parts.netloc.lower()
+    if Host.startswith('www.'):
+        Host = Host[4:]
+    Params = sorted((Key, Value) for Key, Value in parse_qsl(Parts.query, keep_blank_values=True)
+                    if Key.lower() not in TRACKING_PARAMS and not Key.lower().startswith('utm_'))
+    Path = Parts.path.rstrip('/') or '/'
+    return urlunsplit(('https', Host, Path, urlencode(Params), ''))
+
+class JobStore:
+    """
+    Persistent store of the scraped Job posts (SQLite), with a unique index on
+    the normalized Job link. Rows are upserted in batches: a Job post seen
+    again only updates its details, LastSeen and SeenCount, and keeps the
+    FirstSeen of its first scrape. Columns other than the default ones are
+    kept as JSON in Extra.
+    :param Path SQLite file of the store
+    """
+    def __init__(self, Path='Jobs.db'):
+        self.StoreLock = Lock()
+        self.Connection = sqlite3.connect(Path, check_same_thread=False)
+        self.Connection.execute('PRAGMA journal_mode=WAL')
+        self.Connection.execute('PRAGMA synchronous=NORMAL')
+        self.Connection.execute('CREATE TABLE IF NOT EXISTS Jobs ('
+                                'LinkKey TEXT PRIMARY KEY, JobLink TEXT, Platform TEXT, '
+                                'CompanyName TEXT, JobTitle TEXT, JobLocation TEXT, TimePosted TEXT, '
+                                'Extra TEXT, FirstSeen REAL, LastSeen REAL, SeenCount INTEGER)')
+        # Queries return the most recently seen first: the company and location
+        # indexes are ordered by LastSeen as well
+        for Name, Columns in (('Company', 'CompanyName, LastSeen'), ('Location', 'JobLocation, LastSeen'),
+                              ('FirstSeen', 'FirstSeen'), ('LastSeen', 'LastSeen')):
+            self.Connection.execute('CREATE INDEX IF NOT EXISTS JobsBy%s ON Jobs (%s)' % (Name, Columns))
+        self.Connection.commit()
+
+    def Upsert(self, Rows, Platform=None, SeenAt=None):
+        """
+        Insert the new Job posts and update the ones already stored
+        :param Rows DataFrame or ColumnBatch with at least a JobLink column
+        :param Platform platform the rows were scraped from, defaults to None
+        :param SeenAt timestamp of the scrape, defaults to now
+        :returns number of rows upserted
+        """
+        if isinstance(Rows, ColumnBatch):
+            Data, Size = Rows.Data, len(Rows)
+        else:
+            Rows = ExpandLinks(Rows)
+            Data, Size = {Column: Rows[Column].tolist() for Column in Rows.columns}, len(Rows)
+        if Size == 0:
+            return 0
+
+        SeenAt = time() if SeenAt is None else SeenAt
+        Missing = [None] * Size
+        Standard = [Data.get(Column, Missing) for Column in STANDARD_COLUMNS]
+        ExtraColumns = [Column for Column in Data if Column not in STANDARD_COLUMNS]
+        Extras = [json.dumps(dict(zip(ExtraColumns, Values)), default=str) for Values in
+                  zip(*[Data[Column] for Column in ExtraColumns])] if ExtraColumns else Missing
+
+        Records = [(NormalizeLink(Link), Link, Platform, Company, Title, Location, Posted, Extra, SeenAt, SeenAt)
+                   for (Link, Company, Title, Location, Posted), Extra in zip(zip(*Standard), Extras)
+                   if isinstance(Link, str)]
+
+        with self.StoreLock:
+            with self.Connection:
+                self.Connection.executemany(
+                    'INSERT INTO Jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1) '
+                    'ON CONFLICT (LinkKey) DO UPDATE SET '
+                    'JobLink = excluded.JobLink, Platform = COALESCE(excluded.Platform, Platform), '
+                    'CompanyName = excluded.CompanyName, JobTitle = excluded.JobTitle, '
+                    'JobLocation = excluded.JobLocation, TimePosted = excluded.TimePosted, '
+                    'Extra = COALESCE(excluded.Extra, Extra), '
+                    'FirstSeen = MIN(FirstSeen, excluded.FirstSeen), '
+                    'LastSeen = MAX(LastSeen, excluded.LastSeen), SeenCount = SeenCount + 1',
+                    Records)
+        return len(Records)
+
+    def Query(self, Company=None, Location=None, Since=None, Until=None, Platform=None, Limit=None):
+        """
+        Indexed query of the stored Job posts
+        :param Company exact company name
+        :param Location location prefix ('Pune' matches 'Pune, Maharashtra, India')
+        :param Since only the Job posts last seen at or after this timestamp
+        :param Until only the Job posts first seen before this timestamp
+        :param Platform platform the Job posts were scraped from
+        :param Limit maximum number of rows, most recently seen first
+        :returns DataFrame of the Job posts
+        """
+        Conditions, Params = [], []
+        if Company is not None:
+            Conditions.append('CompanyName = ?')
+            Params.append(Company)
+        if Location is not None:
+            # Range instead of LIKE, so that the index on JobLocation is used
+            Conditions.append('JobLocation >= ? AND JobLocation < ?')
+            Params += [Location, Location + '\uffff']
+        if Since is not None:
+            Conditions.append('LastSeen >= ?')
+            Params.append(Since)
+        if Until is not None:
+            Conditions.append('FirstSeen < ?')
+            Params.append(Until)
+        if Platform is not None:
+            Conditions.append('Platform = ?')
+            Params.append(Platform)
+
+        SQL = 'SELECT JobLink, CompanyName, JobTitle, JobLocation, TimePosted, Platform, Extra, ' \
+              'FirstSeen, LastSeen, SeenCount FROM Jobs'
+        if Conditions:
+            SQL += ' WHERE ' + ' AND '.join(Conditions)
+        SQL += ' ORDER BY LastSeen DESC'
+        if Limit is not None:
+            SQL += ' LIMIT %d' % Limit
+
+        with self.StoreLock:
+            Cursor = self.Connection.execute(SQL, Params)
+            Columns = [Description[0] for Description in Cursor.description]
+            return DataFrame(Cursor.fetchall(), columns=Columns)
+
+    def Contains(self, Link):
+        """
+        Returns whether the Job link (normalized) is already stored
+        """
+        with self.StoreLock:
+            return self.Connection.execute('SELECT 1 FROM Jobs WHERE LinkKey = ?',
+                                           (NormalizeLink(Link),)).fetchone() is not None
+
+    def __len__(self):
+        with self.StoreLock:
+            return self.Connection.execute('SELECT COUNT(*) FROM Jobs').fetchone()[0]
+
+    def Close(self):
+        with self.StoreLock:
+            self.Connection.close()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+import os
+import pickle
+from collections import OrderedDict
+from threading import Lock
+
+class ParseCache:
+    """
+    Cache of the rows extracted from a page, keyed on the digest of the page
+    content and of the reader extraction configuration, so that an unchanged
+    page is not parsed again. Entries are kept pickled in memory, in LRU order,
+    bounded by count and bytes; evicted entries go to the spill directory when
+    there is one, and are read back from it on the next lookup.
+    :param MaxEntries maximum number of pages kept in memory
+    :param MaxBytes maximum size of the pickled rows kept in memory
+    :param SpillDirectory directory for the entries evicted from memory,
+    defaults to None (evicted entries are dropped)
+    """
+    def __init__(self, MaxEntries=1024, MaxBytes=64 << 20, SpillDirectory=None):
+        self.MaxEntries = MaxEntries
+        self.MaxBytes = MaxBytes
+        self.SpillDirectory = SpillDirectory
+        if SpillDirectory is not None:
+            os.makedirs(SpillDirectory, exist_ok=True)
+        self.Entries = OrderedDict()
+        self.TotalBytes = 0
+        self.CacheLock = Lock()
+        self.Counters = {'Hits': 0, 'SpillHits': 0, 'Misses': 0, 'Evictions': 0, 'Spills': 0}
+
+    def __SpillPath__(self, Key):
+        return os.path.join(self.SpillDirectory, '%s.pkl' % Key)
+
+    def Get(self, Key):
+        """
+        Returns the rows (ColumnBatch) cached for the key, else None
+        """
+        with self.CacheLock:
+            Pickled = self.Entries.get(Key)
+            if Pickled is not None:
+                self.Entries.move_to_end(Key)
+                self.Counters['Hits'] += 1
+                return pickle.loads(Pickled)
+
+        if self.SpillDirectory is not None:
+            try:
+                with open(self.__SpillPath__(Key), 'rb') as File:
+                    Pickled = File.read()
+            except OSError:
+                Pickled = None
+            if Pickled is not None:
+                with self.CacheLock:
+                    self.Counters['SpillHits'] += 1
+                    self.__Insert__(Key, Pickled)
+                return pickle.loads(Pickled)
+
+        with self.CacheLock:
+            self.Counters['Misses'] += 1
+        return None
+
+    def Put(self, Key, Rows):
+        """
+        Cache the rows (ColumnBatch) extracted for the key
+        """
+        Pickled = pickle.dumps(Rows, pickle.HIGHEST_PROTOCOL)
+        if len(Pickled) > self.MaxBytes:
+            return
+        with self.CacheLock:
+            self.__Insert__(Key, Pickled)
+
+    def __Insert__(self, Key, Pickled):
+        """
+        Insert in memory and evict the least recently used entries, the cache
+        lock must be held
+        """
+        Previous = self.Entries.pop(Key, None)
+        if Previous is not None:
+            self.TotalBytes -= len(Previous)
+        self.Entries[Key] = Pickled
+        self.TotalBytes += len(Pickled)
+
+        while len(self.Entries) > self.MaxEntries or self.TotalBytes > self.MaxBytes:
+            EvictedKey, Evicted = self.Entries.popitem(last=False)
+            self.TotalBytes -= len(Evicted)
+            self.Counters['Evictions'] += 1
+            if self.SpillDirectory is not None:
+                with open(self.__SpillPath__(EvictedKey), 'wb') as File:
+                    File.write(Evicted)
+                self.Counters['Spills'] += 1
+
+    def Clear(self):
+        """
+        Remove all the entries, in memory and spilled
+        """
+        with self.CacheLock:
+            self.Entries.clear()
+            self.TotalBytes = 0
+            if self.SpillDirectory is not None:
+                for Name in os.listdir(self.SpillDirectory):
+                    if Name.endswith('.pkl'):
+                        os.remove(os.path.join(self.SpillDirectory, Name))
+
+    def Stats(self):
+        """
+        Returns the cache counters, with the number of Entries and Bytes in memory
+        """
+        with self.CacheLock:
+            Stats = dict(self.Counters)
+            Stats['Entries'] = len(self.Entries)
+            Stats['Bytes'] = self.TotalBytes
+        return Stats
@@ -0,0 +1,287 @@
+#!/usr/bin/env python
+import asyncio
+from collections import deque
+from threading import Lock, Condition
+from time import monotonic, sleep
+
+class TokenBucket:
+    """
+    Token bucket pacing the requests sent to a website: tokens are added at
+    Rate per second up to Burst, and each request takes one. Requests are
+    given their slot in arrival order, a request arriving on an empty bucket
+    waits for its token.
+    :param Rate tokens per second
+    :param Burst maximum number of tokens, i.e. requests sent back to back
+    """
+    def __init__(self, Rate, Burst=1):
+        self.Rate = float(Rate)
+        self.Burst = max(1, Burst)
+        self.Tokens = float(self.Burst)
+        self.Updated = monotonic()
+        self.PausedUntil = 0.0
+        self.BucketLock = Lock()
+
+    def Reserve(self):
+        """
+        Take a token, possibly in advance
+        :returns seconds to wait before sending the request
+        """
+        with self.BucketLock:
+            Now = monotonic()
+            self.Tokens = min(self.Burst, self.Tokens + (Now - self.Updated) * self.Rate)
+            self.Updated = Now
+            self.Tokens -= 1
+            Wait = -self.Tokens / self.Rate if self.Tokens < 0 else 0.0
+            return max(Wait, self.PausedUntil - Now)
+
+    def Pause(self, Seconds):
+        """
+        Hold back all the requests for some seconds (e.g. Retry-After of a 429),
+        the tokens are not refilled in the meantime
+        """
+        with self.BucketLock:
+            Until = monotonic() + Seconds
+            if Until > self.PausedUntil:
+                self.PausedUntil = Until
+                self.Tokens = min(self.Tokens, 0.0)
+                self.Updated = Until
+
+    def Acquire(self):
+        Wait = self.Reserve()
+        if Wait > 0:
+            sleep(Wait)
+
+    async def AcquireAsync(self):
+        Wait = self.Reserve()
+        if Wait > 0:
+            await asyncio.sleep(Wait)
+
+class ConcurrencyController:
+    """
+    AIMD controller of the number of requests in flight to a website. The limit
+    grows by one for each window of healthy responses (additive increase), and
+    is cut by Decrease on a 429/5xx, a failed request or a latency above
+    LatencyFactor times the best latency seen (multiplicative decrease), at
+    most once per window so that a burst of errors counts as one signal.
+    :param Initial starting limit
+    :param Minimum lower bound of the limit
+    :param Maximum upper bound of the limit
+    :param Decrease factor applied to the limit on back off
+    :param LatencyFactor latency (relative to the best one) considered unhealthy
+    """
+    def __init__(self, Initial=2, Minimum=1, Maximum=32, Decrease=0.5, LatencyFactor=3.0):
+        self.Minimum = Minimum
+        self.Maximum = Maximum
+        self.Limit = float(min(max(Initial, Minimum), Maximum))
+        self.Decrease = Decrease
+        self.LatencyFactor = LatencyFactor
+        self.InFlight = 0
+        self.BestLatency = None
+        self.Latency = None
+        self.BackedOffAt = 0
+        self.Completed = 0
+        self.Counters = {'Healthy': 0, 'Throttled': 0, 'Failed': 0, 'Slow': 0, 'BackOffs': 0}
+        self.ControllerLock = Condition(Lock())
+        # Coroutines waiting for a slot: (loop, future)
+        self.AsyncWaiters = deque()
+
+    def __TryAcquire__(self):
+        if self.InFlight < int(self.Limit):
+            self.InFlight += 1
+            return True
+        return False
+
+    def Acquire(self):
+        """
+        Wait for a slot below the current limit
+        """
+        with self.ControllerLock:
+            while not self.__TryAcquire__():
+                self.ControllerLock.wait()
+
+    async def AcquireAsync(self):
+        """
+        Same as Acquire, waiting on the running event loop
+        """
+        with self.ControllerLock:
+            if self.__TryAcquire__():
+                return
+            Waiter = asyncio.get_running_loop().create_future()
+            self.AsyncWaiters.append((asyncio.get_running_loop(), Waiter))
+        try:
+            await Waiter
+        except asyncio.CancelledError:
+            with self.ControllerLock:
+                if Waiter.done() and not Waiter.cancelled():
+                    # The slot was handed over to us, give it back
+                    self.InFlight -= 1
+                    self.__Wake__()
+            raise
+
+    def __Wake__(self):
+        """
+        Hand the free slots over to the waiting coroutines and threads, with
+        the lock held
+        """
+        while self.AsyncWaiters and self.InFlight < int(self.Limit):
+            Loop, Waiter = self.AsyncWaiters.popleft()
+            if Waiter.done():
+                continue
+            self.InFlight += 1
+            Loop.call_soon_threadsafe(self.__Grant__, Waiter)
+        self.ControllerLock.notify_all()
+
+    def __Grant__(self, Waiter):
+        if not Waiter.done():
+            Waiter.set_result(None)
+            return
+        # Cancelled after the slot was handed over
+        with self.ControllerLock:
+            self.InFlight -= 1
+            self.__Wake__()
+
+    def Free(self):
+        """
+        Give back a slot without an outcome, e.g. when the request is cancelled
+        before it is sent
+        """
+        with self.ControllerLock:
+            self.InFlight -= 1
+            self.__Wake__()
+
+    def Release(self, Status, Latency):
+        """
+        Give back a slot and adjust the limit from the outcome of the request
+        :param Status HTTP status of the response, None if the request failed
+        :param Latency seconds taken by the request
+        """
+        with self.ControllerLock:
+            self.InFlight -= 1
+            self.Completed += 1
+            if Status is not None and Status < 500 and Status != 429:
+                self.BestLatency = Latency if self.BestLatency is None else min(self.BestLatency, Latency)
+                self.Latency = Latency if self.Latency is None else 0.8 * self.Latency + 0.2 * Latency
+
+            if Status is None:
+                Outcome = 'Failed'
+            elif Status == 429 or Status >= 500:
+                Outcome = 'Throttled'
+            elif self.Latency > self.LatencyFactor * self.BestLatency:
+                Outcome = 'Slow'
+            else:
+                Outcome = 'Healthy'
+            self.Counters[Outcome] += 1
+
+            if Outcome == 'Healthy':
+                self.Limit = min(self.Maximum, self.Limit + 1.0 / self.Limit)
+            elif self.Completed - self.BackedOffAt >= self.Limit:
+                # The requests already in flight were sent before the back off,
+                # wait for them before cutting again
+                self.Limit = max(self.Minimum, self.Limit * self.Decrease)
+                self.BackedOffAt = self.Completed
+                self.Counters['BackOffs'] += 1
+            self.__Wake__()
+
+    def Stats(self):
+        with self.ControllerLock:
+            return dict(self.Counters, Limit=round(self.Limit, 2), InFlight=self.InFlight,
+                        Latency=self.Latency, BestLatency=self.BestLatency)
+
+class DomainLimiter:
+    """
+    Rate limit and concurrency control of a single website
+    :param Bucket TokenBucket of the website, None to send without pacing
+    :param Controller ConcurrencyController of the website, None for no control
+    """
+    def __init__(self, Bucket=None, Controller=None):
+        self.Bucket = Bucket
+        self.Controller = Controller
+
+    def Acquire(self):
+        """
+        Wait for a slot and a token before sending a request
+        :returns start time of the request, to be passed to Release
+        """
+        if self.Controller is not None:
+            self.Controller.Acquire()
+        if self.Bucket is not None:
+            self.Bucket.Acquire()
+        return monotonic()
+
+    async def AcquireAsync(self):
+        """
+        Same as Acquire on the running event loop. When cancelled while
+        waiting for its token, the slot taken is given back.
+        """
+        if self.Controller is not None:
+            await self.Controller.AcquireAsync()
+        if self.Bucket is not None:
+            try:
+                await self.Bucket.AcquireAsync()
+            except asyncio.CancelledError:
+                if self.Controller is not None:
+                    self.Controller.Free()
+                raise
+        return monotonic()
+
+    def Free(self):
+        """
+        Give back the slot of a request cancelled after Acquire (e.g. the loser
+        of a hedge), without reporting an outcome: it says nothing about the
+        health of the website
+        """
+        if self.Controller is not None:
+            self.Controller.Free()
+
+    def Release(self, Start, Status, RetryAfter=None):
+        """
+        Report the outcome of a request sent after Acquire
+        :param Start value returned by Acquire
+        :param Status HTTP status, None if the request failed
+        :param RetryAfter Retry-After header of a 429/503 response
+        """
+        if self.Bucket is not None and RetryAfter is not None:
+            try:
+                self.Bucket.Pause(float(RetryAfter))
+            except ValueError:
+                # HTTP date instead of seconds
+                pass
+        if self.Controller is not None:
+            self.Controller.Release(Status, monotonic() - Start)
+
+class RateLimiter:
+    """
+    Per website (DOMAIN_NAME) token buckets and AIMD concurrency controllers.
+    The rate of a website is read from the RATE_LIMIT_PER_SECOND and
+    RATE_LIMIT_BURST constants of its reader, websites without them are only
+    controlled by the concurrency controller.
+    :param Adaptive control the concurrency of each website with AIMD
+    :param InitialConcurrency starting concurrency of each website
+    :param MaxConcurrency upper bound of the concurrency of each website
+    """
+    def __init__(self, Adaptive=True, InitialConcurrency=2, MaxConcurrency=32):
+        self.Adaptive = Adaptive
+        self.InitialConcurrency = InitialConcurrency
+        self.MaxConcurrency = MaxConcurrency
+        self.Domains = {}
+        self.LimiterLock = Lock()
+
+    def For(self, Reader):
+        """
+        Returns the DomainLimiter of the website of the reader
+        """
+        with self.LimiterLock:
+            if Reader.DomainName not in self.Domains:
+                Bucket = TokenBucket(Reader.RateLimit, Reader.RateBurst) if Reader.RateLimit else None
+                Controller = ConcurrencyController(self.InitialConcurrency, 1, self.MaxConcurrency) \
+                    if self.Adaptive else None
+                self.Domains[Reader.DomainName] = DomainLimiter(Bucket, Controller)
+            return self.Domains[Reader.DomainName]
+
+    def Stats(self):
+        """
+        Returns the state of the concurrency controller of each website
+        """
+        with self.LimiterLock:
+            return {Domain: Limiter.Controller.Stats() for Domain, Limiter in self.Domains.items()
+                    if Limiter.Controller is not None}
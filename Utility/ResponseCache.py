@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+import os
+import sqlite3
+import zlib
+from collections import namedtuple
+from hashlib import sha1
+from threading import Lock
+from time import time
+
+# Body: cached (decompressed) page, Fresh: still within its TTL, Validators:
+# conditional request headers to revalidate a stale entry
+CachedResponse = namedtuple('CachedResponse', ['Body', 'Fresh', 'Validators'])
+
+class ResponseCache:
+    """
+    On-disk cache of the fetched pages, keyed on the query URL. Bodies are
+    stored zlib compressed, one file per URL, with an SQLite index holding the
+    validators (ETag/Last-Modified) and access times for the LRU eviction.
+    :param Directory directory of the cache, created if it does not exist
+    :param MaxBytes bound on the total size of the compressed bodies
+    :param DefaultTTL seconds a page stays fresh when the platform does not
+    define RESPONSE_CACHE_TTL
+    """
+    def __init__(self, Directory='.cache/responses', MaxBytes=256 << 20, DefaultTTL=300):
+        os.makedirs(Directory, exist_ok=True)
+        self.Directory = Directory
+        self.MaxBytes = MaxBytes
+        self.DefaultTTL = DefaultTTL
+        self.CacheLock = Lock()
+        self.Index = sqlite3.connect(os.path.join(Directory, 'index.db'), check_same_thread=False)
+        self.Index.execute('CREATE TABLE IF NOT EXISTS Entries ('
+                           'Key TEXT PRIMARY KEY, URL TEXT, ETag TEXT, LastModified TEXT, '
+                           'StoredAt REAL, LastAccess REAL, Size INTEGER, StoredSize INTEGER)')
+        self.Index.execute('CREATE INDEX IF NOT EXISTS EntriesByAccess ON Entries (LastAccess)')
+        self.Index.commit()
+        self.TotalBytes = self.Index.execute('SELECT COALESCE(SUM(StoredSize), 0) FROM Entries').fetchone()[0]
+        self.Counters = {'Hits': 0, 'Revalidated': 0, 'Misses': 0, 'Stores': 0, 'Evictions': 0, 'BytesSaved': 0}
+
+    def __Path__(self, Key):
+        return os.path.join(self.Directory, '%s.z' % Key)
+
+    def Lookup(self, URL, TTL=None):
+        """
+        Look for the page of the URL in the cache
+        :param URL query URL
+        :param TTL seconds the page stays fresh, defaults to DefaultTTL
+        :returns CachedResponse, or None if the URL is not cached
+        """
+        TTL = self.DefaultTTL if TTL is None else TTL
+        Key = sha1(URL.encode('UTF-8')).hexdigest()
+        with self.CacheLock:
+            Entry = self.Index.execute('SELECT ETag, LastModified, StoredAt FROM Entries WHERE Key = ?',
+                                       (Key,)).fetchone()
+            if Entry is None:
+                self.Counters['Misses'] += 1
+                return None
+            try:
+                with open(self.__Path__(Key), 'rb') as File:
+                    Body = zlib.decompress(File.read())
+            except (OSError, zlib.error):
+                self.__Remove__(Key)
+                self.Counters['Misses'] += 1
+                return None
+            self.Index.execute('UPDATE Entries SET LastAccess = ? WHERE Key = ?', (time(), Key))
+            self.Index.commit()
+
+        ETag, LastModified, StoredAt = Entry
+        Fresh = time() - StoredAt < TTL
+        Validators = {}
+        if ETag is not None:
+            Validators['If-None-Match'] = ETag
+        if LastModified is not None:
+            Validators['If-Modified-Since'] = LastModified
+        if Fresh:
+            self.Hit(len(Body))
+        elif len(Validators) == 0:
+            # Stale and nothing to revalidate with: fetch it again
+            self.Counters['Misses'] += 1
+            return None
+        return CachedResponse(Body, Fresh, Validators)
+
+    def Hit(self, Size, Revalidated=False):
+        """
+        Count a page served from the cache instead of being downloaded
+        """
+        with self.CacheLock:
+            self.Counters['Revalidated' if Revalidated else 'Hits'] += 1
+            self.Counters['BytesSaved'] += Size
+
+    def Refresh(self, URL, Size):
+        """
+        The server confirmed (304) the cached page is still valid: restart its TTL
+        """
+        Key = sha1(URL.encode('UTF-8')).hexdigest()
+        with self.CacheLock:
+            self.Index.execute('UPDATE Entries SET StoredAt = ?, LastAccess = ? WHERE Key = ?',
+                               (time(), time(), Key))
+            self.Index.commit()
+        self.Hit(Size, Revalidated=True)
+
+    def Store(self, URL, Body, Headers):
+        """
+        Store the page of the URL with its validators, evicting the least
+        recently used pages if the cache is over MaxBytes
+        :param Headers response headers
+        """
+        Key = sha1(URL.encode('UTF-8')).hexdigest()
+        Compressed = zlib.compress(Body, 6)
+        if len(Compressed) > self.MaxBytes:
+            return
+
+        with self.CacheLock:
+            with open(self.__Path__(Key), 'wb') as File:
+                File.write(Compressed)
+            Previous = self.Index.execute('SELECT StoredSize FROM Entries WHERE Key = ?', (Key,)).fetchone()
+            self.TotalBytes += len(Compressed) - (Previous[0] if Previous is not None else 0)
+            self.Index.execute('INSERT OR REPLACE INTO Entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                               (Key, URL, Headers.get('ETag'), Headers.get('Last-Modified'),
+                                time(), time(), len(Body), len(Compressed)))
+            self.Counters['Stores'] += 1
+
+            while self.TotalBytes > self.MaxBytes:
+                Oldest = self.Index.execute('SELECT Key FROM Entries ORDER BY LastAccess LIMIT 1').fetchone()
+                if Oldest is None:
+                    break
+                self.__Remove__(Oldest[0])
+                self.Counters['Evictions'] += 1
+            self.Index.commit()
+
+    def __Remove__(self, Key):
+        """
+        Remove an entry, the cache lock must be held
+        """
+        Entry = self.Index.execute('SELECT StoredSize FROM Entries WHERE Key = ?', (Key,)).fetchone()
+        if Entry is not None:
+            self.TotalBytes -= Entry[0]
+        self.Index.execute('DELETE FROM Entries WHERE Key = ?', (Key,))
+        try:
+            os.remove(self.__Path__(Key))
+        except OSError:
+            pass
+
+    def Clear(self):
+        """
+        Remove all the cached pages
+        """
+        with self.CacheLock:
+            for (Key,) in self.Index.execute('SELECT Key FROM Entries').fetchall():
+                self.__Remove__(Key)
+            self.Index.commit()
+
+    def Stats(self):
+        """
+        Returns the cache counters: Hits (fresh), Revalidated (304), Misses,
+        Stores, Evictions, BytesSaved (bodies not downloaded), and the number
+        of Entries and StoredBytes on disk
+        """
+        with self.CacheLock:
+            Stats = dict(self.Counters)
+            Stats['Entries'] = self.Index.execute('SELECT COUNT(*) FROM Entries').fetchone()[0]
+            Stats['StoredBytes'] = self.TotalBytes
+        return Stats
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+import os
+from Utility.ColumnBatch import ColumnBatch
+from Utility.CompactFrame import ExpandLinks
+
+class ResultSink:
+    """
+    Base of the sinks consuming the pages streamed by JobListing.StreamRequests:
+    each page is written as soon as it arrives, nothing is kept in memory.
+    """
+    def Write(self, Rows):
+        """
+        Write the rows of a page (DataFrame or ColumnBatch)
+        """
+        raise NotImplementedError
+
+    def Close(self):
+        pass
+
+    def Consume(self, Stream):
+        """
+        Write all the pages of a stream of (QueryURL, rows)
+        :returns number of rows written
+        """
+        Total = 0
+        for QueryURL, Rows in Stream:
+            self.Write(Rows)
+            Total += len(Rows)
+        return Total
+
+    async def ConsumeAsync(self, Stream):
+        """
+        Write all the pages of an async stream of (QueryURL, rows)
+        :returns number of rows written
+        """
+        Total = 0
+        async for QueryURL, Rows in Stream:
+            self.Write(Rows)
+            Total += len(Rows)
+        return Total
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+
+class CSVSink(ResultSink):
+    """
+    Appends the pages to a CSV file, the header is written once
+    :param Path CSV file
+    :param mode 'w' to start a new file, 'a' to append to an existing one
+    """
+    def __init__(self, Path, mode='w'):
+        self.Path = Path
+        self.Header = mode == 'w' or not os.path.exists(Path) or os.path.getsize(Path) == 0
+        self.File = open(Path, mode, newline='', encoding='UTF-8')
+
+    def Write(self, Rows):
+        Rows = Rows.ToDataFrame() if isinstance(Rows, ColumnBatch) else ExpandLinks(Rows)
+        if len(Rows) == 0:
+            return
+        Rows.to_csv(self.File, index=False, header=self.Header)
+        self.Header = False
+        self.File.flush()
+
+    def Close(self):
+        self.File.close()
+
+class JSONLinesSink(ResultSink):
+    """
+    Appends the pages to a JSON lines file, one Job post per line
+    :param Path JSON lines file
+    :param mode 'w' to start a new file, 'a' to append to an existing one
+    """
+    def __init__(self, Path, mode='w'):
+        self.Path = Path
+        self.File = open(Path, mode, encoding='UTF-8')
+
+    def Write(self, Rows):
+        Rows = Rows.ToDataFrame() if isinstance(Rows, ColumnBatch) else ExpandLinks(Rows)
+        if len(Rows) == 0:
+            return
+        Lines = Rows.to_json(orient='records', lines=True, force_ascii=False)
+        # Older pandas do not end the last line
+        self.File.write(Lines if Lines.endswith('\n') else Lines + '\n')
+        self.File.flush()
+
+    def Close(self):
+        self.File.close()
+
+class StoreSink(ResultSink):
+    """
+    Upserts the pages into a JobStore
+    :param Store JobStore
+    :param Platform platform of the pages, defaults to None
+    """
+    def __init__(self, Store, Platform=None):
+        self.Store = Store
+        self.Platform = Platform
+
+    def Write(self, Rows):
+        self.Store.Upsert(Rows, self.Platform)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+import random
+from collections import deque
+from threading import Lock
+
+# Statuses worth sending the request again: throttled or server side errors
+RETRY_STATUSES = frozenset([408, 429, 500, 502, 503, 504])
+
+class FetchError(Exception):
+    """
+    A page could not be fetched, after all the retries
+    :param URL query URL of the page
+    :param Status HTTP status of the last answer, None if there was no answer
+    :param Attempts number of requests sent
+    :param Cause exception of the last request, if any
+    """
+    def __init__(self, URL, Status=None, Attempts=1, Cause=None):
+        self.URL = URL
+        self.Status = Status
+        self.Attempts = Attempts
+        self.Cause = Cause
+        Reason = 'status %s' % Status if Status is not None else repr(Cause)
+        super().__init__('%s failed after %d attempt(s): %s' % (URL, Attempts, Reason))
+
+class RetryPolicy:
+    """
+    Timeouts, retries and hedging of the page fetches.
+    Requests failing on a timeout, a connection error or a RETRY_STATUSES
+    status are sent again after an exponential backoff with full jitter (or
+    the Retry-After of the answer, when longer). A page still failing after
+    the retries raises a FetchError, reported by JobListing as a failed page.
+    With Hedge, a second identical request is sent when the first one is
+    slower than the HedgeQuantile of the recent latencies of its website, and
+    the first answer wins.
+    :param ConnectTimeout seconds to establish the connection
+    :param ReadTimeout seconds to wait between two bytes of the answer
+    :param Retries number of requests sent again after the first one
+    :param BackoffBase seconds of backoff before the first retry, doubled for
+    each following one
+    :param BackoffMax upper bound of a backoff
+    :param Hedge send hedged requests for the slow pages
+    :param HedgeQuantile latency quantile after which a request is hedged
+    :param HedgeSamples number of recent latencies kept per website, hedging
+    starts once a quarter of them are known
+    """
+    def __init__(self, ConnectTimeout=5.0, ReadTimeout=20.0, Retries=3, BackoffBase=0.5, BackoffMax=30.0,
+                 Hedge=False, HedgeQuantile=0.95, HedgeSamples=200):
+        self.ConnectTimeout = ConnectTimeout
+        self.ReadTimeout = ReadTimeout
+        self.Retries = Retries
+        self.BackoffBase = BackoffBase
+        self.BackoffMax = BackoffMax
+        self.Hedge = Hedge
+        self.HedgeQuantile = HedgeQuantile
+        self.HedgeSamples = HedgeSamples
+        self.Latencies = {}
+        self.PolicyLock = Lock()
+        self.Counters = {'Retries': 0, 'Hedged': 0, 'HedgeWins': 0, 'Failures': 0}
+
+    def Timeout(self):
+        """
+        Returns the (connect, read) timeout of a request
+        """
+        return self.ConnectTimeout, self.ReadTimeout
+
+    @staticmethod
+    def ShouldRetry(Status):
+        """
+        Returns whether an answer with this status should be sent again
+        """
+        return Status is None or Status in RETRY_STATUSES
+
+    def Backoff(self, Attempt, RetryAfter=None):
+        """
+        Seconds to wait before sending the request again
+        :param Attempt number of the failed attempt, starting at 0
+        :param RetryAfter Retry-After header of the answer, if any
+        """
+        Delay = random.uniform(0, min(self.BackoffMax, self.BackoffBase * 2 ** Attempt))
+        if RetryAfter is not None:
+            try:
+                Delay = max(Delay, min(self.BackoffMax, float(RetryAfter)))
+            except ValueError:
+                # HTTP date instead of seconds
+                pass
+        return Delay
+
+    def Record(self, Site, Seconds):
+        """
+        Record the latency of a successful request to a website
+        """
+        with self.PolicyLock:
+            if Site not in self.Latencies:
+                self.Latencies[Site] = deque(maxlen=self.HedgeSamples)
+            self.Latencies[Site].append(Seconds)
+
+    def HedgeDelay(self, Site):
+        """
+        Returns the seconds after which a request to the website is hedged,
+        None if hedging is off or too few latencies are known
+        """
+        if not self.Hedge:
+            return None
+        with self.PolicyLock:
+            Latencies = self.Latencies.get(Site)
+            if Latencies is None or len(Latencies) < max(1, self.HedgeSamples // 4):
+                return None
+            Sorted = sorted(Latencies)
+        return Sorted[min(len(Sorted) - 1, int(self.HedgeQuantile * len(Sorted)))]
+
+    def Count(self, Counter):
+        with self.PolicyLock:
+            self.Counters[Counter] += 1
+
+    def Stats(self):
+        with self.PolicyLock:
+            return dict(self.Counters)
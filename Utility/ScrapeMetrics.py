@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+import math
+import os
+import re
+from threading import Lock
+
+# Stages of a page, in seconds: building its URL, waiting for a worker of the
+# executor, waiting for the rate limiter, opening the connection (DNS, TCP and
+# TLS), time to the first byte (headers), downloading the body, parsing it and
+# extracting the Job posts; then the size of the body (Bytes), the bytes
+# received for it (WireBytes: compressed, and only up to the early stop) and the
+# number of Job posts (Rows). Assembly is the merge of the pages of a request, recorded
+# for the platform 'All'.
+STAGES = ('URL', 'QueueWait', 'Throttle', 'Connect', 'TTFB', 'Download', 'Parse', 'Extract', 'Assembly',
+          'Bytes', 'WireBytes', 'Rows')
+COUNT_STAGES = ('Bytes', 'WireBytes', 'Rows')
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Histogram:
+    """
+    Histogram of positive values in logarithmic buckets, Growth apart: the
+    quantiles are estimated within Growth - 1 relative error, in a memory that
+    does not grow with the number of values.
+    :param Growth ratio between the bounds of a bucket
+    """
+    def __init__(self, Growth=1.05):
+        self.LogGrowth = math.log(Growth)
+        self.Buckets = {}
+        self.Zeros = 0
+        self.Count = 0
+        self.Sum = 0.0
+        self.Min = math.inf
+        self.Max = 0.0
+
+    def Observe(self, Value):
+        self.Count += 1
+        self.Sum += Value
+        self.Min = min(self.Min, Value)
+        self.Max = max(self.Max, Value)
+        if Value <= 0:
+            self.Zeros += 1
+        else:
+            Index = math.floor(math.log(Value) / self.LogGrowth)
+            self.Buckets[Index] = self.Buckets.get(Index, 0) + 1
+
+    def Quantile(self, Quantile):
+        """
+        Returns the estimated quantile of the values, None if there is none
+        """
+        if self.Count == 0:
+            return None
+        Rank = Quantile * (self.Count - 1)
+        Seen = self.Zeros
+        if Rank < Seen:
+            return 0.0
+        for Index in sorted(self.Buckets):
+            Seen += self.Buckets[Index]
+            if Rank < Seen:
+                # Geometric middle of the bucket
+                return min(max(math.exp((Index + 0.5) * self.LogGrowth), self.Min), self.Max)
+        return self.Max
+
+class ScrapeMetrics:
+    """
+    Timings of the stages of the scraped pages (see STAGES), aggregated in
+    one histogram per platform and stage. Safe to update from multiple
+    threads and from the event loop.
+    :param Growth ratio between the bounds of the buckets of the histograms
+    """
+    def __init__(self, Growth=1.05):
+        self.Growth = Growth
+        self.Histograms = {}
+        self.MetricsLock = Lock()
+
+    def Observe(self, Platform, Stage, Value):
+        """
+        Record a value of a stage of a page
+        """
+        with self.MetricsLock:
+            self.__Histogram__(Platform, Stage).Observe(Value)
+
+    def ObserveMany(self, Platform, Values):
+        """
+        Record the values of several stages of a page
+        :param Values dictionary of stage to value
+        """
+        with self.MetricsLock:
+            for Stage, Value in Values.items():
+                self.__Histogram__(Platform, Stage).Observe(Value)
+
+    def __Histogram__(self, Platform, Stage):
+        """
+        Internal method returning the histogram of the stage, the metrics lock
+        must be held
+        """
+        Values = self.Histograms.get((Platform, Stage))
+        if Values is None:
+            Values = self.Histograms[Platform, Stage] = Histogram(self.Growth)
+        return Values
+
+    def Reset(self):
+        with self.MetricsLock:
+            self.Histograms = {}
+
+    def Stats(self):
+        """
+        Returns per platform and per stage the number of values, their sum,
+        mean, p50, p95, p99 and maximum
+        """
+        Stats = {}
+        with self.MetricsLock:
+            for (Platform, Stage), Values in self.Histograms.items():
+                Summary = {'Count': Values.Count, 'Sum': Values.Sum, 'Mean': Values.Sum / Values.Count,
+                           'Max': Values.Max}
+                for Quantile in QUANTILES:
+                    Summary['p%d' % round(Quantile * 100)] = Values.Quantile(Quantile)
+                Stats.setdefault(Platform, {})[Stage] = Summary
+        for Platform in Stats:
+            Stats[Platform] = {Stage: Stats[Platform][Stage] for Stage in sorted(
+                Stats[Platform], key=lambda Stage: STAGES.index(Stage) if Stage in STAGES else len(STAGES))}
+        return Stats
+
+    def Breakdown(self):
+        """
+        Returns the share of each timed stage in the time spent per platform,
+        to tell whether a run is slowed down by the network, the parsing or
+        the assembly
+        """
+        Breakdown = {}
+        for Platform, Stages in self.Stats().items():
+            Timed = {Stage: Summary['Sum'] for Stage, Summary in Stages.items() if Stage not in COUNT_STAGES}
+            Total = sum(Timed.values())
+            Breakdown[Platform] = {Stage: Seconds / Total if Total > 0 else 0.0 for Stage, Seconds in Timed.items()}
+        return Breakdown
+
+    def Prometheus(self, Prefix='jobscraper'):
+        """
+        Returns the metrics in the Prometheus text format, as summaries:
+        <Prefix>_stage_seconds for the timed stages, <Prefix>_page_bytes,
+        <Prefix>_page_wire_bytes and <Prefix>_page_rows
+        """
+        Families = {}
+        for Platform, Stages in self.Stats().items():
+            for Stage, Summary in Stages.items():
+                if Stage in COUNT_STAGES:
+                    Name, Labels = '%s_page_%s' % (Prefix, SnakeCase(Stage)), 'platform="%s"' % Platform
+                else:
+                    Name = '%s_stage_seconds' % Prefix
+                    Labels = 'platform="%s",stage="%s"' % (Platform, SnakeCase(Stage))
+                Families.setdefault(Name, []).append((Labels, Summary))
+
+        Lines = []
+        for Name, Series in Families.items():
+            Lines.append('# TYPE %s summary' % Name)
+            for Labels, Summary in Series:
+                for Quantile in QUANTILES:
+                    Lines.append('%s{%s,quantile="%s"} %r' % (Name, Labels, Quantile,
+                                                              Summary['p%d' % round(Quantile * 100)]))
+                Lines.append('%s_sum{%s} %r' % (Name, Labels, Summary['Sum']))
+                Lines.append('%s_count{%s} %d' % (Name, Labels, Summary['Count']))
+        return '\n'.join(Lines) + '\n'
+
+    def WritePrometheus(self, Path, Prefix='jobscraper'):
+        """
+        Write the metrics to a Prometheus text format file, e.g. for the
+        textfile collector of the node exporter. The file is replaced
+        atomically, so that it is never read half written.
+        """
+        Temporary = Path + '.tmp'
+        with open(Temporary, 'w') as File:
+            File.write(self.Prometheus(Prefix))
+        os.replace(Temporary, Path)
+
+def SnakeCase(Name):
+    """
+    Returns the stage name in snake case, e.g. QueueWait -> queue_wait
+    """
+    return re.sub(r'(?<=[a-z])(?=[A-Z])', '_', Name).lower()
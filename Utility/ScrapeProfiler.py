@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from time import strftime, perf_counter
+
+# Frames of JobListing handling a single page: their Reader tells the platform
+# the sampled stack is working for
+PAGE_FRAMES = frozenset(['__Send__', '__SendAsync__', '__FetchForParser__', '__SendDetail__', '__Get__',
+                         '__GetAsync__'])
+
+class ScrapeProfiler:
+    """
+    Sampling profiler of the scrape runs (JobListing.SendRequests). While a run
+    is profiled, a background thread samples the stacks of the threads of the
+    run every Interval seconds, and attributes each stack to the platform of
+    the page it is working on (the thread calling SendRequests, e.g. while
+    merging the results, is attributed to 'All'). Each run writes, in
+    Directory:
+    <run>.collapsed: the stacks in the collapsed format of flamegraph.pl and
+    speedscope, rooted at the platform
+    <run>.json: the samples per platform, and the functions with the most
+    samples per platform, by self and total (inclusive) samples
+    The sampled time is wall clock: threads waiting on the network show up
+    in the socket calls. With the pipeline executor the parsing runs in other
+    processes, and only the fetches are sampled.
+    :param Directory directory of the profiles, created if missing
+    :param Interval seconds between two samples
+    :param Top number of functions listed per platform in the summary
+    """
+    def __init__(self, Directory='Profiles', Interval=0.005, Top=30):
+        self.Directory = Directory
+        self.Interval = Interval
+        self.Top = Top
+        os.makedirs(Directory, exist_ok=True)
+        self.Runs = 0
+        # Paths of the files written for the last run
+        self.Artifacts = []
+
+    @contextmanager
+    def Profile(self, Name=None):
+        """
+        Context manager sampling the threads of the run executed in its body
+        :param Name name of the files of the run, defaults to the time of the
+        run and its number
+        """
+        self.Runs += 1
+        Name = Name if Name is not None else '%s-%d' % (strftime('%Y%m%d-%H%M%S'), self.Runs)
+        Stacks = Counter()
+        Stop = threading.Event()
+        Sampler = threading.Thread(target=self.__Sample__, args=(threading.get_ident(), Stacks, Stop),
+                                   name='ScrapeProfiler', daemon=True)
+        Start = perf_counter()
+        Sampler.start()
+        try:
+            yield
+        finally:
+            Stop.set()
+            Sampler.join()
+            self.__Write__(Name, Stacks, perf_counter() - Start)
+
+    def __Sample__(self, Caller, Stacks, Stop):
+        """
+        Internal method of the sampler thread
+        """
+        Own = threading.get_ident()
+        while not Stop.wait(self.Interval):
+            for Thread, Frame in sys._current_frames().items():
+                if Thread == Own:
+                    continue
+                Platform, Stack = None, []
+                while Frame is not None:
+                    Code = Frame.f_code
+                    if Platform is None and Code.co_name in PAGE_FRAMES:
+                        Reader = Frame.f_locals.get('Reader')
+                        Platform = getattr(Reader, 'Platform', None)
+                    Stack.append('%s (%s:%d)' % (Code.co_name, os.path.basename(Code.co_filename),
+                                                 Code.co_firstlineno))
+                    Frame = Frame.f_back
+                if Platform is None:
+                    # Idle threads of the executors are not part of the run
+                    if Thread != Caller:
+                        continue
+                    Platform = 'All'
+                Stack.append(Platform)
+                Stacks[tuple(reversed(Stack))] += 1
+
+    def __Write__(self, Name, Stacks, Seconds):
+        """
+        Internal method writing the collapsed stacks and the summary of a run
+        """
+        Collapsed = os.path.join(self.Directory, '%s.collapsed' % Name)
+        with open(Collapsed, 'w') as File:
+            for Stack, Count in Stacks.most_common():
+                File.write('%s %d\n' % (';'.join(Stack), Count))
+
+        Platforms = {}
+        for Stack, Count in Stacks.items():
+            Platform = Platforms.setdefault(Stack[0], {'Samples': 0, 'Self': Counter(), 'Total': Counter()})
+            Platform['Samples'] += Count
+            Platform['Self'][Stack[-1]] += Count
+            # A recursive function counts once per stack
+            for Function in set(Stack[1:]):
+                Platform['Total'][Function] += Count
+        Summary = {'Name': Name, 'Seconds': Seconds, 'Interval': self.Interval,
+                   'Platforms': {Name: {'Samples': Platform['Samples'],
+                                        'Self': Platform['Self'].most_common(self.Top),
+                                        'Total': Platform['Total'].most_common(self.Top)}
+                                 for Name, Platform in Platforms.items()}}
+        Path = os.path.join(self.Directory, '%s.json' % Name)
+        with open(Path, 'w') as File:
+            json.dump(Summary, File, indent=2)
+        self.Artifacts = [Collapsed, Path]
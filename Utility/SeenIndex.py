@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+import json
+import sqlite3
+from threading import Lock
+from time import time
+from Utility.JobStore import NormalizeLink
+
+class SeenIndex:
+    """
+    Persistent index of the Job links already seen, per query, used by the
+    incremental scraping to tell new Job posts from the ones already scraped.
+    Links are keyed by their normalized form (NormalizeLink), as in the
+    JobStore, so that tracking parameters do not make them look new.
+    :param Path SQLite file of the index
+    """
+    def __init__(self, Path='SeenJobs.db'):
+        self.IndexLock = Lock()
+        self.Index = sqlite3.connect(Path, check_same_thread=False)
+        self.Index.execute('CREATE TABLE IF NOT EXISTS Seen ('
+                           'Query TEXT, JobLink TEXT, FirstSeen REAL, '
+                           'PRIMARY KEY (Query, JobLink)) WITHOUT ROWID')
+        self.Index.commit()
+
+    @staticmethod
+    def QueryKey(Platform, Query):
+        """
+        Key of a query: the platform and the query parameters, without the
+        number of pages
+        """
+        Params = {Key: Value for Key, Value in Query.items() if Key != 'NumberOfPages'}
+        return '%s:%s' % (Platform, json.dumps(Params, sort_keys=True, default=str))
+
+    def MarkSeen(self, QueryKey, Links):
+        """
+        Record the links as seen for the query
+        :param QueryKey key of the query (see QueryKey)
+        :param Links Job links found on a page
+        :returns positions of the links that were not seen before
+        """
+        New = []
+        Now = time()
+        with self.IndexLock:
+            for Position, Link in enumerate(Links):
+                Key = NormalizeLink(Link) if isinstance(Link, str) else Link
+                Cursor = self.Index.execute('INSERT OR IGNORE INTO Seen VALUES (?, ?, ?)', (QueryKey, Key, Now))
+                if Cursor.rowcount > 0:
+                    New.append(Position)
+            self.Index.commit()
+        return New
+
+    def Count(self, QueryKey=None):
+        """
+        Returns the number of links seen, for a query or for all of them
+        """
+        with self.IndexLock:
+            if QueryKey is None:
+                return self.Index.execute('SELECT COUNT(*) FROM Seen').fetchone()[0]
+            return self.Index.execute('SELECT COUNT(*) FROM Seen WHERE Query = ?', (QueryKey,)).fetchone()[0]
+
+    def Forget(self, QueryKey):
+        """
+        Forget the links seen for a query, its next incremental scrape fetches
+        all the pages again
+        """
+        with self.IndexLock:
+            self.Index.execute('DELETE FROM Seen WHERE Query = ?', (QueryKey,))
+            self.Index.commit()
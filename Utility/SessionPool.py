@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+import asyncio
+import zlib
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+from threading import Lock, local
+from time import perf_counter
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# Seconds spent opening connections (DNS, TCP and TLS) by the current thread
+ConnectTimes = local()
+
+# Content encodings accepted: the requests sessions accept the ones urllib3
+# decodes (gzip and deflate, br and zstd when their modules are installed), the
+# aiohttp sessions the ones of Decompressor
+ASYNC_ACCEPT_ENCODING = 'gzip, deflate'
+
+class DeflateDecompressor:
+    """
+    Incremental decompressor of a deflate body: zlib wrapped, or raw deflate
+    as some servers send it (detected on the first bytes, as urllib3 does)
+    """
+    def __init__(self):
+        self.Decoder = zlib.decompressobj(zlib.MAX_WBITS)
+        # Bytes received until the format is known, None once it is
+        self.Received = b''
+
+    def decompress(self, Data):
+        if self.Received is None:
+            return self.Decoder.decompress(Data)
+        self.Received += Data
+        try:
+            Output = self.Decoder.decompress(Data)
+        except zlib.error:
+            self.Decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+            Received, self.Received = self.Received, None
+            return self.Decoder.decompress(Received)
+        if Output:
+            self.Received = None
+        return Output
+
+    def flush(self):
+        return self.Decoder.flush()
+
+def Decompressor(Encoding):
+    """
+    Returns the incremental decompressor (decompress and flush) of a
+    Content-Encoding, None for an uncompressed body
+    :raises ValueError for an encoding that was not accepted
+    """
+    Encoding = (Encoding or 'identity').strip().lower()
+    if Encoding == 'identity':
+        return None
+    if Encoding in ('gzip', 'x-gzip'):
+        # Detects the gzip or zlib header
+        return zlib.decompressobj(32 + zlib.MAX_WBITS)
+    if Encoding == 'deflate':
+        return DeflateDecompressor()
+    raise ValueError('Unsupported content encoding: {}'.format(Encoding))
+
+class TimedConnection(HTTPConnection):
+    def connect(self):
+        Start = perf_counter()
+        try:
+            super().connect()
+        finally:
+            ConnectTimes.Seconds = getattr(ConnectTimes, 'Seconds', 0.0) + perf_counter() - Start
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        Start = perf_counter()
+        try:
+            super().connect()
+        finally:
+            ConnectTimes.Seconds = getattr(ConnectTimes, 'Seconds', 0.0) + perf_counter() - Start
+
+class TimedConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+class TimedAdapter(HTTPAdapter):
+    """
+    Adapter whose connections record the time spent opening them
+    """
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedConnectionPool, 'https': TimedHTTPSConnectionPool}
+
+class SessionPool:
+    """
+    Keeps one persistent, keep-alive HTTP session per platform, so that all the
+    pages sent to the same website reuse the pooled connections instead of a
+    new TCP/TLS handshake per page. Compressed bodies are accepted, the aiohttp
+    sessions leave them compressed (see Decompressor) so that the bytes
+    received can be counted.
+    :param PoolSize maximum number of connections kept per platform, should be
+    the number of requests the executor has in flight for a single website
+    :param Headers headers sent with every request
+    """
+    def __init__(self, PoolSize=5, Headers=None):
+        self.PoolSize = PoolSize
+        # Platforms with their own number of connections (see SetPoolSize)
+        self.PoolSizes = {}
+        self.Headers = {'Connection': 'keep-alive'}
+        if Headers is not None:
+            self.Headers.update(Headers)
+        self.Sessions = {}
+        self.AsyncSessions = {}
+        self.AsyncCounters = {}
+        self.SessionLock = Lock()
+
+    def SetPoolSize(self, Platform, PoolSize):
+        """
+        Keep PoolSize connections for the platform instead of the default,
+        applies to the sessions created afterwards
+        """
+        self.PoolSizes[Platform] = PoolSize
+
+    def Session(self, Platform):
+        """
+        Returns the requests session for the platform, created on first use.
+        Safe to call from multiple threads.
+        """
+        Session = self.Sessions.get(Platform)
+        if Session is None:
+            with self.SessionLock:
+                Session = self.Sessions.get(Platform)
+                if Session is None:
+                    Session = requests.Session()
+                    Session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+                    Session.headers.update(self.Headers)
+                    # pool_block keeps the pool at PoolSize connections: a worker
+                    # waits for a free connection instead of opening (and then
+                    # discarding) an extra one.
+                    Adapter = TimedAdapter(pool_connections=1, pool_maxsize=self.PoolSizes.get(Platform, self.PoolSize),
+                                           pool_block=True)
+                    Session.mount('http://', Adapter)
+                    Session.mount('https://', Adapter)
+                    self.Sessions[Platform] = Session
+        return Session
+
+    @staticmethod
+    def ConnectSeconds():
+        """
+        Returns the seconds the current thread spent opening connections since
+        the previous call, for the requests sessions. The aiohttp sessions add
+        them to the 'Connect' key of the trace_request_ctx dictionary of the
+        request instead.
+        """
+        Seconds = getattr(ConnectTimes, 'Seconds', 0.0)
+        ConnectTimes.Seconds = 0.0
+        return Seconds
+
+    def AsyncSession(self, Platform):
+        """
+        Returns the aiohttp session for the platform, created on first use.
+        Must be called from the running event loop, sessions are not shared
+        between event loops.
+        """
+        Key = (Platform, asyncio.get_running_loop())
+        Session = self.AsyncSessions.get(Key)
+        if Session is None:
+            if aiohttp is None:
+                raise ImportError('aiohttp is required for asynchronous sessions')
+            Counter = self.AsyncCounters.setdefault(Platform, {'Handshakes': 0, 'Requests': 0})
+            Tracer = aiohttp.TraceConfig()
+            Tracer.on_connection_create_end.append(self.__Count__(Counter, 'Handshakes'))
+            Tracer.on_request_start.append(self.__Count__(Counter, 'Requests'))
+            Tracer.on_connection_create_start.append(self.__ConnectStart__)
+            Tracer.on_connection_create_end.append(self.__ConnectEnd__)
+            Connector = aiohttp.TCPConnector(limit=self.PoolSizes.get(Platform, self.PoolSize), keepalive_timeout=60)
+            Headers = {'Accept-Encoding': ASYNC_ACCEPT_ENCODING}
+            Headers.update(self.Headers)
+            Session = aiohttp.ClientSession(connector=Connector, headers=Headers, trace_configs=[Tracer],
+                                            auto_decompress=False)
+            self.AsyncSessions[Key] = Session
+        return Session
+
+    async def CloseAsync(self):
+        """
+        Close the aiohttp sessions of the running event loop, they are bound to
+        the event loop they were created on.
+        """
+        Loop = asyncio.get_running_loop()
+        for Key in [Key for Key in self.AsyncSessions if Key[1] is Loop]:
+            await self.AsyncSessions.pop(Key).close()
+
+    def Close(self):
+        """
+        Close all the requests sessions and their pooled connections
+        """
+        with self.SessionLock:
+            Sessions, self.Sessions = self.Sessions, {}
+        for Session in Sessions.values():
+            Session.close()
+
+    def Stats(self):
+        """
+        Connection counters per platform
+        :returns dictionary of platform to Requests sent, Handshakes (new
+        connections opened) and Reused (requests sent on a pooled connection)
+        """
+        Stats = {}
+        for Platform, Counter in self.AsyncCounters.items():
+            Stats[Platform] = dict(Counter)
+
+        for Platform, Session in list(self.Sessions.items()):
+            Counter = Stats.setdefault(Platform, {'Handshakes': 0, 'Requests': 0})
+            for Adapter in set(Session.adapters.values()):
+                Pools = Adapter.poolmanager.pools
+                for Key in Pools.keys():
+                    Pool = Pools.get(Key)
+                    if Pool is not None:
+                        Counter['Handshakes'] += Pool.num_connections
+                        Counter['Requests'] += Pool.num_requests
+
+        for Counter in Stats.values():
+            Counter['Reused'] = max(Counter['Requests'] - Counter['Handshakes'], 0)
+        return Stats
+
+    @staticmethod
+    def __Count__(Counter, Key):
+        async def Increment(Session, Context, Params):
+            Counter[Key] += 1
+        return Increment
+
+    @staticmethod
+    async def __ConnectStart__(Session, Context, Params):
+        Context.ConnectStart = perf_counter()
+
+    @staticmethod
+    async def __ConnectEnd__(Session, Context, Params):
+        Timing = Context.trace_request_ctx
+        if isinstance(Timing, dict):
+            Timing['Connect'] = Timing.get('Connect', 0.0) + perf_counter() - Context.ConnectStart